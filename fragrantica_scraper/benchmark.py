@@ -0,0 +1,220 @@
+# benchmark.py
+"""
+Benchmark de bout en bout du crawl contre le serveur Fragrantica local.
+
+Lance PerfumeURLsSpider et PerfumeSpider dans le même processus (en parallèle
+avec passage direct des URLs, ou l'un après l'autre), avec une base MongoDB
+en mémoire (mongomock), et mesure pour chaque étape :
+pages/s, items/s et latence item -> base (réception de la réponse jusqu'à
+l'écriture en base : fin des pipelines pour les URLs, écriture du lot qui
+contient l'item pour perfume_data, signal ingest.perfumes_written).
+
+Point d'entrée: python run_scrapers.py --benchmark
+"""
+import time
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.log import configure_logging
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+
+from fragrantica_scraper.handoff import UrlHandoff
+from fragrantica_scraper.ingest import perfumes_written
+from fragrantica_scraper.mock_server import start_mock_server
+from fragrantica_scraper.mongo import get_mongo_client
+
+BENCHMARK_MONGO_URI = "mongomock://benchmark"
+BENCHMARK_HANDOFF = "benchmark"
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class CrawlBenchmarkCollector:
+    """Extension qui relève réponses, items et latence item -> base."""
+
+    def __init__(self):
+        self.responses = 0
+        self.items = 0
+        self.status_429 = 0
+        self.item_latencies = []
+        # Items pas encore écrits {url: (réception, passage des pipelines)}
+        self.awaiting = {}
+        # Items écrits avant leur signal item_scraped {url: écriture}
+        self.written_at = {}
+        self.started = None
+        self.finished = None
+        self.reason = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls()
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        # Avant les middlewares : compte aussi le 429 ignoré par StopOn429Middleware
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.perfumes_written, signal=perfumes_written)
+        crawler.benchmark_collector = ext
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.perf_counter()
+
+    def spider_closed(self, spider, reason):
+        self.finished = time.perf_counter()
+        self.reason = reason
+        # Pipelines fermés (dernier lot écrit) : le reste a été écrit par
+        # process_item (MongoPerfumeURLsPipeline)
+        for received_at, scraped_at in self.awaiting.values():
+            self.item_latencies.append(scraped_at - received_at)
+        self.awaiting = {}
+
+    def response_downloaded(self, response, request, spider):
+        self.responses += 1
+        if response.status == 429:
+            self.status_429 += 1
+        request.meta["bench_received_at"] = time.perf_counter()
+
+    def item_scraped(self, item, response, spider):
+        self.items += 1
+        received_at = response.meta.get("bench_received_at")
+        if received_at is None:
+            return
+        now = time.perf_counter()
+        url = ItemAdapter(item).get("url")
+        if url is None:
+            self.item_latencies.append(now - received_at)
+        elif url in self.written_at:
+            # Lot complété par cet item : écrit pendant process_item
+            self.item_latencies.append(self.written_at.pop(url) - received_at)
+        else:
+            self.awaiting[url] = (received_at, now)
+
+    def perfumes_written(self, documents):
+        now = time.perf_counter()
+        for document in documents:
+            url = document.get("url")
+            if url in self.awaiting:
+                received_at, _ = self.awaiting.pop(url)
+                self.item_latencies.append(now - received_at)
+            else:
+                self.written_at[url] = now
+
+    def summary(self, stage):
+        elapsed = (self.finished or time.perf_counter()) - (self.started or 0)
+        return {
+            "stage": stage,
+            "reason": self.reason,
+            "elapsed": elapsed,
+            "pages": self.responses,
+            "items": self.items,
+            "status_429": self.status_429,
+            "pages_per_sec": self.responses / elapsed if elapsed else 0,
+            "items_per_sec": self.items / elapsed if elapsed else 0,
+            "p50_item_ms": percentile(self.item_latencies, 50) * 1000,
+            "p95_item_ms": percentile(self.item_latencies, 95) * 1000,
+        }
+
+
+def benchmark_settings(base_url, profile=None, overlap=True, rate_limit=0, profiling=False,
+                       metrics=False):
+    """Settings du projet redirigés vers le serveur local et mongomock."""
+    settings = get_project_settings()
+    settings.set("FRAGRANTICA_BASE_URL", base_url, priority="cmdline")
+    settings.set("MONGO_URI", BENCHMARK_MONGO_URI, priority="cmdline")
+    settings.set("LOG_LEVEL", "WARNING", priority="cmdline")
+    settings.set("TELNETCONSOLE_ENABLED", False, priority="cmdline")
+    settings.set("GLOBAL_RATE_LIMIT", rate_limit, priority="cmdline")
+    settings.set("GLOBAL_RATE_BUDGET_NAME", "benchmark", priority="cmdline")
+    if profiling:
+        settings.set("PROFILING_ENABLED", True, priority="cmdline")
+    if metrics:
+        settings.set("METRICS_ENABLED", True, priority="cmdline")
+    if overlap:
+        settings.set("URL_HANDOFF", BENCHMARK_HANDOFF, priority="cmdline")
+    if profile:
+        settings.set("CRAWL_PROFILE", profile, priority="cmdline")
+
+    extensions = settings.getdict("EXTENSIONS")
+    extensions["fragrantica_scraper.benchmark.CrawlBenchmarkCollector"] = 0
+    settings.set("EXTENSIONS", extensions, priority="cmdline")
+    return settings
+
+
+def run_benchmark(designers=20, perfumes_per_designer=10, page_size=50,
+                  latency_ms=20, jitter_ms=5, rate_429=0.0, profile="aggressive",
+                  overlap=True, rate_limit=0, profiling=False, metrics=False):
+    """
+    Lance les deux spiders contre le serveur local.
+
+    Args:
+        overlap (bool): En parallèle avec passage des URLs (comme
+            run_scrapers.py), sinon l'un après l'autre
+        rate_limit (float): GLOBAL_RATE_LIMIT partagé (0 = aucun)
+        profiling (bool): Profilage des callbacks et pipelines (logs/profiling/)
+        metrics (bool): Métriques Prometheus (port METRICS_PORT)
+
+    Returns:
+        dict: {'server': {...}, 'stages': [résumé par spider],
+               'elapsed': durée totale, 'mongo': {...}}
+    """
+    server = start_mock_server(
+        designers=designers, perfumes_per_designer=perfumes_per_designer,
+        page_size=page_size, latency_ms=latency_ms, jitter_ms=jitter_ms,
+        rate_429=rate_429
+    )
+    settings = benchmark_settings(server.base_url, profile, overlap, rate_limit, profiling, metrics)
+    UrlHandoff.discard(BENCHMARK_HANDOFF)
+
+    install_reactor(settings["TWISTED_REACTOR"])
+    configure_logging(settings)
+    from twisted.internet import defer, reactor
+
+    runner = CrawlerRunner(settings)
+    spider_names = ("perfume_urls", "perfume_data")
+    stages = []
+
+    @defer.inlineCallbacks
+    def crawl():
+        if overlap:
+            crawlers = [runner.create_crawler(name) for name in spider_names]
+            yield defer.DeferredList([runner.crawl(c) for c in crawlers])
+        else:
+            crawlers = []
+            for name in spider_names:
+                crawlers.append(runner.create_crawler(name))
+                yield runner.crawl(crawlers[-1])
+        for name, crawler in zip(spider_names, crawlers):
+            stages.append(crawler.benchmark_collector.summary(name))
+        reactor.stop()
+
+    started = time.perf_counter()
+    reactor.callWhenRunning(crawl)
+    reactor.run()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    db = get_mongo_client(BENCHMARK_MONGO_URI)[settings.get("MONGO_DATABASE")]
+    return {
+        "server": {
+            "base_url": server.base_url,
+            "perfumes": server.site.total_perfumes,
+            "requests": server.requests_count,
+            "status_429": server.count_429,
+        },
+        "stages": stages,
+        "elapsed": elapsed,
+        "mongo": {
+            "perfume_urls": db.perfume_urls.count_documents({}),
+            "perfume_data": db.perfume_data.count_documents({}),
+        },
+    }
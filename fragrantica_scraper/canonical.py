@@ -0,0 +1,273 @@
+# canonical.py
+"""
+Identifiant canonique des parfums et dédoublonnage de perfume_data.
+
+Une fiche Fragrantica est identifiée par le numéro en fin d'URL ; le
+segment précédent est le slug de la marque :
+
+    https://www.fragrantica.com/perfume/French-Avenue/NOMAD-122623.html
+                                        ^ marque      ^ fragrantica_id
+
+Le numéro est stocké dans `fragrantica_id`, sous un index unique : une
+fiche dont l'URL change (marque ou nom renommés) reste un seul document.
+
+La marque d'un parfum est celle de sa page (itemprop="brand"), sinon celle
+du slug de l'URL. Le designer transmis par la page de listing
+(`response.meta['designer']`) n'est retenu que s'il correspond au slug :
+une page designer liste aussi des parfums d'autres marques.
+
+`audit` / `fix` (scripts/check_duplicates.py) traitent les documents
+existants côté serveur : agrégations en flux, écritures par lots.
+"""
+import re
+import unicodedata
+from urllib.parse import urlsplit
+
+from pymongo import ASCENDING, DeleteMany, IndexModel, UpdateOne
+
+from fragrantica_scraper.designer_stats import utcnow
+
+COLLECTION = "perfume_data"
+ID_FIELD = "fragrantica_id"
+
+# Slug de la marque et numéro du parfum ; même motif côté serveur ($regexFind)
+URL_PATTERN = r"/perfume/([^/]+)/[^/]*-(\d+)\.html$"
+_URL_RE = re.compile(URL_PATTERN)
+
+# Unique et sparse : les documents sans numéro (URL hors format) n'y sont
+# pas. Mêmes options que la déclaration de la webapp (webapp/utils/indexes.py)
+ID_INDEX = IndexModel([(ID_FIELD, ASCENDING)], unique=True, sparse=True)
+
+# Taille des lots d'écriture de `fix`
+BATCH_SIZE = 1000
+
+
+def perfume_id(url):
+    """Numéro Fragrantica d'une URL de parfum (".../NOMAD-122623.html" -> 122623), None sinon."""
+    match = _URL_RE.search(urlsplit(url).path) if url else None
+    return int(match.group(2)) if match else None
+
+
+def brand_slug(url):
+    """Slug de la marque d'une URL de parfum ("French-Avenue"), None sinon."""
+    match = _URL_RE.search(urlsplit(url).path) if url else None
+    return match.group(1) if match else None
+
+
+def brand_key(name):
+    """Forme comparable d'une marque ou d'un slug : sans accents, casse ni ponctuation."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_name = decomposed.encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]", "", ascii_name.lower())
+
+
+def brand_matches(brand, slug):
+    """Indique si une marque correspond au slug d'URL ("d'Annam" ~ "d-Annam")."""
+    return bool(brand) and brand_key(brand) == brand_key(slug)
+
+
+def resolve_brand(url, page_brand=None, designer=None):
+    """
+    Marque canonique d'un parfum.
+
+    Args:
+        url (str): URL du parfum
+        page_brand (str): Marque lue sur la page (itemprop="brand")
+        designer (str): Designer de la page de listing (response.meta)
+
+    Returns:
+        str: Marque de la page, sinon designer s'il correspond au slug,
+        sinon marque déduite du slug ; None si rien n'est connu
+    """
+    page_brand = (page_brand or "").strip()
+    if page_brand:
+        return page_brand
+
+    slug = brand_slug(url)
+    if designer and (slug is None or brand_matches(designer, slug)):
+        return designer
+    if slug:
+        return slug.replace("-", " ")
+    return designer or None
+
+
+def ensure_index(db, collection_name=COLLECTION):
+    """
+    Crée l'index unique sur fragrantica_id.
+
+    Échoue (OperationFailure) tant que la collection contient des doublons :
+    voir `fix`.
+    """
+    return db[collection_name].create_indexes([ID_INDEX])
+
+
+# Audit côté serveur
+
+def _url_match():
+    return {"$regexFind": {"input": "$url", "regex": URL_PATTERN}}
+
+
+def duplicates_pipeline():
+    """
+    Groupes de documents partageant un numéro Fragrantica.
+
+    Le numéro est `fragrantica_id`, ou extrait de l'URL pour les documents
+    antérieurs. Le document conservé (`keep`) est le plus à jour : schéma le
+    plus récent, puis dernière écriture.
+    """
+    return [
+        {"$project": {
+            "url": 1,
+            "schema_version": 1,
+            "updated_at": 1,
+            "key": {"$ifNull": [
+                f"${ID_FIELD}",
+                {"$toInt": {"$arrayElemAt": [{"$let": {
+                    "vars": {"match": _url_match()},
+                    "in": "$$match.captures",
+                }}, 1]}},
+            ]},
+        }},
+        {"$match": {"key": {"$ne": None}}},
+        {"$sort": {"key": 1, "schema_version": -1, "updated_at": -1, "_id": -1}},
+        {"$group": {
+            "_id": "$key",
+            "count": {"$sum": 1},
+            "keep": {"$first": "$_id"},
+            "ids": {"$push": "$_id"},
+            "urls": {"$push": "$url"},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+
+
+def brand_mismatches_pipeline():
+    """
+    Documents dont la marque ne ressemble pas au slug de l'URL.
+
+    Filtre grossier côté serveur (casse, espaces/tirets) ; les candidats sont
+    confirmés par `brand_matches` (accents, apostrophes...).
+    """
+    return [
+        {"$project": {
+            "brand": 1,
+            "url": 1,
+            "slug": {"$arrayElemAt": [{"$let": {
+                "vars": {"match": _url_match()},
+                "in": "$$match.captures",
+            }}, 0]},
+        }},
+        {"$match": {
+            "slug": {"$ne": None},
+            "$expr": {"$ne": [
+                {"$toLower": {"$replaceAll": {
+                    "input": {"$ifNull": ["$brand", ""]}, "find": " ", "replacement": "-"
+                }}},
+                {"$toLower": "$slug"},
+            ]},
+        }},
+    ]
+
+
+def find_duplicates(db, collection_name=COLLECTION):
+    """Itère sur les groupes de doublons (voir duplicates_pipeline)."""
+    return db[collection_name].aggregate(duplicates_pipeline(), allowDiskUse=True)
+
+
+def find_brand_mismatches(db, collection_name=COLLECTION):
+    """Itère sur les (document, marque attendue) dont la marque ne correspond pas à l'URL."""
+    for doc in db[collection_name].aggregate(brand_mismatches_pipeline(), allowDiskUse=True):
+        if not brand_matches(doc.get("brand"), doc["slug"]):
+            yield doc, resolve_brand(doc["url"])
+
+
+def audit(db, collection_name=COLLECTION, examples=5):
+    """
+    Compte les doublons et les marques incohérentes, sans rien modifier.
+
+    Returns:
+        dict: {
+            'duplicate_groups': int,
+            'duplicate_documents': int,  # documents en trop
+            'brand_mismatches': int,
+            'missing_ids': int,          # documents sans fragrantica_id
+            'examples': {'duplicates': [...], 'brands': [...]}
+        }
+    """
+    report = {
+        "duplicate_groups": 0,
+        "duplicate_documents": 0,
+        "brand_mismatches": 0,
+        "missing_ids": db[collection_name].count_documents({ID_FIELD: {"$exists": False}}),
+        "examples": {"duplicates": [], "brands": []},
+    }
+    for group in find_duplicates(db, collection_name):
+        report["duplicate_groups"] += 1
+        report["duplicate_documents"] += group["count"] - 1
+        if len(report["examples"]["duplicates"]) < examples:
+            report["examples"]["duplicates"].append(group)
+    for doc, expected in find_brand_mismatches(db, collection_name):
+        report["brand_mismatches"] += 1
+        if len(report["examples"]["brands"]) < examples:
+            report["examples"]["brands"].append((doc["url"], doc.get("brand"), expected))
+    return report
+
+
+def _write(collection, requests):
+    if requests:
+        collection.bulk_write(requests, ordered=False)
+
+
+def fix(db, collection_name=COLLECTION, batch_size=BATCH_SIZE):
+    """
+    Corrige perfume_data en place puis crée l'index unique.
+
+    1. `fragrantica_id` calculé côté serveur pour les documents qui n'en ont
+       pas (une mise à jour par pipeline) ;
+    2. doublons supprimés, en gardant le document le plus à jour ;
+    3. marques incohérentes remplacées par celle de l'URL (updated_at
+       avancé : la correction est vue par /api/changes).
+
+    À lancer spiders arrêtés. Les compteurs designer_stats sont à
+    reconstruire ensuite (les marques ont pu changer).
+
+    Returns:
+        dict: {'ids_set': int, 'duplicates_removed': int, 'brands_fixed': int}
+    """
+    collection = db[collection_name]
+    stats = {"ids_set": 0, "duplicates_removed": 0, "brands_fixed": 0}
+
+    result = collection.update_many(
+        {ID_FIELD: {"$exists": False}, "url": {"$regex": URL_PATTERN}},
+        [{"$set": {ID_FIELD: {"$toInt": {"$arrayElemAt": [{"$let": {
+            "vars": {"match": _url_match()},
+            "in": "$$match.captures",
+        }}, 1]}}}}],
+    )
+    stats["ids_set"] = result.modified_count
+
+    # Les suppressions sont cumulées : un DeleteMany par lot d'_id
+    doomed = []
+    for group in find_duplicates(db, collection_name):
+        doomed.extend(_id for _id in group["ids"] if _id != group["keep"])
+        if len(doomed) >= batch_size:
+            _write(collection, [DeleteMany({"_id": {"$in": doomed}})])
+            stats["duplicates_removed"] += len(doomed)
+            doomed = []
+    if doomed:
+        _write(collection, [DeleteMany({"_id": {"$in": doomed}})])
+        stats["duplicates_removed"] += len(doomed)
+
+    now = utcnow()
+    updates = []
+    for doc, expected in find_brand_mismatches(db, collection_name):
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"brand": expected, "updated_at": now}}))
+        if len(updates) >= batch_size:
+            _write(collection, updates)
+            stats["brands_fixed"] += len(updates)
+            updates = []
+    _write(collection, updates)
+    stats["brands_fixed"] += len(updates)
+
+    ensure_index(db, collection_name)
+    return stats
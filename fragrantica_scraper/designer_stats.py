@@ -0,0 +1,186 @@
+# designer_stats.py
+"""
+Compteurs par designer, tenus à jour par les pipelines.
+
+Un document par designer dans la collection `designer_stats` :
+
+    {
+        "_id": "Dior",
+        "urls_found": 412,        # URLs insérées par MongoPerfumeURLsPipeline
+        "perfumes_scraped": 398,  # parfums insérés par MongoPerfumeDataPipeline
+                                  # (champ `designer` de l'item, comme urls_found)
+        "remaining": 14,          # urls_found - perfumes_scraped
+        "last_activity": datetime # dernière insertion (UTC)
+    }
+
+Les pipelines cumulent les incréments en mémoire et les écrivent par lots
+(un `$inc` + `$max` upserté par designer touché) : les « top designers »
+et les designers entièrement scrapés deviennent des lectures indexées
+d'une petite collection, au lieu d'un `$group` sur toutes les URLs ou tous
+les parfums.
+
+Les compteurs sont reconstructibles à partir des collections sources
+(`rebuild`, commande `rebuild-designer-stats` de scripts/mongo_utils.py),
+par exemple après un import hors pipeline ou une purge.
+"""
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+COLLECTION = "designer_stats"
+
+URLS_FOUND = "urls_found"
+PERFUMES_SCRAPED = "perfumes_scraped"
+
+INDEXES = [
+    # Top designers par URLs découvertes / par parfums scrapés
+    IndexModel([(URLS_FOUND, DESCENDING)]),
+    IndexModel([(PERFUMES_SCRAPED, DESCENDING)]),
+    # Designers entièrement scrapés : remaining <= 0
+    IndexModel([("remaining", ASCENDING)]),
+]
+
+
+def utcnow():
+    """Datetime UTC naïf, comparable aux dates relues depuis MongoDB."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def designer_of(document):
+    """
+    Designer d'un parfum pour les compteurs : le designer du listing
+    (champ `designer`), la marque pour les documents antérieurs au champ.
+    """
+    return document.get("designer") or document.get("brand")
+
+
+def ensure_indexes(db):
+    """Crée les index de designer_stats (idempotent)."""
+    db[COLLECTION].create_indexes(INDEXES)
+
+
+class DesignerStatsBuffer:
+    """
+    Incréments en attente d'écriture, regroupés par designer.
+
+    Une insertion d'item ne coûte qu'une mise à jour de dictionnaire ; les
+    compteurs sont écrits toutes les `flush_every` insertions et à la
+    fermeture du spider. Les URLs arrivant designer par designer, un lot ne
+    touche en général qu'un ou deux documents.
+    """
+
+    def __init__(self, flush_every=100):
+        self.flush_every = flush_every
+        self.pending = {}  # {designer: {"counts": {champ: n}, "last_activity": datetime}}
+        self.added = 0
+
+    def add(self, designer, field, now=None):
+        """
+        Compte une insertion pour `designer`.
+
+        Returns:
+            bool: True si le lot doit être écrit (voir flush)
+        """
+        entry = self.pending.setdefault(designer or "Unknown", {"counts": {}, "last_activity": None})
+        entry["counts"][field] = entry["counts"].get(field, 0) + 1
+        entry["last_activity"] = now or utcnow()
+        self.added += 1
+        return self.added >= self.flush_every
+
+    def updates(self):
+        """[(filtre, mise à jour)] correspondant aux incréments en attente."""
+        updates = []
+        for designer, entry in self.pending.items():
+            counts = entry["counts"]
+            increments = dict(counts)
+            increments["remaining"] = counts.get(URLS_FOUND, 0) - counts.get(PERFUMES_SCRAPED, 0)
+            updates.append((
+                {"_id": designer},
+                {"$inc": increments, "$max": {"last_activity": entry["last_activity"]}}
+            ))
+        return updates
+
+    def flush(self, db):
+        """
+        Écrit les incréments en attente dans designer_stats.
+
+        Returns:
+            int: Nombre de designers mis à jour
+        """
+        updates = self.updates()
+        self.pending = {}
+        self.added = 0
+        collection = db[COLLECTION]
+        for query, update in updates:
+            collection.update_one(query, update, upsert=True)
+        return len(updates)
+
+
+def top_designers(db, field=URLS_FOUND, limit=5):
+    """[{'_id': designer, field: n, ...}] triés par `field` décroissant (lecture indexée)."""
+    return list(db[COLLECTION].find({field: {"$gt": 0}}).sort(field, DESCENDING).limit(limit))
+
+
+def fully_scraped(db):
+    """Designers dont toutes les URLs découvertes ont été scrapées."""
+    return list(db[COLLECTION].find(
+        {"remaining": {"$lte": 0}, URLS_FOUND: {"$gt": 0}},
+        {"_id": 1}
+    ).sort("remaining", ASCENDING))
+
+
+def designer_count(db, field=URLS_FOUND):
+    """Nombre de designers ayant au moins une URL (ou un parfum, selon `field`)."""
+    return db[COLLECTION].count_documents({field: {"$gt": 0}})
+
+
+def _grouped(collection, key):
+    """{designer: (nombre, date du dernier document)} par `$group` sur `key` (expression)."""
+    pipeline = [{"$group": {"_id": key, "count": {"$sum": 1}, "last_id": {"$max": "$_id"}}}]
+    grouped = {}
+    for doc in collection.aggregate(pipeline, allowDiskUse=True):
+        last_id = doc.get("last_id")
+        last_activity = getattr(last_id, "generation_time", None)
+        if last_activity is not None:
+            last_activity = last_activity.replace(tzinfo=None)
+        designer = doc["_id"] or "Unknown"
+        # Champ absent et "Unknown" sont comptés ensemble, comme dans DesignerStatsBuffer
+        count, previous = grouped.get(designer, (0, None))
+        grouped[designer] = (count + doc["count"], max(filter(None, (previous, last_activity)), default=None))
+    return grouped
+
+
+def rebuild(db, urls_collection="perfume_urls", data_collection="perfume_data"):
+    """
+    Recalcule designer_stats à partir des collections sources.
+
+    Seule opération qui parcourt toutes les URLs et tous les parfums ; la
+    date d'activité est celle du dernier _id (ObjectId) de chaque designer.
+
+    Returns:
+        int: Nombre de designers écrits
+    """
+    urls = _grouped(db[urls_collection], "$designer")
+    # Comme designer_of : marque pour les documents antérieurs au champ
+    data = _grouped(db[data_collection], {"$ifNull": ["$designer", "$brand"]})
+
+    documents = []
+    for designer in sorted(urls.keys() | data.keys()):
+        urls_found, urls_at = urls.get(designer, (0, None))
+        scraped, scraped_at = data.get(designer, (0, None))
+        documents.append({
+            "_id": designer,
+            URLS_FOUND: urls_found,
+            PERFUMES_SCRAPED: scraped,
+            "remaining": urls_found - scraped,
+            "last_activity": max(filter(None, (urls_at, scraped_at)), default=None),
+        })
+
+    # Les compteurs écrits pendant la reconstruction seraient perdus :
+    # à lancer spiders arrêtés
+    collection = db[COLLECTION]
+    collection.delete_many({})
+    if documents:
+        collection.insert_many(documents)
+    ensure_indexes(db)
+    return len(documents)
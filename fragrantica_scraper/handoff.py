@@ -0,0 +1,112 @@
+# handoff.py
+"""
+Passage direct des URLs découvertes au spider de données.
+
+Quand les deux spiders tournent dans le même processus (run_scrapers.py),
+chaque URL sauvegardée par PerfumeURLsSpider est transmise à PerfumeSpider,
+qui la planifie aussitôt au lieu d'attendre la fin de la découverte.
+Le canal est désigné par son nom dans le setting URL_HANDOFF.
+"""
+import logging
+from collections import deque
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+# Spider qui alimente le canal (les autres crawlers le consomment)
+URL_HANDOFF_PRODUCER = "perfume_urls"
+
+
+class UrlHandoff:
+    """Canal en mémoire entre le spider d'URLs et le spider de données."""
+
+    _channels = {}
+
+    def __init__(self):
+        self.closed = False
+        self.sent = 0
+        self._consumer = None
+        self._detached = False
+        self._pending = deque()
+
+    @classmethod
+    def shared(cls, name):
+        """Retourne le canal nommé, partagé par tous les crawlers du processus."""
+        if name not in cls._channels:
+            cls._channels[name] = cls()
+        return cls._channels[name]
+
+    @classmethod
+    def discard(cls, name):
+        """Oublie un canal (fin de run)."""
+        cls._channels.pop(name, None)
+
+    def attach(self, consumer):
+        """
+        Branche le consommateur et lui transmet les URLs en attente.
+
+        Args:
+            consumer (callable): consumer(url, designer)
+        """
+        self._consumer = consumer
+        while self._pending:
+            self._deliver(*self._pending.popleft())
+
+    def detach(self):
+        """Débranche le consommateur (arrêté) : les URLs suivantes sont ignorées."""
+        self._consumer = None
+        self._detached = True
+        self._pending.clear()
+
+    def put(self, url, designer):
+        """Transmet une URL (mise en attente tant qu'aucun consommateur n'est branché)."""
+        if self._detached:
+            return
+        if self._consumer is None:
+            self._pending.append((url, designer))
+        else:
+            self._deliver(url, designer)
+
+    def close(self):
+        """Signale la fin de la découverte : le consommateur peut se terminer."""
+        self.closed = True
+
+    def _deliver(self, url, designer):
+        self.sent += 1
+        self._consumer(url, designer)
+
+
+class UrlHandoffExtension:
+    """
+    Côté producteur : pousse dans le canal chaque URL sortie des pipelines
+    (donc déjà sauvegardée) et ferme le canal à l'arrêt du spider.
+    """
+
+    def __init__(self, handoff):
+        self.handoff = handoff
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        name = crawler.settings.get('URL_HANDOFF')
+        if not name:
+            raise NotConfigured
+
+        ext = cls(UrlHandoff.shared(name))
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def item_scraped(self, item, response, spider):
+        if spider.name != URL_HANDOFF_PRODUCER:
+            return
+        url = item.get("perfume_url")
+        if url:
+            self.handoff.put(url, item.get("designer", "Unknown"))
+
+    def spider_closed(self, spider, reason):
+        if spider.name != URL_HANDOFF_PRODUCER:
+            return
+        self.handoff.close()
+        logger.info(f"✓ URL handoff closed ({self.handoff.sent} URLs handed off, reason: {reason})")
@@ -0,0 +1,173 @@
+# ingest.py
+"""
+Écriture idempotente des parfums dans perfume_data.
+
+MongoPerfumeDataPipeline cumule les items et les écrit par lots :
+
+1. une lecture `$in` des documents déjà stockés (numéro Fragrantica ou URL),
+   limitée à leur empreinte de contenu (`content_hash`) ;
+2. les items dont l'empreinte n'a pas changé sont ignorés : un re-crawl
+   d'une page identique ne coûte aucune écriture ;
+3. les autres partent en un seul bulk_write de `UpdateOne(upsert=True)` :
+   `$set` pour le contenu et updated_at, `$setOnInsert` pour created_at.
+
+Ré-écrire un item est sans effet (même filtre, même contenu) : un re-crawl
+met les documents à jour en place, sans doublon ni DuplicateKeyError.
+"""
+import hashlib
+import json
+import time
+
+import bson
+from pymongo.errors import BulkWriteError
+
+from fragrantica_scraper.canonical import ID_FIELD
+from fragrantica_scraper.designer_stats import utcnow
+from fragrantica_scraper.mongo import bulk_update
+
+HASH_FIELD = "content_hash"
+
+# Signal Scrapy envoyé par MongoPerfumeDataPipeline après chaque lot
+# (documents=[...], écrits ou inchangés) : mesure de la latence item -> base
+perfumes_written = object()
+
+# Champs hors contenu : ne changent pas l'empreinte
+VOLATILE_FIELDS = ("_id", "created_at", "updated_at", HASH_FIELD)
+
+
+def content_hash(document):
+    """Empreinte SHA-1 du contenu d'un document (ordre des clés indifférent)."""
+    content = {key: value for key, value in document.items() if key not in VOLATILE_FIELDS}
+    raw = json.dumps(content, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def document_key(document):
+    """Filtre d'identité : numéro Fragrantica, sinon URL."""
+    if document.get(ID_FIELD) is not None:
+        return {ID_FIELD: document[ID_FIELD]}
+    return {"url": document["url"]}
+
+
+class PerfumeWriteBuffer:
+    """
+    Documents en attente d'écriture, un par parfum (le dernier reçu).
+
+    Le lot est écrit toutes les `batch_size` entrées, quand la plus ancienne
+    attend depuis `max_delay` secondes, et à la fermeture du spider.
+    """
+
+    def __init__(self, batch_size=100, max_delay=5.0):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.pending = {}  # {(champ, valeur): document}
+        self.since = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, document):
+        """
+        Ajoute un document au lot.
+
+        Returns:
+            bool: True si le lot doit être écrit (voir flush)
+        """
+        if not self.pending:
+            self.since = time.monotonic()
+        ((field, value),) = document_key(document).items()
+        self.pending[(field, value)] = document
+        return len(self.pending) >= self.batch_size or self.is_due()
+
+    def is_due(self):
+        """True si le plus ancien document attend depuis `max_delay` secondes."""
+        return bool(self.pending) and time.monotonic() - self.since >= self.max_delay
+
+    def _stored(self, collection, documents):
+        """{(champ, valeur): document stocké (_id, numéro, URL, empreinte)}."""
+        ids = [doc[ID_FIELD] for doc in documents if doc.get(ID_FIELD) is not None]
+        urls = [doc["url"] for doc in documents]
+        clauses = [{"url": {"$in": urls}}]
+        if ids:
+            clauses.append({ID_FIELD: {"$in": ids}})
+        query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+        stored = {}
+        for doc in collection.find(query, {ID_FIELD: 1, "url": 1, HASH_FIELD: 1}):
+            if doc.get(ID_FIELD) is not None:
+                stored[(ID_FIELD, doc[ID_FIELD])] = doc
+            stored.setdefault(("url", doc.get("url")), doc)
+        return stored
+
+    def updates(self, stored, now):
+        """
+        Mises à jour à écrire pour les documents en attente.
+
+        Un document déjà stocké (par numéro, ou par URL s'il n'a pas encore
+        de numéro) est mis à jour par _id ; les autres sont upsertés sur
+        leur clé d'identité.
+
+        Returns:
+            tuple: ([(filtre, mise à jour, upsert)], [documents écrits], nombre inchangés)
+        """
+        updates, written, unchanged = [], [], 0
+        for (field, value), document in self.pending.items():
+            fingerprint = content_hash(document)
+            previous = stored.get((field, value)) or stored.get(("url", document["url"]))
+            if previous is not None and previous.get(HASH_FIELD) == fingerprint:
+                unchanged += 1
+                continue
+
+            content = {k: v for k, v in document.items() if k not in VOLATILE_FIELDS}
+            update = {"$set": {**content, HASH_FIELD: fingerprint, "updated_at": now}}
+            if previous is not None:
+                updates.append(({"_id": previous["_id"]}, update, False))
+            else:
+                update["$setOnInsert"] = {"created_at": now}
+                updates.append(({field: value}, update, True))
+            written.append(document)
+        return updates, written, unchanged
+
+    def flush(self, collection, now=None):
+        """
+        Écrit le lot en attente : une lecture `$in`, un bulk_write.
+
+        Returns:
+            dict: {
+                'inserted': list[dict],  # documents créés (compteurs designer_stats)
+                'updated': int,
+                'unchanged': int,        # empreinte identique : pas d'écriture
+                'writes': int,           # opérations envoyées
+                'bytes': int,            # taille BSON des opérations envoyées
+                'errors': list,          # writeErrors d'un BulkWriteError
+                'documents': list[dict]  # tout le lot traité
+            }
+        """
+        if not self.pending:
+            return {
+                "inserted": [], "updated": 0, "unchanged": 0, "writes": 0, "bytes": 0,
+                "errors": [], "documents": []
+            }
+
+        documents = list(self.pending.values())
+        updates, written, unchanged = self.updates(self._stored(collection, documents), now or utcnow())
+        self.pending = {}
+        self.since = None
+
+        errors = []
+        try:
+            upserted, modified = bulk_update(collection, updates)
+        except BulkWriteError as e:
+            upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+            modified = e.details.get("nModified", 0)
+            errors = e.details.get("writeErrors", [])
+
+        return {
+            "inserted": [written[index] for index in sorted(upserted)],
+            "updated": modified,
+            "unchanged": unchanged,
+            "writes": len(updates),
+            "bytes": sum(len(bson.encode(query)) + len(bson.encode(update)) for query, update, _ in updates),
+            "errors": errors,
+            "documents": documents,
+        }
@@ -1,8 +1,39 @@
 # items.py
 import scrapy
 
+# Version du schéma des items de parfums.
+# À incrémenter à chaque ajout/modification de champ extrait par le parser :
+# les documents stockés avec une version inférieure seront re-scrapés.
+ITEM_SCHEMA_VERSION = 2
+
+
 class FragranticaPerfumeItem(scrapy.Item):
     name = scrapy.Field()
     brand = scrapy.Field()
     accords = scrapy.Field()  # dict {accord: pourcentage}
-    url = scrapy.Field()
\ No newline at end of file
+    url = scrapy.Field()
+    fragrantica_id = scrapy.Field()  # int, numéro en fin d'URL (clé de dédoublonnage)
+    designer = scrapy.Field()  # designer du listing (clé des compteurs designer_stats)
+
+    # Champs ajoutés en schéma v2
+    description = scrapy.Field()
+    notes = scrapy.Field()  # dict {"top": [...], "middle": [...], "base": [...]}
+    rating = scrapy.Field()  # float, note moyenne sur 5
+    votes = scrapy.Field()  # int, nombre de votes
+    year = scrapy.Field()  # int, année de sortie
+    gender = scrapy.Field()  # "women", "men", "unisex"
+    image_url = scrapy.Field()
+
+    schema_version = scrapy.Field()
+
+
+class DesignerStateItem(scrapy.Item):
+    """État de découverte d'un designer (émis une fois, après sa dernière page)."""
+    designer = scrapy.Field()
+    designer_url = scrapy.Field()
+    perfume_count = scrapy.Field()  # nombre de liens parfums vus sur toutes les pages
+    links_hash = scrapy.Field()  # empreinte SHA-1 de la liste triée des liens
+    fetched_at = scrapy.Field()  # datetime UTC du dernier fetch
+    unchanged_runs = scrapy.Field()  # fetchs consécutifs sans changement
+    pages = scrapy.Field()  # nombre de pages parcourues
+    complete = scrapy.Field()  # True si toutes les pages ont été énumérées
@@ -0,0 +1,237 @@
+# metrics.py
+"""
+Métriques Prometheus du crawl, exposées sur un port local.
+
+Activation: METRICS_ENABLED=True (port METRICS_PORT, défaut 9410), puis
+    curl http://localhost:9410/metrics
+
+Métriques (préfixe fragrantica_) :
+- download_latency_seconds{spider,callback}   latence de téléchargement
+- parse_seconds{spider,callback}              temps passé dans les callbacks
+- responses_total{spider,status}              réponses par code (dont 429)
+- items_total{spider} / items_dropped_total   items sortis des pipelines
+                                              (items/s = rate(items_total))
+- pipeline_queue_depth{spider}                items en cours dans les pipelines
+- throttle_delay_seconds{spider,slot}         délai AutoThrottle par slot
+- mongo_command_seconds{command,collection}   latence des commandes MongoDB
+
+Les métriques sont communes au processus : avec run_scrapers.py, les deux
+spiders sont exposés sur le même port, distingués par le label `spider`.
+"""
+import logging
+import time
+
+from pymongo import monitoring
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+except ImportError:  # dépendance optionnelle
+    CollectorRegistry = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+_metrics = None
+_servers = {}
+_mongo_listener = None
+
+
+def get_metrics():
+    """Crée (une fois par processus) le registre et les métriques."""
+    global _metrics
+    if _metrics is None:
+        registry = CollectorRegistry()
+        _metrics = {
+            "registry": registry,
+            "download_latency": Histogram(
+                "fragrantica_download_latency_seconds", "Latence de téléchargement",
+                ["spider", "callback"], buckets=LATENCY_BUCKETS, registry=registry),
+            "parse": Histogram(
+                "fragrantica_parse_seconds", "Temps passé dans le callback",
+                ["spider", "callback"], buckets=PARSE_BUCKETS, registry=registry),
+            "responses": Counter(
+                "fragrantica_responses_total", "Réponses reçues par code HTTP",
+                ["spider", "status"], registry=registry),
+            "items": Counter(
+                "fragrantica_items_total", "Items sortis des pipelines",
+                ["spider"], registry=registry),
+            "items_dropped": Counter(
+                "fragrantica_items_dropped_total", "Items rejetés par les pipelines",
+                ["spider"], registry=registry),
+            "pipeline_queue": Gauge(
+                "fragrantica_pipeline_queue_depth", "Items en cours dans les pipelines",
+                ["spider"], registry=registry),
+            "throttle_delay": Gauge(
+                "fragrantica_throttle_delay_seconds", "Délai courant par slot de téléchargement",
+                ["spider", "slot"], registry=registry),
+            "mongo_command": Histogram(
+                "fragrantica_mongo_command_seconds", "Latence des commandes MongoDB",
+                ["command", "collection"], buckets=LATENCY_BUCKETS, registry=registry),
+        }
+    return _metrics
+
+
+def callback_name(request):
+    """Nom du callback d'une requête ('parse' par défaut)."""
+    return getattr(request.callback, "__name__", "parse")
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Listener pymongo : latence de chaque commande, par collection."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event):
+        self._observe(event)
+
+    def failed(self, event):
+        self._observe(event)
+
+    def _observe(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        self.histogram.labels(event.command_name, collection).observe(
+            event.duration_micros / 1e6
+        )
+
+
+class ScraperMetrics:
+    """Extension Scrapy qui alimente les métriques et démarre le serveur HTTP."""
+
+    def __init__(self, crawler, metrics, interval):
+        self.crawler = crawler
+        self.metrics = metrics
+        self.interval = interval
+        self.spider_name = None
+        self.sampler = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        if CollectorRegistry is None:
+            logger.warning("⚠️  prometheus_client non installé : métriques désactivées")
+            raise NotConfigured
+
+        metrics = get_metrics()
+        cls._start_server(crawler.settings.getint('METRICS_PORT', 9410), metrics["registry"])
+        cls._register_mongo_listener(metrics)
+
+        ext = cls(crawler, metrics, crawler.settings.getfloat('METRICS_SAMPLE_INTERVAL', 5))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        # response_downloaded : émis avant les middlewares de téléchargement,
+        # donc aussi pour un 429 que StopOn429Middleware transforme en IgnoreRequest
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.item_dropped, signal=signals.item_dropped)
+        return ext
+
+    @staticmethod
+    def _start_server(port, registry):
+        if port not in _servers:
+            _servers[port] = start_http_server(port, registry=registry)
+            logger.info(f"📈 Metrics on http://localhost:{port}/metrics")
+
+    @staticmethod
+    def _register_mongo_listener(metrics):
+        # Enregistré avant l'ouverture des pipelines : s'applique à leurs clients
+        global _mongo_listener
+        if _mongo_listener is None:
+            _mongo_listener = MongoCommandMetrics(metrics["mongo_command"])
+            monitoring.register(_mongo_listener)
+
+    def spider_opened(self, spider):
+        self.spider_name = spider.name
+        self.sampler = task.LoopingCall(self.sample)
+        self.sampler.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.sampler and self.sampler.running:
+            self.sampler.stop()
+        self.sample()
+
+    def response_downloaded(self, response, request, spider):
+        self.metrics["responses"].labels(spider.name, str(response.status)).inc()
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.metrics["download_latency"].labels(
+                spider.name, callback_name(request)
+            ).observe(latency)
+
+    def item_scraped(self, item, response, spider):
+        self.metrics["items"].labels(spider.name).inc()
+
+    def item_dropped(self, item, response, exception, spider):
+        self.metrics["items_dropped"].labels(spider.name).inc()
+
+    def sample(self):
+        """Relève les jauges : file des pipelines et délais des slots."""
+        engine = self.crawler.engine
+        if engine is None or self.spider_name is None:
+            return
+
+        slot = getattr(engine.scraper, "slot", None)
+        self.metrics["pipeline_queue"].labels(self.spider_name).set(
+            slot.itemproc_size if slot else 0
+        )
+        for key, download_slot in engine.downloader.slots.items():
+            self.metrics["throttle_delay"].labels(self.spider_name, key).set(download_slot.delay)
+
+
+class ParseTimeMiddleware:
+    """
+    Middleware spider qui mesure le temps passé dans les callbacks.
+
+    Placé au plus près du spider : seul le temps d'itération du résultat du
+    callback est compté, pas le traitement des items en aval.
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED') or CollectorRegistry is None:
+            raise NotConfigured
+        return cls(get_metrics()["parse"])
+
+    def process_spider_output(self, response, result, spider):
+        observer = self.histogram.labels(spider.name, callback_name(response.request))
+        elapsed = 0.0
+        iterator = iter(result)
+        while True:
+            started = time.perf_counter()
+            try:
+                output = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            yield output
+        observer.observe(elapsed)
+
+    async def process_spider_output_async(self, response, result, spider):
+        observer = self.histogram.labels(spider.name, callback_name(response.request))
+        elapsed = 0.0
+        iterator = result.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                output = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            yield output
+        observer.observe(elapsed)
@@ -1,7 +1,10 @@
 # middlewares.py
 import random
+import threading
+import time
 from scrapy import signals
-from scrapy.exceptions import IgnoreRequest
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from twisted.internet.task import deferLater
 class StopOn429Middleware:
     """Middleware to stop spider when encountering HTTP 429 (Too Many Requests)."""
     
@@ -40,4 +43,70 @@ class RotateUserAgentMiddleware:
     
     def process_request(self, request, spider):
         """Set a random user agent for each request."""
-        request.headers['User-Agent'] = random.choice(self.user_agents)
\ No newline at end of file
+        request.headers['User-Agent'] = random.choice(self.user_agents)
+
+
+class RateBudget:
+    """
+    Budget global de requêtes par seconde, partagé par tous les crawlers du
+    processus qui utilisent le même nom (token bucket à créneaux réservés).
+    """
+    
+    _budgets = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, rate, burst=1):
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._next_slot = 0.0
+    
+    @classmethod
+    def shared(cls, name, rate, burst=1):
+        """Retourne le budget nommé, créé au premier appel."""
+        with cls._lock:
+            if name not in cls._budgets:
+                cls._budgets[name] = cls(rate, burst)
+            return cls._budgets[name]
+    
+    def reserve(self):
+        """Réserve le prochain créneau et retourne l'attente (s) avant de l'utiliser."""
+        now = time.monotonic()
+        with self._lock:
+            # Jusqu'à `burst` créneaux inutilisés peuvent être rattrapés d'un coup
+            slot = max(self._next_slot, now - (self.burst - 1) * self.interval)
+            self._next_slot = slot + self.interval
+        return max(0.0, slot - now)
+
+
+class SharedRateLimitMiddleware:
+    """
+    Middleware qui retarde chaque requête selon un budget global partagé
+    (GLOBAL_RATE_LIMIT requêtes/s), pour que plusieurs spiders lancés dans
+    le même processus restent ensemble sous la même limite.
+    """
+    
+    def __init__(self, budget):
+        self.budget = budget
+    
+    @classmethod
+    def from_crawler(cls, crawler):
+        """Désactivé si GLOBAL_RATE_LIMIT vaut 0."""
+        rate = crawler.settings.getfloat('GLOBAL_RATE_LIMIT', 0)
+        if rate <= 0:
+            raise NotConfigured
+        
+        budget = RateBudget.shared(
+            crawler.settings.get('GLOBAL_RATE_BUDGET_NAME', 'global'),
+            rate,
+            burst=crawler.settings.getint('GLOBAL_RATE_BURST', 1)
+        )
+        return cls(budget)
+    
+    def process_request(self, request, spider):
+        """Attend le créneau réservé avant de laisser passer la requête."""
+        delay = self.budget.reserve()
+        if delay > 0:
+            # Import tardif : au chargement du module, il installerait le
+            # reactor par défaut avant le TWISTED_REACTOR (asyncio) de Scrapy
+            from twisted.internet import reactor
+            return deferLater(reactor, delay, lambda: None)
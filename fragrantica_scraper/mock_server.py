@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# mock_server.py
+"""
+Serveur Fragrantica local pour les tests de charge du crawl.
+
+Sert un site synthétique (index des designers, pages designers paginées,
+pages parfums) avec le même balisage que celui parsé par PerfumeURLsSpider
+et PerfumeSpider. Latence, proportion de réponses 429 et volumétrie sont
+configurables.
+
+Usage: python -m fragrantica_scraper.mock_server [--port 8000] [--designers 50] [--perfumes 20]
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+ACCORDS = [
+    "woody", "citrus", "floral", "white floral", "sweet", "powdery", "fresh",
+    "aromatic", "amber", "musky", "fruity", "vanilla", "warm spicy", "green",
+    "leather", "oud", "marine", "earthy", "lactonic", "tobacco",
+]
+
+NOTES = [
+    "Bergamot", "Lemon", "Pear", "Mandarin Orange", "Pink Pepper", "Lavender",
+    "Jasmine", "Rose", "Orris Root", "Iris", "Cedar", "Sandalwood", "Vanilla",
+    "Musk", "Patchouli", "Amber", "Vetiver", "Tonka Bean", "Oud", "Leather",
+]
+
+GENDERS = ["for women", "for men", "for women and men"]
+
+PERFUME_PATH = re.compile(r"^/perfume/([^/]+)/([^/]+)-(\d+)\.html$")
+DESIGNER_PATH = re.compile(r"^/designers/([^/]+)\.html$")
+
+
+class MockFragrantica:
+    """
+    Site Fragrantica synthétique et déterministe.
+
+    Les designers sont numérotés, chaque designer a le même nombre de
+    parfums et les IDs de parfums sont séquentiels.
+    """
+
+    def __init__(self, designers=20, perfumes_per_designer=10, page_size=50):
+        self.designers = [
+            (f"Designer {i:04d}", f"Designer-{i:04d}") for i in range(1, designers + 1)
+        ]
+        self.perfumes_per_designer = perfumes_per_designer
+        self.page_size = page_size
+        self._designer_index = {slug: i for i, (_, slug) in enumerate(self.designers)}
+
+    @property
+    def total_perfumes(self):
+        return len(self.designers) * self.perfumes_per_designer
+
+    def perfume_ids(self, designer_position):
+        first = 1000 + designer_position * self.perfumes_per_designer
+        return range(first, first + self.perfumes_per_designer)
+
+    def render_index(self):
+        links = "\n".join(
+            f'  <div class="cell designerlist"><a href="/designers/{slug}.html">{name}</a></div>'
+            for name, slug in self.designers
+        )
+        return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Perfume Designers</title></head>
+<body>
+<div class="grid-x grid-margin-x">
+  <h1>Perfume Designers</h1>
+{links}
+</div>
+</body></html>"""
+
+    def render_designer(self, slug, page=1):
+        position = self._designer_index.get(slug)
+        if position is None:
+            return None
+
+        name = self.designers[position][0]
+        ids = list(self.perfume_ids(position))
+        start = (page - 1) * self.page_size
+        page_ids = ids[start:start + self.page_size]
+        if not page_ids and page > 1:
+            return None
+
+        links = "\n".join(
+            f'  <div class="cell prefumeHbox"><h3>'
+            f'<a href="/perfume/{slug}/Perfume-{pid}.html">Perfume {pid}</a></h3></div>'
+            for pid in page_ids
+        )
+        pagination = ""
+        if start + self.page_size < len(ids):
+            pagination = (
+                f'  <ul class="pagination"><li>'
+                f'<a href="/designers/{slug}.html?page={page + 1}" rel="next">Next</a>'
+                f'</li></ul>'
+            )
+        return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{name} perfumes and colognes</title></head>
+<body>
+<div class="grid-x grid-margin-x">
+  <h1>{name} perfumes and colognes</h1>
+{links}
+{pagination}
+</div>
+</body></html>"""
+
+    def render_perfume(self, slug, perfume_id):
+        position = self._designer_index.get(slug)
+        if position is None or perfume_id not in self.perfume_ids(position):
+            return None
+
+        designer = self.designers[position][0]
+        rng = random.Random(perfume_id)
+        accords = sorted(
+            ((a, rng.uniform(30, 100)) for a in rng.sample(ACCORDS, rng.randint(4, 10))),
+            key=lambda x: x[1], reverse=True
+        )
+        accords[0] = (accords[0][0], 100.0)
+        bars = "\n".join(
+            f'      <div class="w-full"><div style="width: {value:.4f}%;">'
+            f'<span class="truncate">{accord}</span></div></div>'
+            for accord, value in accords
+        )
+        pyramid = "\n".join(
+            f"    <h4><b>{level} Notes</b></h4>\n"
+            f'    <div style="display: flex;">'
+            + "".join(
+                f'<div><a href="/notes/{note.replace(" ", "-")}.html"><img alt="{note}"></a>{note}</div>'
+                for note in rng.sample(NOTES, rng.randint(1, 4))
+            )
+            + "</div>"
+            for level in ("Top", "Middle", "Base")
+        )
+        year = rng.randint(1950, 2025)
+        gender = rng.choice(GENDERS)
+        return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>Perfume {perfume_id} {designer} {gender}</title>
+<meta property="og:image" content="https://fimgs.net/mdimg/perfume/o.{perfume_id}.jpg">
+</head>
+<body>
+<div id="toptop">
+  <h1 itemprop="name">Perfume {perfume_id} {designer} <small>{gender}</small></h1>
+  <img itemprop="image" src="https://fimgs.net/mdimg/perfume/375x500.{perfume_id}.jpg">
+  <span itemprop="ratingValue">{rng.uniform(2.5, 4.8):.2f}</span>
+  <span itemprop="ratingCount">{rng.randint(10, 30000):,}</span>
+  <div class="cell small-12">
+    <div class="flex flex-col w-full">
+{bars}
+    </div>
+  </div>
+  <div itemprop="description">
+    <p>Perfume {perfume_id} by {designer} is a fragrance {gender}. Perfume {perfume_id} was launched in {year}.</p>
+  </div>
+  <div id="pyramid">
+{pyramid}
+  </div>
+</div>
+</body></html>"""
+
+
+class MockFragranticaServer(ThreadingHTTPServer):
+    """Serveur HTTP/1.1 du site synthétique."""
+
+    daemon_threads = True
+
+    def __init__(self, address, site, latency_ms=0, jitter_ms=0, rate_429=0.0):
+        super().__init__(address, MockFragranticaHandler)
+        self.site = site
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.requests_count = 0
+        self.count_429 = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_delay_and_status(self):
+        """Tire la latence et le code 429 éventuel d'une requête."""
+        with self._lock:
+            self.requests_count += 1
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            throttled = self._rng.random() < self.rate_429
+            if throttled:
+                self.count_429 += 1
+        return max(delay, 0) / 1000, throttled
+
+
+class MockFragranticaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        delay, throttled = self.server.next_delay_and_status()
+        if delay:
+            time.sleep(delay)
+
+        if throttled:
+            self._send(429, "Too Many Requests")
+            return
+
+        body = self._route()
+        if body is None:
+            self._send(404, "Not Found")
+        else:
+            self._send(200, body)
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        site = self.server.site
+
+        if parts.path == "/designers/":
+            return site.render_index()
+
+        match = DESIGNER_PATH.match(parts.path)
+        if match:
+            page = int(parse_qs(parts.query).get("page", ["1"])[0])
+            return site.render_designer(match.group(1), page)
+
+        match = PERFUME_PATH.match(parts.path)
+        if match:
+            return site.render_perfume(match.group(1), int(match.group(3)))
+
+        return None
+
+    def _send(self, status, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, designers=20, perfumes_per_designer=10,
+                      page_size=50, latency_ms=0, jitter_ms=0, rate_429=0.0):
+    """
+    Démarre le serveur dans un thread daemon.
+
+    Returns:
+        MockFragranticaServer: Serveur démarré (voir .base_url, .shutdown())
+    """
+    site = MockFragrantica(designers, perfumes_per_designer, page_size)
+    server = MockFragranticaServer(
+        (host, port), site,
+        latency_ms=latency_ms, jitter_ms=jitter_ms, rate_429=rate_429
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur Fragrantica local")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--designers", type=int, default=50)
+    parser.add_argument("--perfumes", type=int, default=20,
+                        help="Parfums par designer")
+    parser.add_argument("--page-size", type=int, default=50,
+                        help="Parfums par page designer")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-429", type=float, default=0.0,
+                        help="Proportion de réponses 429 (0-1)")
+    args = parser.parse_args()
+
+    server = start_mock_server(
+        args.host, args.port, args.designers, args.perfumes, args.page_size,
+        args.latency_ms, args.jitter_ms, args.rate_429
+    )
+    print(f"🖥️  Mock Fragrantica on {server.base_url}/designers/ "
+          f"({server.site.total_perfumes:,} perfumes)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
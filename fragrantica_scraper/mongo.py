@@ -0,0 +1,76 @@
+# mongo.py
+"""
+Création des clients MongoDB du scraper.
+
+Une URI `mongomock://<nom>` donne une base en mémoire (paquet `mongomock`),
+partagée par tous les clients du processus qui utilisent la même URI :
+spiders et pipelines voient les mêmes données, sans serveur MongoDB.
+Utilisé par le benchmark de crawl contre le serveur Fragrantica local.
+"""
+from pymongo import MongoClient
+
+MOCK_SCHEME = "mongomock://"
+
+_mock_clients = {}
+
+
+def get_mongo_client(uri, **kwargs):
+    """
+    Retourne un client MongoDB pour l'URI donnée.
+
+    Args:
+        uri (str): URI MongoDB, ou mongomock://<nom> pour une base en mémoire
+        **kwargs: Options passées à MongoClient (ignorées pour mongomock)
+
+    Returns:
+        MongoClient: Client pymongo ou mongomock
+    """
+    if not uri.startswith(MOCK_SCHEME):
+        return MongoClient(uri, **kwargs)
+
+    if uri not in _mock_clients:
+        import mongomock
+        _mock_clients[uri] = mongomock.MongoClient()
+    return _mock_clients[uri]
+
+
+def is_mock(collection):
+    """Indique si une collection vient d'un client mongomock."""
+    return type(collection).__module__.startswith("mongomock")
+
+
+def bulk_update(collection, updates):
+    """
+    Envoie des mises à jour en un seul bulk_write non ordonné.
+
+    mongomock n'accepte pas les opérations des versions récentes de pymongo
+    dans bulk_write : elles y sont appliquées une par une.
+
+    Args:
+        collection: Collection pymongo ou mongomock
+        updates (list): [(filtre, mise à jour, upsert)]
+
+    Returns:
+        tuple: ({index de l'opération: _id inséré}, nombre de documents modifiés)
+
+    Raises:
+        BulkWriteError: Échec d'une partie des opérations (pymongo)
+    """
+    if not updates:
+        return {}, 0
+
+    if is_mock(collection):
+        upserted, modified = {}, 0
+        for index, (query, update, upsert) in enumerate(updates):
+            result = collection.update_one(query, update, upsert=upsert)
+            if result.upserted_id is not None:
+                upserted[index] = result.upserted_id
+            modified += result.modified_count
+        return upserted, modified
+
+    from pymongo import UpdateOne
+    result = collection.bulk_write(
+        [UpdateOne(query, update, upsert=upsert) for query, update, upsert in updates],
+        ordered=False
+    )
+    return result.upserted_ids, result.modified_count
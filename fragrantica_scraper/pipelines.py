@@ -1,20 +1,29 @@
 # pipelines.py
 import logging
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from fragrantica_scraper.mongo import get_mongo_client
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
 from itemadapter import ItemAdapter
+from scrapy import signals
+from twisted.internet import task
+from fragrantica_scraper.items import DesignerStateItem
+from fragrantica_scraper import canonical, designer_stats
+from fragrantica_scraper.designer_stats import DesignerStatsBuffer
+from fragrantica_scraper.ingest import PerfumeWriteBuffer, perfumes_written
+from fragrantica_scraper.profiling import profiled, timed
 
 
 class MongoPerfumeURLsPipeline:
     """Pipeline pour sauvegarder les URLs de parfums dans MongoDB."""
     
     collection_name = "perfume_urls"
+    designer_state_collection = "designer_state"
     
-    def __init__(self, mongo_uri, mongo_db):
+    def __init__(self, mongo_uri, mongo_db, stats_flush_items=100):
         self.mongo_uri = mongo_uri
         self.mongo_db = mongo_db
         self.client = None
         self.db = None
+        self.stats_buffer = DesignerStatsBuffer(flush_every=stats_flush_items)
         self.logger = logging.getLogger(self.__class__.__name__)
     
     @classmethod
@@ -22,7 +31,8 @@ class MongoPerfumeURLsPipeline:
         """Récupère la config depuis settings.py"""
         return cls(
             mongo_uri=crawler.settings.get('MONGO_URI', 'mongodb://localhost:27017/'),
-            mongo_db=crawler.settings.get('MONGO_DATABASE', 'fragrantica')
+            mongo_db=crawler.settings.get('MONGO_DATABASE', 'fragrantica'),
+            stats_flush_items=crawler.settings.getint('DESIGNER_STATS_FLUSH_ITEMS', 100)
         )
     
     def open_spider(self, spider):
@@ -31,12 +41,18 @@ class MongoPerfumeURLsPipeline:
             return
         
         try:
-            self.client = MongoClient(self.mongo_uri)
+            self.client = get_mongo_client(self.mongo_uri)
             self.db = self.client[self.mongo_db]
             
             # Créer un index unique sur perfume_url pour éviter les doublons
             self.db[self.collection_name].create_index("perfume_url", unique=True)
             
+            # Un état par page designer
+            self.db[self.designer_state_collection].create_index("designer_url", unique=True)
+            
+            # Compteurs par designer (top designers, designers entièrement scrapés)
+            designer_stats.ensure_indexes(self.db)
+            
             self.logger.info(f"✓ Connected to MongoDB: {self.mongo_db}.{self.collection_name}")
         except PyMongoError as e:
             self.logger.error(f"✗ MongoDB connection failed: {e}")
@@ -47,47 +63,98 @@ class MongoPerfumeURLsPipeline:
         if spider.name != "perfume_urls" or not self.client:
             return
         
+        self._flush_designer_stats()
         self.client.close()
         self.logger.info("✓ MongoDB connection closed")
     
+    @profiled("pipeline.MongoPerfumeURLsPipeline")
     def process_item(self, item, spider):
         """Sauvegarde l'item dans MongoDB."""
         if spider.name != "perfume_urls":
             return item
         
+        if isinstance(item, DesignerStateItem):
+            return self._save_designer_state(item)
+        
         try:
-            adapter = ItemAdapter(item)
-            self.db[self.collection_name].insert_one(dict(adapter))
+            with timed("itemadapter"):
+                document = dict(ItemAdapter(item))
+            with timed("mongo.perfume_urls"):
+                self.db[self.collection_name].insert_one(document)
             self.logger.debug(f"✓ Inserted URL: {item.get('perfume_url')}")
+            if self.stats_buffer.add(document.get('designer'), designer_stats.URLS_FOUND):
+                self._flush_designer_stats()
         except DuplicateKeyError:
             self.logger.debug(f"⊘ Duplicate URL skipped: {item.get('perfume_url')}")
         except PyMongoError as e:
             self.logger.error(f"✗ MongoDB insert error: {e}")
         
         return item
+    
+    def _save_designer_state(self, item):
+        """Met à jour l'état de découverte du designer (upsert par URL)."""
+        try:
+            adapter = ItemAdapter(item)
+            self.db[self.designer_state_collection].update_one(
+                {"designer_url": adapter["designer_url"]},
+                {"$set": dict(adapter)},
+                upsert=True
+            )
+        except PyMongoError as e:
+            self.logger.error(f"✗ MongoDB designer state error: {e}")
+        
+        return item
+
+    def _flush_designer_stats(self):
+        """Écrit les compteurs par designer en attente (voir designer_stats.py)."""
+        try:
+            with timed("mongo.designer_stats"):
+                self.stats_buffer.flush(self.db)
+        except PyMongoError as e:
+            self.logger.error(f"✗ MongoDB designer stats error: {e}")
 
 
 class MongoPerfumeDataPipeline:
-    """Pipeline pour sauvegarder les données détaillées de parfums dans MongoDB."""
+    """
+    Pipeline pour sauvegarder les données détaillées de parfums dans MongoDB.
+    
+    Écritures idempotentes par lots (voir ingest.py) : un re-crawl met à
+    jour les documents en place et un parfum inchangé ne coûte aucune
+    écriture. Un lot incomplet est écrit au plus tard DATA_WRITE_MAX_DELAY
+    secondes après son premier item, même si plus aucun item n'arrive.
+    """
     
     collection_name = "perfume_data"
     
-    def __init__(self, mongo_uri, mongo_db):
+    def __init__(self, mongo_uri, mongo_db, stats_flush_items=100, write_batch=100, write_max_delay=5.0):
         self.mongo_uri = mongo_uri
         self.mongo_db = mongo_db
         self.client = None
         self.db = None
+        self.stats_buffer = DesignerStatsBuffer(flush_every=stats_flush_items)
+        self.write_buffer = PerfumeWriteBuffer(batch_size=write_batch, max_delay=write_max_delay)
+        self.flush_timer = None
+        self.crawler = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.items_saved = 0
-        self.items_skipped = 0
+        self.items_updated = 0
+        self.items_unchanged = 0
+        self.writes = 0
+        self.write_bytes = 0
     
     @classmethod
     def from_crawler(cls, crawler):
         """Récupère la config depuis settings.py"""
-        return cls(
+        pipeline = cls(
             mongo_uri=crawler.settings.get('MONGO_URI', 'mongodb://localhost:27017/'),
-            mongo_db=crawler.settings.get('MONGO_DATABASE', 'fragrantica')
+            mongo_db=crawler.settings.get('MONGO_DATABASE', 'fragrantica'),
+            stats_flush_items=crawler.settings.getint('DESIGNER_STATS_FLUSH_ITEMS', 100),
+            write_batch=crawler.settings.getint('DATA_WRITE_BATCH', 100),
+            write_max_delay=crawler.settings.getfloat('DATA_WRITE_MAX_DELAY', 5.0)
         )
+        pipeline.crawler = crawler
+        crawler.signals.connect(pipeline.start_flush_timer, signal=signals.spider_opened)
+        return pipeline
     
     def open_spider(self, spider):
         """Connexion à MongoDB au démarrage du spider."""
@@ -95,58 +162,140 @@ class MongoPerfumeDataPipeline:
             return
         
         try:
-            self.client = MongoClient(self.mongo_uri)
+            self.client = get_mongo_client(self.mongo_uri)
             self.db = self.client[self.mongo_db]
             
             # Index unique sur l'URL du parfum
             self.db[self.collection_name].create_index("url", unique=True)
             
+            # Index unique sur le numéro Fragrantica (URL renommée = même parfum)
+            try:
+                canonical.ensure_index(self.db, self.collection_name)
+            except OperationFailure as e:
+                self.logger.warning(
+                    f"⚠️  Unique fragrantica_id index not created "
+                    f"(run scripts/check_duplicates.py --fix): {e}"
+                )
+            
             # Index sur la marque pour les requêtes fréquentes
             self.db[self.collection_name].create_index("brand")
             
+            # Parcours des modifications par date (/api/changes)
+            self.db[self.collection_name].create_index([("updated_at", 1), ("_id", 1)])
+            
+            designer_stats.ensure_indexes(self.db)
+            
             self.logger.info(f"✓ Connected to MongoDB: {self.mongo_db}.{self.collection_name}")
         except PyMongoError as e:
             self.logger.error(f"✗ MongoDB connection failed: {e}")
             raise
     
+    def start_flush_timer(self, spider):
+        """
+        Vérifie chaque seconde (au plus) si le lot en attente a dépassé
+        DATA_WRITE_MAX_DELAY : sans cela, le délai n'est contrôlé qu'à
+        l'arrivée de l'item suivant.
+        """
+        if spider.name != "perfume_data" or not self.client:
+            return
+        
+        self.flush_timer = task.LoopingCall(self._flush_due_documents)
+        self.flush_timer.start(min(1.0, self.write_buffer.max_delay), now=False)
+    
+    def _flush_due_documents(self):
+        if self.write_buffer.is_due():
+            self._flush_documents()
+    
     def close_spider(self, spider):
-        """Fermeture de la connexion et statistiques."""
+        """Écriture du dernier lot, fermeture de la connexion et statistiques."""
         if spider.name != "perfume_data" or not self.client:
             return
         
+        if self.flush_timer and self.flush_timer.running:
+            self.flush_timer.stop()
+        self._flush_documents()
         self.logger.info(
             f"✓ Pipeline stats: {self.items_saved} saved, "
-            f"{self.items_skipped} duplicates skipped"
+            f"{self.items_updated} updated, "
+            f"{self.items_unchanged} unchanged (no write) - "
+            f"{self.writes} writes, {self.write_bytes:,} bytes"
         )
+        self._flush_designer_stats()
         self.client.close()
         self.logger.info("✓ MongoDB connection closed")
     
+    @profiled("pipeline.MongoPerfumeDataPipeline")
     def process_item(self, item, spider):
-        """Sauvegarde l'item dans MongoDB."""
+        """Ajoute l'item au lot d'écriture (écrit par _flush_documents)."""
         if spider.name != "perfume_data":
             return item
         
-        try:
-            adapter = ItemAdapter(item)
-            self.db[self.collection_name].insert_one(dict(adapter))
-            self.items_saved += 1
-            
-            if self.items_saved % 10 == 0:
-                self.logger.info(f"Progress: {self.items_saved} perfumes saved")
+        with timed("itemadapter"):
+            document = dict(ItemAdapter(item))
         
-        except DuplicateKeyError:
-            self.items_skipped += 1
-            self.logger.debug(f"⊘ Duplicate perfume skipped: {item.get('url')}")
+        # Pas de numéro (URL hors format) : champ absent, hors de l'index unique
+        if document.get(canonical.ID_FIELD) is None:
+            document.pop(canonical.ID_FIELD, None)
         
-        except PyMongoError as e:
-            self.logger.error(f"✗ MongoDB insert error for {item.get('url')}: {e}")
+        if self.write_buffer.add(document):
+            self._flush_documents()
         
         return item
+    
+    def _flush_documents(self):
+        """
+        Écrit le lot de documents en attente (une lecture `$in` des
+        empreintes, un bulk_write) et compte les insertions par designer.
+        """
+        if not len(self.write_buffer):
+            return
+        
+        try:
+            with timed("mongo.perfume_data"):
+                result = self.write_buffer.flush(self.db[self.collection_name])
+        except PyMongoError as e:
+            self.logger.error(f"✗ MongoDB write error: {e}")
+            return
+        
+        for error in result['errors']:
+            self.logger.error(f"✗ MongoDB write error: {error.get('errmsg')}")
+        
+        self.items_saved += len(result['inserted'])
+        self.items_updated += result['updated']
+        self.items_unchanged += result['unchanged']
+        self.writes += result['writes']
+        self.write_bytes += result['bytes']
+        
+        due = False
+        for document in result['inserted']:
+            # Designer du listing (même clé que urls_found), pas la marque résolue
+            due = self.stats_buffer.add(designer_stats.designer_of(document), designer_stats.PERFUMES_SCRAPED) or due
+        if due:
+            self._flush_designer_stats()
+        
+        if self.crawler:
+            self.crawler.signals.send_catch_log(
+                signal=perfumes_written, documents=result['documents']
+            )
+        
+        self.logger.info(
+            f"Progress: {self.items_saved} perfumes saved, "
+            f"{self.items_updated} updated, {self.items_unchanged} unchanged"
+        )
+
+    def _flush_designer_stats(self):
+        """Écrit les compteurs par designer en attente (voir designer_stats.py)."""
+        try:
+            with timed("mongo.designer_stats"):
+                self.stats_buffer.flush(self.db)
+        except PyMongoError as e:
+            self.logger.error(f"✗ MongoDB designer stats error: {e}")
 
 
 class DataCleaningPipeline:
     """Pipeline optionnel pour nettoyer/valider les données avant sauvegarde."""
     
+    @profiled("pipeline.DataCleaningPipeline")
     def process_item(self, item, spider):
         """Nettoie et valide les données."""
         adapter = ItemAdapter(item)
@@ -163,5 +312,17 @@ class DataCleaningPipeline:
         if spider.name == "perfume_data":
             if not isinstance(adapter.get('accords'), dict):
                 adapter['accords'] = {}
+            
+            # Valider la pyramide olfactive
+            if not isinstance(adapter.get('notes'), dict):
+                adapter['notes'] = {}
+            
+            if adapter.get('description'):
+                adapter['description'] = adapter['description'].strip()
+            
+            # Une note hors de l'échelle 0-5 est une erreur de parsing
+            rating = adapter.get('rating')
+            if rating is not None and not 0 <= rating <= 5:
+                adapter['rating'] = None
         
         return item
\ No newline at end of file
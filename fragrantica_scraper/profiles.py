@@ -0,0 +1,112 @@
+# profiles.py
+"""
+Profils de crawl nommés (polite, balanced, aggressive).
+
+Chaque profil fixe explicitement tout ce qui règle le débit du downloader :
+concurrence (globale et par domaine), délais, AutoThrottle, cache DNS,
+compression et timeouts. Le profil actif est choisi par le setting
+CRAWL_PROFILE (variable d'environnement ou `scrapy crawl ... -s CRAWL_PROFILE=balanced`)
+et appliqué par les spiders avec la priorité "spider" : une valeur passée
+explicitement en ligne de commande (-s) reste prioritaire.
+
+Réutilisation des connexions : le handler HTTP/1.1 de Scrapy garde les
+connexions ouvertes (keep-alive) dans un pool dont la taille par hôte vaut
+CONCURRENT_REQUESTS_PER_DOMAIN. HTTP/2 (une seule connexion multiplexée)
+s'active en plus avec CRAWL_HTTP2=True ; il nécessite le paquet `h2`.
+"""
+
+DEFAULT_PROFILE = "polite"
+
+# Réglages communs à tous les profils
+_COMMON = {
+    # Cache DNS : une seule résolution de www.fragrantica.com par crawl
+    "DNSCACHE_ENABLED": True,
+    "DNSCACHE_SIZE": 10000,
+    "DNS_TIMEOUT": 30,
+    # gzip/deflate/br via HttpCompressionMiddleware (Accept-Encoding)
+    "COMPRESSION_ENABLED": True,
+    "DOWNLOAD_TIMEOUT": 60,
+}
+
+PROFILES = {
+    # Valeurs effectives historiques : 1 requête à la fois, 1-2 s entre requêtes
+    "polite": {
+        "CONCURRENT_REQUESTS": 1,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+        "DOWNLOAD_DELAY": 2,
+        "RANDOMIZE_DOWNLOAD_DELAY": True,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 2,
+        "AUTOTHROTTLE_MAX_DELAY": 20,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 1.0,
+    },
+    "balanced": {
+        "CONCURRENT_REQUESTS": 4,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 4,
+        "DOWNLOAD_DELAY": 0.5,
+        "RANDOMIZE_DOWNLOAD_DELAY": True,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 1,
+        "AUTOTHROTTLE_MAX_DELAY": 10,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 2.0,
+    },
+    "aggressive": {
+        "CONCURRENT_REQUESTS": 16,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 16,
+        "DOWNLOAD_DELAY": 0,
+        "RANDOMIZE_DOWNLOAD_DELAY": False,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 0.25,
+        "AUTOTHROTTLE_MAX_DELAY": 5,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 8.0,
+        "DOWNLOAD_TIMEOUT": 30,
+    },
+}
+
+HTTP2_SETTINGS = {
+    "DOWNLOAD_HANDLERS": {
+        "https": "scrapy.core.downloader.handlers.http2.H2DownloadHandler",
+    },
+}
+
+
+def get_profile(name=None, http2=False):
+    """
+    Retourne les settings d'un profil de crawl.
+
+    Args:
+        name (str): Nom du profil (défaut: DEFAULT_PROFILE)
+        http2 (bool): Ajouter le handler HTTP/2 pour https
+
+    Returns:
+        dict: Settings Scrapy du profil
+
+    Raises:
+        ValueError: Si le profil n'existe pas
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown crawl profile '{name}' "
+            f"(available: {', '.join(PROFILES)})"
+        )
+
+    settings = {**_COMMON, **PROFILES[name]}
+    if http2:
+        settings.update(HTTP2_SETTINGS)
+    return settings
+
+
+def apply_profile(settings, priority="spider"):
+    """
+    Applique le profil désigné par CRAWL_PROFILE sur des Settings Scrapy.
+
+    Les valeurs déjà définies avec une priorité supérieure (ligne de
+    commande) ne sont pas écrasées.
+    """
+    profile = get_profile(
+        settings.get("CRAWL_PROFILE"),
+        http2=settings.getbool("CRAWL_HTTP2"),
+    )
+    for key, value in profile.items():
+        settings.set(key, value, priority=priority)
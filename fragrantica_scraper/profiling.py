@@ -0,0 +1,221 @@
+# profiling.py
+"""
+Profilage optionnel des chemins chauds du crawl.
+
+Activation: PROFILING_ENABLED=True, ou python run_scrapers.py --profile
+
+Deux sources, écrites dans PROFILING_DIR (logs/profiling/<horodatage>/) :
+- timers.json : nombre d'appels, temps total/moyen/max par composant
+  (callbacks des spiders, process_item des pipelines, conversions
+  ItemAdapter, écritures MongoDB). Un composant imbriqué (ex: écriture
+  MongoDB dans un pipeline) est aussi compté dans son parent ;
+- <composant>.collapsed : piles échantillonnées du thread du reactor au
+  format "collapsed" (une pile par ligne + nombre d'échantillons), lisible
+  par flamegraph.pl ou speedscope. all.collapsed regroupe tout le run.
+
+Hors profilage, les hooks coûtent un test de booléen par appel.
+"""
+import functools
+import inspect
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class HotPathProfiler:
+    """Minuteries par composant et échantillonneur de piles (un par processus)."""
+
+    def __init__(self):
+        self.active = False
+        self.interval = 0.005
+        self.timers = defaultdict(lambda: [0, 0.0, 0.0])  # appels, total, max
+        self.samples = defaultdict(Counter)  # composant -> pile -> échantillons
+        self._components = []  # pile des composants en cours (thread du reactor)
+        self._users = 0
+        self._thread = None
+        self._target_thread = None
+
+    def start(self, interval):
+        """Démarre le profilage (compté : un appel par spider ouvert)."""
+        self._users += 1
+        if self.active:
+            return
+        self.interval = interval
+        self.timers.clear()
+        self.samples.clear()
+        self._target_thread = threading.get_ident()
+        self.active = True
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le profilage quand le dernier spider se ferme. Retourne True alors."""
+        self._users = max(0, self._users - 1)
+        if self._users or not self.active:
+            return False
+        self.active = False
+        self._thread.join()
+        return True
+
+    @contextmanager
+    def timed(self, component):
+        """Chronomètre un bloc et rattache les échantillons pris pendant ce bloc."""
+        if not self.active:
+            yield
+            return
+        self._components.append(component)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(component, time.perf_counter() - started)
+            self._components.pop()
+
+    def _record(self, component, elapsed):
+        timer = self.timers[component]
+        timer[0] += 1
+        timer[1] += elapsed
+        if elapsed > timer[2]:
+            timer[2] = elapsed
+
+    def _sample_loop(self):
+        while self.active:
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is not None:
+                try:
+                    component = self._components[-1]
+                except IndexError:  # hors hook (reactor, moteur, téléchargement)
+                    component = "other"
+                self.samples[component][self._collapse(frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def dump(self, directory):
+        """Écrit timers.json et les fichiers .collapsed. Retourne le dossier."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        timers = {
+            component: {
+                "calls": calls,
+                "total_s": round(total, 6),
+                "mean_ms": round(total / calls * 1000, 4) if calls else 0,
+                "max_ms": round(maximum * 1000, 4),
+            }
+            for component, (calls, total, maximum) in sorted(
+                self.timers.items(), key=lambda x: x[1][1], reverse=True
+            )
+        }
+        (directory / "timers.json").write_text(json.dumps(timers, indent=2))
+
+        everything = Counter()
+        for component, stacks in self.samples.items():
+            self._write_collapsed(directory / f"{component}.collapsed", stacks)
+            everything.update({f"{component};{stack}": n for stack, n in stacks.items()})
+        self._write_collapsed(directory / "all.collapsed", everything)
+        return directory
+
+    @staticmethod
+    def _write_collapsed(path, stacks):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+profiler = HotPathProfiler()
+
+
+def timed(component):
+    """Chronomètre un bloc : `with timed("mongo.insert"): ...`"""
+    return profiler.timed(component)
+
+
+def profiled(component):
+    """
+    Décorateur de hook : chronomètre une méthode (callback ou process_item).
+
+    Pour un callback générateur, chaque itération est chronométrée, de sorte
+    que le temps passé en aval (pipelines) n'est pas compté au callback.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                if not profiler.active:
+                    yield from func(*args, **kwargs)
+                    return
+                iterator = func(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        profiler._components.append(component)
+                        started = time.perf_counter()
+                        try:
+                            output = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - started
+                            profiler._components.pop()
+                        yield output
+                finally:
+                    profiler._record(component, elapsed)
+            return gen_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.active:
+                return func(*args, **kwargs)
+            with profiler.timed(component):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfilingExtension:
+    """Démarre le profilage à l'ouverture des spiders et l'écrit à la fermeture."""
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('PROFILING_ENABLED'):
+            raise NotConfigured
+
+        directory = Path(crawler.settings.get('PROFILING_DIR', 'logs/profiling'))
+        ext = cls(
+            directory / datetime.now().strftime('%Y%m%d-%H%M%S'),
+            crawler.settings.getfloat('PROFILING_SAMPLE_INTERVAL', 0.005)
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        profiler.start(self.interval)
+
+    def spider_closed(self, spider, reason):
+        if profiler.stop():
+            directory = profiler.dump(self.directory)
+            logger.info(f"🔬 Profiling written to {directory}")
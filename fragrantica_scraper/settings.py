@@ -10,6 +10,7 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from fragrantica_scraper.profiles import DEFAULT_PROFILE, get_profile
 
 # Charger les variables d'environnement depuis .env
 env_path = Path(__file__).parent.parent / '.env'
@@ -27,16 +28,13 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 # Obey robots.txt rules
 ROBOTSTXT_OBEY = False
 
-# Configure maximum concurrent requests performed by Scrapy (default: 16)
-CONCURRENT_REQUESTS = 1
-
-# Configure a delay for requests for the same website (default: 0)
-# See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
-# See also autothrottle settings and docs
-DOWNLOAD_DELAY = 5
-# The download delay setting will honor only one of:
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
-#CONCURRENT_REQUESTS_PER_IP = 16
+# === Profil de crawl ===
+# Concurrence, délais, AutoThrottle, cache DNS et compression sont définis
+# par profil nommé dans profiles.py (polite, balanced, aggressive).
+# Les spiders ré-appliquent le profil choisi : ne pas les surcharger ici.
+CRAWL_PROFILE = os.getenv('CRAWL_PROFILE', DEFAULT_PROFILE)
+CRAWL_HTTP2 = os.getenv('CRAWL_HTTP2', 'False').lower() == 'true'
+globals().update(get_profile(CRAWL_PROFILE, http2=CRAWL_HTTP2))
 
 # Disable cookies (enabled by default)
 COOKIES_ENABLED = True
@@ -52,32 +50,55 @@ DEFAULT_REQUEST_HEADERS = {
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "fragrantica_scraper.middlewares.FragranticaScraperSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    # Temps passé dans les callbacks (au plus près du spider, si METRICS_ENABLED)
+    "fragrantica_scraper.metrics.ParseTimeMiddleware": 950,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 DOWNLOADER_MIDDLEWARES = {
+    # Budget global partagé par tous les spiders du processus (avant le 429)
+    "fragrantica_scraper.middlewares.SharedRateLimitMiddleware": 540,
     "fragrantica_scraper.middlewares.StopOn429Middleware": 543,
 }
 
+# Requêtes/s pour l'ensemble des spiders d'un même processus (0 = désactivé).
+# Avec run_scrapers.py, découverte d'URLs et scraping des données tournent
+# en parallèle : ce budget plafonne leur somme. Désactivé par défaut : le
+# profil de crawl (CRAWL_PROFILE) règle seul le débit ; un budget fixe
+# ramènerait balanced et aggressive au débit de polite.
+GLOBAL_RATE_LIMIT = float(os.getenv('GLOBAL_RATE_LIMIT', 0))
+GLOBAL_RATE_BURST = 1
+
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
-
-# Enable and configure the AutoThrottle extension (disabled by default)
-# See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-AUTOTHROTTLE_ENABLED = True
-# The initial download delay
-AUTOTHROTTLE_START_DELAY = 5
-# The maximum download delay to be set in case of high latencies
-AUTOTHROTTLE_MAX_DELAY = 60
-# The average number of requests Scrapy should be sending in parallel to
-# each remote server
-AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+EXTENSIONS = {
+    # Passage des URLs découvertes au spider de données (si URL_HANDOFF est défini)
+    "fragrantica_scraper.handoff.UrlHandoffExtension": 500,
+    # Métriques Prometheus (si METRICS_ENABLED)
+    "fragrantica_scraper.metrics.ScraperMetrics": 510,
+    # Profilage des callbacks et pipelines (si PROFILING_ENABLED)
+    "fragrantica_scraper.profiling.ProfilingExtension": 520,
+}
+
+# === Métriques Prometheus ===
+# Exposées sur http://localhost:METRICS_PORT/metrics (voir metrics.py)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() == 'true'
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9410))
+METRICS_SAMPLE_INTERVAL = 5
+
+# === Profilage des chemins chauds ===
+# Minuteries par composant + piles échantillonnées (voir profiling.py)
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_DIR = os.getenv('PROFILING_DIR', 'logs/profiling')
+PROFILING_SAMPLE_INTERVAL = 0.005
+
+# Nom du canal de passage des URLs entre spiders d'un même processus.
+# Défini par run_scrapers.py quand les deux étapes tournent ensemble.
+URL_HANDOFF = None
+
+# AutoThrottle : réglé par le profil de crawl (voir profiles.py)
 # Enable showing throttle stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
@@ -107,6 +128,26 @@ LOG_LEVEL = 'INFO'
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
 MONGO_DATABASE = os.getenv('MONGO_DATABASE', 'fragrantica')
 
+# === Site cible ===
+# Surchargé par le benchmark pour viser le serveur Fragrantica local
+FRAGRANTICA_BASE_URL = os.getenv('FRAGRANTICA_BASE_URL', 'https://www.fragrantica.com')
+
+# === Découverte incrémentale des designers ===
+# Délai de base avant de re-fetcher une page designer déjà vue (doublé à
+# chaque fetch sans changement de la liste de parfums, plafonné au maximum)
+DESIGNER_REFETCH_DAYS = float(os.getenv('DESIGNER_REFETCH_DAYS', 7))
+DESIGNER_REFETCH_MAX_DAYS = float(os.getenv('DESIGNER_REFETCH_MAX_DAYS', 60))
+
+# === Compteurs par designer (designer_stats.py) ===
+# Nombre d'insertions cumulées en mémoire avant écriture des compteurs
+DESIGNER_STATS_FLUSH_ITEMS = int(os.getenv('DESIGNER_STATS_FLUSH_ITEMS', 100))
+
+# === Écriture des parfums par lots (ingest.py) ===
+# Taille d'un lot (une lecture $in des empreintes + un bulk_write) et
+# attente maximale d'un item avant écriture (secondes)
+DATA_WRITE_BATCH = int(os.getenv('DATA_WRITE_BATCH', 100))
+DATA_WRITE_MAX_DELAY = float(os.getenv('DATA_WRITE_MAX_DELAY', 5))
+
 # === Activation des pipelines ===
 ITEM_PIPELINES = {
     # Pipeline de nettoyage (s'exécute en premier, priorité 100)
@@ -1,30 +1,133 @@
 # perfume_data_spider.py
 import scrapy
 import re
-from pymongo import MongoClient
-from fragrantica_scraper.items import FragranticaPerfumeItem
+from urllib.parse import urlparse
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from fragrantica_scraper.canonical import perfume_id, resolve_brand
+from fragrantica_scraper.handoff import UrlHandoff
+from fragrantica_scraper.mongo import get_mongo_client
+from fragrantica_scraper.profiles import apply_profile
+from fragrantica_scraper.profiling import profiled
+from fragrantica_scraper.items import FragranticaPerfumeItem, ITEM_SCHEMA_VERSION
+
+
+# Correspondance entre les titres de la pyramide olfactive et les clés stockées
+NOTE_LEVELS = {
+    "top": "top",
+    "middle": "middle",
+    "heart": "middle",
+    "base": "base",
+}
+
+GENDERS = {
+    "for women and men": "unisex",
+    "for women": "women",
+    "for men": "men",
+}
+
+
+def _to_float(value):
+    """Convertit un texte en float ("4.17" -> 4.17), None si impossible."""
+    try:
+        return float(value.strip().replace(",", ""))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    """Convertit un texte en int ("25,123" -> 25123), None si impossible."""
+    try:
+        return int(re.sub(r"[^\d]", "", value))
+    except (TypeError, ValueError):
+        return None
 
 
 class PerfumeSpider(scrapy.Spider):
     name = "perfume_data"
     allowed_domains = ["fragrantica.com"]
     
+    # Concurrence et délais : voir le profil de crawl (profiles.py)
     custom_settings = {
         'ROBOTSTXT_OBEY': False,
-        'CONCURRENT_REQUESTS': 6,
-        'DOWNLOAD_DELAY': 1,
-        'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'AUTOTHROTTLE_ENABLED': True,
-        'AUTOTHROTTLE_START_DELAY': 3,
-        'AUTOTHROTTLE_MAX_DELAY': 20,
         'COOKIES_ENABLED': True,
         'RETRY_ENABLED': False,
-        'DOWNLOADER_MIDDLEWARES': {
-            'fragrantica_scraper.middlewares.StopOn429Middleware': 543,
-        },
         'LOG_LEVEL': 'INFO',
     }
     
+    @classmethod
+    def update_settings(cls, settings):
+        """Applique custom_settings puis le profil de crawl choisi."""
+        super().update_settings(settings)
+        apply_profile(settings)
+    
+    def __init__(self, *args, recrawl=False, **kwargs):
+        """
+        Args:
+            recrawl (bool): Re-scraper toutes les URLs, même celles déjà
+                scrapées avec le schéma courant (`-a recrawl=1`) : les
+                parfums inchangés ne coûtent aucune écriture (voir ingest.py)
+        """
+        super().__init__(*args, **kwargs)
+        self.recrawl = str(recrawl).lower() in ("1", "true", "yes")
+        self.handoff = None
+        self.queued_urls = set()
+    
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        """
+        Cible FRAGRANTICA_BASE_URL (le site réel ou le serveur local).
+        
+        Si URL_HANDOFF est défini, reçoit aussi les URLs découvertes en
+        direct par PerfumeURLsSpider et reste ouvert tant qu'il en arrive.
+        """
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        base_url = crawler.settings.get('FRAGRANTICA_BASE_URL')
+        if base_url:
+            spider.allowed_domains = [urlparse(base_url).hostname]
+        
+        handoff_name = crawler.settings.get('URL_HANDOFF')
+        if handoff_name:
+            spider.handoff = UrlHandoff.shared(handoff_name)
+            crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
+            crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+            crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        return spider
+    
+    def spider_opened(self, spider):
+        """Branche le spider sur le canal une fois le moteur démarré."""
+        self.handoff.attach(self.enqueue_url)
+    
+    def spider_idle(self, spider):
+        """Ne pas se terminer tant que la découverte d'URLs est en cours."""
+        if self.handoff is not None and not self.handoff.closed:
+            raise DontCloseSpider
+    
+    def spider_closed(self, spider, reason):
+        """Arrêt (429, fin de file...) : ne plus recevoir d'URLs."""
+        self.handoff.detach()
+    
+    def enqueue_url(self, url, designer):
+        """Planifie une URL reçue du spider d'URLs (une seule fois par run)."""
+        if url in self.queued_urls:
+            return
+        self.queued_urls.add(url)
+        self.crawler.engine.crawl(self._perfume_request(url, designer))
+    
+    def _perfume_request(self, url, designer):
+        return scrapy.Request(
+            url,
+            callback=self.parse_perfume,
+            meta={"designer": designer},
+            errback=self.handle_error,
+            dont_filter=True
+        )
+    
+    async def start(self):
+        """Point d'entrée Scrapy >= 2.13 : délègue à start_requests()."""
+        for request in self.start_requests():
+            yield request
+    
     def start_requests(self):
         """Load URLs from MongoDB and skip already scraped ones."""
         # ✅ Valeur par défaut Docker-friendly
@@ -37,7 +140,7 @@ class PerfumeSpider(scrapy.Spider):
         self.logger.info(f"Connecting to MongoDB: {mongo_uri}")
         
         try:
-            client = MongoClient(
+            client = get_mongo_client(
                 mongo_uri,
                 serverSelectionTimeoutMS=10000,
                 connectTimeoutMS=10000
@@ -53,10 +156,15 @@ class PerfumeSpider(scrapy.Spider):
                 {"perfume_url": 1, "designer": 1, "_id": 0}
             ))
             
-            # Charger les URLs déjà scrapées
-            scraped_urls = set(
+            # Charger les URLs déjà scrapées avec le schéma courant
+            # (les documents d'un schéma antérieur sont re-scrapés ; toutes
+            # les URLs en mode recrawl)
+            scraped_urls = set() if self.recrawl else set(
                 item["url"] 
-                for item in db.perfume_data.find({}, {"url": 1, "_id": 0})
+                for item in db.perfume_data.find(
+                    {"schema_version": {"$gte": ITEM_SCHEMA_VERSION}},
+                    {"url": 1, "_id": 0}
+                )
             )
             
             self.logger.info(f"Found {len(scraped_urls)} already scraped perfumes")
@@ -73,17 +181,13 @@ class PerfumeSpider(scrapy.Spider):
                 f"Remaining: {len(remaining)}"
             )
             
-            # Générer les requêtes
+            # Générer les requêtes (sauf celles déjà reçues par le canal)
             for data in remaining:
                 url = data["perfume_url"]
-                designer = data.get("designer", "Unknown")
-                yield scrapy.Request(
-                    url,
-                    callback=self.parse_perfume,
-                    meta={"designer": designer},
-                    errback=self.handle_error,
-                    dont_filter=True
-                )
+                if url in self.queued_urls:
+                    continue
+                self.queued_urls.add(url)
+                yield self._perfume_request(url, data.get("designer", "Unknown"))
         
         except Exception as e:
             self.logger.error(f"MongoDB connection failed: {e}")
@@ -94,19 +198,35 @@ class PerfumeSpider(scrapy.Spider):
         finally:
             client.close()
     
+    @profiled("perfume_data.parse_perfume")
     def parse_perfume(self, response):
         """Parse individual perfume page."""
         item = FragranticaPerfumeItem()
         item["url"] = response.url
+        item["fragrantica_id"] = perfume_id(response.url)
+        # Designer du listing, comme perfume_urls : compteurs designer_stats
+        designer = response.meta.get("designer")
+        item["designer"] = designer or "Unknown"
+        
+        # Marque de la page ou de l'URL : le designer du listing peut être
+        # celui d'une autre marque (voir canonical.resolve_brand)
+        brand = resolve_brand(
+            response.url,
+            page_brand=(
+                response.css('[itemprop="brand"] [itemprop="name"]::text').get()
+                or response.css('[itemprop="brand"]::text').get()
+            ),
+            designer=designer,
+        )
         
         title = response.css("h1::text").get()
         if title:
             title = title.strip()
             item["name"] = title
-            item["brand"] = response.meta.get("designer", title.split(" ", 1)[0])
+            item["brand"] = brand or title.split(" ", 1)[0]
         else:
             item["name"] = "Unknown"
-            item["brand"] = response.meta.get("designer", "Unknown")
+            item["brand"] = brand or "Unknown"
         
         accords = {}
         for bar in response.css("div.flex.flex-col.w-full > div.w-full > div"):
@@ -118,10 +238,92 @@ class PerfumeSpider(scrapy.Spider):
         
         item["accords"] = accords
         
+        item["description"] = self._parse_description(response)
+        item["notes"] = self._parse_notes(response)
+        item["rating"] = _to_float(
+            response.css('[itemprop="ratingValue"]::text').get()
+        )
+        item["votes"] = _to_int(
+            response.css('[itemprop="ratingCount"]::text').get()
+        )
+        item["year"] = self._parse_year(item["description"])
+        item["gender"] = self._parse_gender(response)
+        item["image_url"] = (
+            response.css('img[itemprop="image"]::attr(src)').get()
+            or response.css('meta[property="og:image"]::attr(content)').get()
+        )
+        item["schema_version"] = ITEM_SCHEMA_VERSION
+        
         self.logger.info(f"✓ Scraped: {item['brand']} - {item['name']}")
         
         yield item
     
+    def _parse_description(self, response):
+        """Extrait le texte de description du parfum."""
+        paragraphs = response.xpath(
+            '//div[@itemprop="description"]//p'
+        )
+        texts = [p.xpath("normalize-space(string(.))").get() for p in paragraphs]
+        return " ".join(t for t in texts if t) or None
+    
+    def _parse_notes(self, response):
+        """
+        Extrait la pyramide olfactive.
+        
+        Returns:
+            dict: {"top": [...], "middle": [...], "base": [...]} ou, pour les
+            parfums sans pyramide, {"all": [...]}
+        """
+        pyramid = response.css("#pyramid")
+        if not pyramid:
+            return {}
+        
+        notes = {}
+        for title in pyramid.xpath(".//h4"):
+            label = title.xpath("normalize-space(string(.))").get().lower()
+            level = next(
+                (key for word, key in NOTE_LEVELS.items() if label.startswith(word)),
+                None
+            )
+            if not level:
+                continue
+            container = title.xpath("following-sibling::div[1]")
+            names = [
+                n.strip()
+                for n in container.xpath("./div").xpath("normalize-space(string(.))").getall()
+                if n.strip()
+            ]
+            if names:
+                notes[level] = names
+        
+        # Parfums sans pyramide : une seule liste de notes
+        if not notes:
+            names = [
+                n.strip()
+                for n in pyramid.xpath(".//a[contains(@href, '/notes/')]")
+                .xpath("normalize-space(string(..))").getall()
+                if n.strip()
+            ]
+            if names:
+                notes["all"] = names
+        
+        return notes
+    
+    def _parse_year(self, description):
+        """Extrait l'année de sortie depuis la description."""
+        if not description:
+            return None
+        match = re.search(r"launched in (\d{4})", description)
+        return int(match.group(1)) if match else None
+    
+    def _parse_gender(self, response):
+        """Extrait le genre depuis le sous-titre du h1."""
+        label = response.xpath("normalize-space(//h1/small)").get("").lower()
+        for text, gender in GENDERS.items():
+            if text in label:
+                return gender
+        return None
+    
     def handle_error(self, failure):
         """Handle errors gracefully."""
         self.logger.error(f"✗ Failed: {failure.request.url}")
\ No newline at end of file
@@ -1,7 +1,25 @@
 # perfume_urls_spider.py
+import re
 import scrapy
-import random
-from pymongo import MongoClient
+import hashlib
+from datetime import timedelta
+from urllib.parse import urljoin, urlparse
+from fragrantica_scraper.designer_stats import utcnow
+from fragrantica_scraper.mongo import get_mongo_client
+from fragrantica_scraper.profiles import apply_profile
+from fragrantica_scraper.profiling import profiled
+from fragrantica_scraper.items import DesignerStateItem
+
+
+def links_fingerprint(urls):
+    """Empreinte SHA-1 d'une liste de liens, indépendante de leur ordre."""
+    return hashlib.sha1("\n".join(sorted(urls)).encode("utf-8")).hexdigest()
+
+
+def perfume_sort_key(url):
+    """Clé de tri d'une URL de parfum : son ID numérique Fragrantica."""
+    match = re.search(r"-(\d+)\.html$", url)
+    return (int(match.group(1)) if match else float("inf"), url)
 
 
 class PerfumeURLsSpider(scrapy.Spider):
@@ -9,6 +27,7 @@ class PerfumeURLsSpider(scrapy.Spider):
     allowed_domains = ["fragrantica.com"]
     start_urls = ["https://www.fragrantica.com/designers/"]
     
+    # Concurrence et délais : voir le profil de crawl (profiles.py)
     custom_settings = {
         'ROBOTSTXT_OBEY': False,
         'USER_AGENT': (
@@ -16,17 +35,18 @@ class PerfumeURLsSpider(scrapy.Spider):
             "AppleWebKit/537.36 (KHTML, like Gecko) "
             "Chrome/120.0 Safari/537.36"
         ),
-        'DOWNLOAD_DELAY': 2,
-        'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'AUTOTHROTTLE_ENABLED': True,
-        'AUTOTHROTTLE_START_DELAY': 2,
-        'AUTOTHROTTLE_MAX_DELAY': 10,
-        'CONCURRENT_REQUESTS': 4,
         'COOKIES_ENABLED': True,
         'RETRY_ENABLED': False,
     }
     
-    max_urls_per_designer = 100
+    @classmethod
+    def update_settings(cls, settings):
+        """Applique custom_settings puis le profil de crawl choisi."""
+        super().update_settings(settings)
+        apply_profile(settings)
+    
+    # Collection MongoDB de l'état par designer (voir MongoPerfumeURLsPipeline)
+    designer_state_collection = "designer_state"
     
     def __init__(self, *args, skip_existing=True, **kwargs):
         super().__init__(*args, **kwargs)
@@ -34,17 +54,34 @@ class PerfumeURLsSpider(scrapy.Spider):
         self.got_429 = False
         
         # ✅ NE PAS charger le cache ici - self.settings n'existe pas encore
-        self.scraped_designers = set()
         self.existing_urls = set()
+        self.designer_states = {}  # {designer_url: état stocké}
+        # Liens vus sur les pages déjà parcourues d'un designer (ce run)
+        self.designer_links = {}  # {designer_url: set(url)}
+    
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        """Cible FRAGRANTICA_BASE_URL (le site réel ou le serveur local)."""
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        base_url = crawler.settings.get('FRAGRANTICA_BASE_URL')
+        if base_url:
+            spider.start_urls = [urljoin(base_url, "/designers/")]
+            spider.allowed_domains = [urlparse(base_url).hostname]
+        return spider
+    
+    async def start(self):
+        """Point d'entrée Scrapy >= 2.13 : délègue à start_requests()."""
+        for request in self.start_requests():
+            yield request
     
     # ✅ NOUVEAU : Charger le cache quand le spider démarre
     def start_requests(self):
         """Charge le cache avant de démarrer le scraping."""
         if self.skip_existing:
-            self.scraped_designers = self._load_scraped_designers()
             self.existing_urls = self._load_existing_urls()
+            self.designer_states = self._load_designer_states()
             self.logger.info(
-                f"Loaded {len(self.scraped_designers)} fully scraped designers "
+                f"Loaded {len(self.designer_states)} designer states "
                 f"and {len(self.existing_urls)} existing URLs from MongoDB"
             )
         
@@ -63,7 +100,7 @@ class PerfumeURLsSpider(scrapy.Spider):
         self.logger.debug(f"Connecting to MongoDB: {mongo_uri}")
         
         try:
-            client = MongoClient(
+            client = get_mongo_client(
                 mongo_uri,
                 serverSelectionTimeoutMS=5000,
                 connectTimeoutMS=10000
@@ -75,31 +112,6 @@ class PerfumeURLsSpider(scrapy.Spider):
             self.logger.error(f"MongoDB connection failed: {e}")
             raise
     
-    def _load_scraped_designers(self):
-        """Charge la liste des designers avec au moins max_urls_per_designer URLs."""
-        try:
-            client = self._get_mongo_connection()
-            mongo_db = self.settings.get('MONGO_DATABASE', 'fragrantica')
-            db = client[mongo_db]
-            
-            pipeline = [
-                {"$group": {"_id": "$designer", "count": {"$sum": 1}}},
-                {"$match": {"count": {"$gte": self.max_urls_per_designer}}}
-            ]
-            
-            fully_scraped = {
-                doc["_id"] for doc in db.perfume_urls.aggregate(pipeline)
-            }
-            
-            self.logger.info(f"📊 Found {len(fully_scraped)} fully scraped designers")
-            
-            client.close()
-            return fully_scraped
-        
-        except Exception as e:
-            self.logger.error(f"Could not load scraped designers: {e}")
-            return set()
-    
     def _load_existing_urls(self):
         """Charge toutes les URLs déjà présentes en base."""
         try:
@@ -145,50 +157,112 @@ class PerfumeURLsSpider(scrapy.Spider):
             self.logger.error(traceback.format_exc())
             return set()
     
+    def _load_designer_states(self):
+        """Charge l'état de découverte de chaque designer, indexé par URL."""
+        try:
+            client = self._get_mongo_connection()
+            mongo_db = self.settings.get('MONGO_DATABASE', 'fragrantica')
+            db = client[mongo_db]
+            
+            states = {
+                doc["designer_url"]: doc
+                for doc in db[self.designer_state_collection].find({}, {"_id": 0})
+            }
+            
+            client.close()
+            return states
+        
+        except Exception as e:
+            self.logger.error(f"Could not load designer states: {e}")
+            return {}
+    
+    def _refetch_interval(self, state):
+        """
+        Délai avant de re-fetcher un designer.
+        Double à chaque fetch sans changement, dans la limite du maximum.
+        """
+        settings = getattr(self, 'settings', None)
+        base_days = settings.getfloat('DESIGNER_REFETCH_DAYS', 7) if settings else 7
+        max_days = settings.getfloat('DESIGNER_REFETCH_MAX_DAYS', 60) if settings else 60
+        unchanged_runs = state.get("unchanged_runs", 0)
+        return timedelta(days=min(base_days * 2 ** unchanged_runs, max_days))
+    
+    def _is_due(self, state, now):
+        """Indique si un designer connu doit être re-fetché."""
+        fetched_at = state.get("fetched_at")
+        # Un designer jamais énuméré jusqu'au bout est toujours dû
+        if fetched_at is None or not state.get("complete"):
+            return True
+        return now >= fetched_at + self._refetch_interval(state)
+    
+    @profiled("perfume_urls.parse")
     def parse(self, response):
-        """Parse la page des designers et envoie une requête vers chaque designer."""
+        """
+        Parse la page des designers et envoie une requête vers chaque designer
+        nouveau ou dont le re-fetch est dû.
+        """
         designer_links = response.xpath(
             '//a[starts-with(@href, "/designers/") and contains(@href, ".html")]'
         )
         self.logger.info(f"{len(designer_links)} designers trouvés")
         
-        skipped_count = 0
+        now = utcnow()
+        not_due_count = 0
+        new_count = 0
         requested_count = 0
+        index_urls = set()
         
         for a in designer_links:
             designer_name = a.xpath("normalize-space(text())").get()
+            designer_url = response.urljoin(a.attrib["href"])
+            index_urls.add(designer_url)
             
-            if designer_name in self.scraped_designers:
-                skipped_count += 1
-                self.logger.debug(
-                    f"⊘ Skipping fully scraped designer: {designer_name}"
-                )
+            state = self.designer_states.get(designer_url)
+            
+            if state is None:
+                new_count += 1
+            elif not self._is_due(state, now):
+                not_due_count += 1
                 continue
             
-            designer_url = response.urljoin(a.attrib["href"])
             requested_count += 1
             
             yield scrapy.Request(
                 designer_url,
                 callback=self.parse_designer,
-                meta={"designer": designer_name},
+                meta={"designer": designer_name, "designer_url": designer_url},
                 errback=self.handle_error,
                 dont_filter=True
             )
         
+        removed = set(self.designer_states) - index_urls
+        if removed:
+            self.logger.info(
+                f"{len(removed)} designers connus absents de l'index (ignorés)"
+            )
+        
         self.logger.info(
-            f"✓ Designers: {requested_count} to scrape, "
-            f"{skipped_count} fully done"
+            f"✓ Designers: {requested_count} to scrape ({new_count} new), "
+            f"{not_due_count} not due"
         )
     
+    @profiled("perfume_urls.parse_designer")
     def parse_designer(self, response):
-        """Parse la page d'un designer pour récupérer les URLs de ses parfums."""
+        """
+        Parse une page designer pour récupérer les URLs de ses parfums.
+        
+        Toutes les URLs sont émises, triées par ID de parfum. Si la page a une
+        page suivante, elle est suivie et l'état du designer n'est écrit
+        (avec complete=True) qu'une fois la dernière page parsée : l'empreinte
+        couvre alors les liens de toutes les pages.
+        """
         if response.status == 429:
             self.logger.warning(
                 f"HTTP 429 détecté sur {response.url} - "
                 "Le spider sera arrêté par le middleware"
             )
             self.got_429 = True
+            self.designer_links.pop(response.meta.get("designer_url"), None)
             return
         
         designer = response.css("h1::text").get()
@@ -197,48 +271,99 @@ class PerfumeURLsSpider(scrapy.Spider):
         else:
             designer = response.meta.get("designer", "Unknown")
         
-        perfume_links = list(set(
-            response.xpath('//a[contains(@href, "/perfume/")]/@href').getall()
-        ))
-        random.shuffle(perfume_links)
+        designer_url = response.meta.get("designer_url", response.url)
+        page = response.meta.get("page", 1)
+        if page == 1:
+            self.designer_links[designer_url] = set()
+        seen_links = self.designer_links.setdefault(designer_url, set())
         
-        # Compter vraiment les nouvelles URLs
-        new_urls = []
-        duplicate_count = 0
+        page_links = sorted(
+            {
+                response.urljoin(link).rstrip('/').split('?')[0]
+                for link in response.xpath('//a[contains(@href, "/perfume/")]/@href').getall()
+            } - seen_links,
+            key=perfume_sort_key
+        )
+        seen_links.update(page_links)
         
-        for link in perfume_links[:self.max_urls_per_designer]:
-            full_url = response.urljoin(link)
-            
-            # ✅ Normaliser l'URL pour éviter les doublons
-            normalized_url = full_url.rstrip('/').split('?')[0]
-            
-            # Vérifier si l'URL existe déjà
-            if normalized_url not in self.existing_urls:
-                new_urls.append(normalized_url)
-                # Ajouter au set local pour éviter les doublons dans cette session
-                self.existing_urls.add(normalized_url)
-                
-                yield {
-                    "designer": designer,
-                    "perfume_url": normalized_url
-                }
-            else:
-                duplicate_count += 1
+        next_page = response.xpath('//a[@rel="next"]/@href').get()
+        state = self.designer_states.get(designer_url, {})
         
-        # Log précis
-        if new_urls:
-            self.logger.info(
-                f"{designer}: {len(new_urls)} new URLs collected "
-                f"({duplicate_count} already in DB, total found: {len(perfume_links)})"
+        # Dernière page : empreinte de tous les liens du designer. Liste
+        # identique au dernier parcours complet : re-fetch espacé
+        links_hash = None if next_page else links_fingerprint(seen_links)
+        unchanged = (
+            links_hash is not None
+            and state.get("complete")
+            and state.get("links_hash") == links_hash
+        )
+        
+        # Les pages précédentes ont déjà émis leurs URLs (dédoublonnées
+        # par existing_urls) ; un designer d'une page inchangé n'émet rien
+        if not (unchanged and page == 1):
+            yield from self._emit_new_urls(designer, page_links)
+        
+        if next_page:
+            yield scrapy.Request(
+                response.urljoin(next_page),
+                callback=self.parse_designer,
+                meta={
+                    "designer": designer,
+                    "designer_url": designer_url,
+                    "page": page + 1,
+                },
+                errback=self.handle_error,
+                dont_filter=True
             )
-        else:
+            return
+        
+        # Dernière page atteinte : le designer est entièrement énuméré
+        del self.designer_links[designer_url]
+        yield DesignerStateItem(
+            designer=designer,
+            designer_url=designer_url,
+            perfume_count=len(seen_links),
+            links_hash=links_hash,
+            fetched_at=utcnow(),
+            unchanged_runs=state.get("unchanged_runs", 0) + 1 if unchanged else 0,
+            pages=page,
+            complete=True,
+        )
+        
+        if unchanged:
             self.logger.info(
-                f"{designer}: 0 new URLs - all {duplicate_count} already in DB "
-                f"(total found: {len(perfume_links)})"
+                f"{designer}: unchanged since last fetch "
+                f"({len(seen_links)} perfumes)"
             )
     
+    def _emit_new_urls(self, designer, urls):
+        """Émet les URLs absentes de la base, dans l'ordre reçu."""
+        new_count = 0
+        duplicate_count = 0
+        
+        for url in urls:
+            # Vérifier si l'URL existe déjà
+            if url in self.existing_urls:
+                duplicate_count += 1
+                continue
+            
+            # Ajouter au set local pour éviter les doublons dans cette session
+            self.existing_urls.add(url)
+            new_count += 1
+            
+            yield {
+                "designer": designer,
+                "perfume_url": url
+            }
+        
+        self.logger.info(
+            f"{designer}: {new_count} new URLs collected "
+            f"({duplicate_count} already in DB, total found: {len(urls)})"
+        )
+    
     def handle_error(self, failure):
         """Gère les erreurs de requête de manière non-bloquante."""
+        self.designer_links.pop(failure.request.meta.get("designer_url"), None)
         if "IgnoreRequest" in str(failure):
             return
         
@@ -1,57 +1,88 @@
 #!/usr/bin/env python3
 """
 Script principal pour lancer les scrapers Fragrantica.
-Usage: python run_scrapers.py [--urls-only|--data-only|--stats|--resume]
+Usage: python run_scrapers.py [--urls-only|--data-only|--stats|--resume|--benchmark] [--profile]
 """
 
 import sys
-import subprocess
 import argparse
 from pathlib import Path
 from pymongo import MongoClient
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from fragrantica_scraper import designer_stats
 
 # Charger .env
 load_dotenv()
 
 
-def run_command(cmd, description):
-    """Exécute une commande Scrapy et gère les erreurs."""
+# Canal de passage des URLs entre les deux spiders (voir handoff.py)
+URL_HANDOFF_NAME = "run_scrapers"
+
+STAGES = {
+    "perfume_urls": "Collection des URLs de parfums",
+    "perfume_data": "Scraping des données de parfums",
+}
+
+
+def run_crawl(spider_names, profiling=False, recrawl=False):
+    """
+    Lance les spiders dans un seul processus Scrapy.
+    
+    Quand les deux étapes tournent ensemble, elles se chevauchent : chaque
+    URL découverte est transmise directement au spider de données, et les
+    deux spiders partagent le budget GLOBAL_RATE_LIMIT.
+    
+    Args:
+        spider_names (list): Spiders à lancer
+        profiling (bool): Profilage des callbacks et pipelines (logs/profiling/)
+        recrawl (bool): Re-scraper les parfums déjà en base (mis à jour en place)
+    
+    Returns:
+        dict: {nom du spider: finish_reason}
+    """
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    
+    settings = get_project_settings()
+    if len(spider_names) > 1:
+        settings.set('URL_HANDOFF', URL_HANDOFF_NAME, priority='cmdline')
+    if profiling:
+        settings.set('PROFILING_ENABLED', True, priority='cmdline')
+    
     print(f"\n{'='*70}")
-    print(f"🚀 {description}")
+    for i, name in enumerate(spider_names, 1):
+        print(f"🚀 Étape {i}/{len(spider_names)}: {STAGES[name]}")
+    if len(spider_names) > 1:
+        print("   (en parallèle, URLs transmises au fil de l'eau)")
+    rate = settings.getfloat('GLOBAL_RATE_LIMIT')
+    if rate > 0:
+        print(f"   Budget global: {rate:g} requêtes/s")
+    if settings.getbool('PROFILING_ENABLED'):
+        print(f"   🔬 Profilage activé ({settings.get('PROFILING_DIR')}/)")
     print(f"{'='*70}\n")
     
-    try:
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            check=False,  # Ne pas lever d'exception sur les codes d'erreur
-            text=True
-        )
-        
-        # Codes de sortie acceptables
-        # 0 = succès complet
-        # 1 = arrêt précoce mais gracieux (429, interruption, etc.)
-        if result.returncode in (0, 1):
-            if result.returncode == 0:
-                print(f"\n✅ {description} - Terminé avec succès")
-            else:
-                print(f"\n⚠️  {description} - Arrêté prématurément (code {result.returncode})")
-                print("    Les données collectées jusqu'ici ont été sauvegardées.")
-            return True
+    process = CrawlerProcess(settings)
+    crawlers = {}
+    for name in spider_names:
+        crawlers[name] = process.create_crawler(name)
+        kwargs = {'recrawl': True} if recrawl and name == 'perfume_data' else {}
+        process.crawl(crawlers[name], **kwargs)
+    process.start()
+    
+    reasons = {}
+    for name, crawler in crawlers.items():
+        reason = crawler.stats.get_value('finish_reason') if crawler.stats else None
+        reasons[name] = reason
+        if reason == 'finished':
+            print(f"✅ {STAGES[name]} - Terminé avec succès")
+        elif reason:
+            print(f"⚠️  {STAGES[name]} - Arrêté prématurément ({reason})")
+            print("    Les données collectées jusqu'ici ont été sauvegardées.")
         else:
-            print(f"\n❌ {description} - Échec avec le code d'erreur {result.returncode}")
-            return False
-            
-    except KeyboardInterrupt:
-        print(f"\n\n⚠️  Interruption par l'utilisateur (Ctrl+C)")
-        print("    Les données collectées jusqu'ici ont été sauvegardées.")
-        return True  # Considérer comme succès partiel
-    except Exception as e:
-        print(f"\n❌ Erreur inattendue: {e}")
-        return False
+            print(f"❌ {STAGES[name]} - Échec au démarrage")
+    return reasons
 
 
 def get_mongo_stats():
@@ -91,18 +122,16 @@ def get_mongo_stats():
             print(f"Restant à scraper:         {remaining:,}")
             print(f"Progression:               {progress:.1f}%")
             
-            # Designers les plus représentés
-            pipeline = [
-                {"$group": {"_id": "$designer", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 5}
-            ]
-            top_designers = list(db.perfume_urls.aggregate(pipeline))
+            # Designers les plus représentés (compteurs tenus par les pipelines)
+            top_designers = designer_stats.top_designers(db, designer_stats.URLS_FOUND, limit=5)
             
             if top_designers:
                 print(f"\nTop 5 designers (URLs):")
                 for i, designer in enumerate(top_designers, 1):
-                    print(f"  {i}. {designer['_id']}: {designer['count']:,} parfums")
+                    print(f"  {i}. {designer['_id']}: {designer['urls_found']:,} parfums")
+            
+            done = designer_stats.fully_scraped(db)
+            print(f"\nDesigners entièrement scrapés: {len(done):,}")
         
         print(f"{'='*70}\n")
         
@@ -143,6 +172,46 @@ def check_mongodb():
         return False
 
 
+def run_benchmark(args):
+    """Benchmark de bout en bout contre le serveur Fragrantica local."""
+    from fragrantica_scraper.benchmark import run_benchmark as run
+    
+    print(f"\n{'='*70}")
+    print("⏱️  Benchmark du crawl (serveur local + MongoDB en mémoire)")
+    print(f"{'='*70}")
+    print(f"Designers:                 {args.bench_designers:,}")
+    print(f"Parfums par designer:      {args.bench_perfumes:,}")
+    print(f"Latence simulée:           {args.bench_latency_ms:.0f} ms")
+    print(f"Taux de 429:               {args.bench_429_rate:.1%}")
+    print(f"Profil de crawl:           {args.crawl_profile}")
+    print(f"Mode:                      {'séquentiel' if args.bench_sequential else 'parallèle (passage des URLs)'}")
+    
+    results = run(
+        designers=args.bench_designers,
+        perfumes_per_designer=args.bench_perfumes,
+        latency_ms=args.bench_latency_ms,
+        rate_429=args.bench_429_rate,
+        profile=args.crawl_profile,
+        overlap=not args.bench_sequential,
+        profiling=args.profiling
+    )
+    
+    print(f"\n{'Étape':<14}{'Fin':<18}{'Pages':>7}{'Items':>7}{'Pages/s':>9}"
+          f"{'Items/s':>9}{'p95 item→DB':>13}")
+    print(f"{'─'*77}")
+    for stage in results['stages']:
+        print(f"{stage['stage']:<14}{stage['reason']:<18}{stage['pages']:>7}"
+              f"{stage['items']:>7}{stage['pages_per_sec']:>9.1f}"
+              f"{stage['items_per_sec']:>9.1f}{stage['p95_item_ms']:>10.1f} ms")
+    
+    server = results['server']
+    print(f"\nDurée totale:              {results['elapsed']:.2f} s")
+    print(f"Requêtes servies:          {server['requests']:,} ({server['status_429']} en 429)")
+    print(f"URLs en base:              {results['mongo']['perfume_urls']:,} / {server['perfumes']:,}")
+    print(f"Parfums en base:           {results['mongo']['perfume_data']:,} / {server['perfumes']:,}")
+    print(f"{'='*70}\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Lance les scrapers Fragrantica',
@@ -154,6 +223,10 @@ Exemples d'utilisation:
   python run_scrapers.py --data-only  # Scrappe uniquement les données
   python run_scrapers.py --stats      # Affiche les statistiques
   python run_scrapers.py --resume     # Reprend après interruption
+  python run_scrapers.py --data-only --recrawl  # Re-scrappe et met à jour les parfums
+  python run_scrapers.py --benchmark  # Benchmark contre un serveur local
+  python run_scrapers.py --profile    # Exécute tout avec profilage (logs/profiling/)
+  python run_scrapers.py --benchmark --crawl-profile polite  # Benchmark d'un profil de crawl
         """
     )
     
@@ -165,6 +238,24 @@ Exemples d'utilisation:
                        help='Affiche uniquement les statistiques MongoDB')
     parser.add_argument('--resume', action='store_true',
                        help='Reprend le scraping après interruption')
+    parser.add_argument('--recrawl', action='store_true',
+                       help='Re-scrappe les parfums déjà en base (mis à jour en place, inchangés sans écriture)')
+    parser.add_argument('--profile', dest='profiling', action='store_true',
+                       help='Profile callbacks et pipelines (timers + piles dans logs/profiling/)')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Benchmark contre un serveur Fragrantica local (sans MongoDB)')
+    parser.add_argument('--bench-designers', type=int, default=20,
+                       help='Benchmark: nombre de designers (défaut: 20)')
+    parser.add_argument('--bench-perfumes', type=int, default=10,
+                       help='Benchmark: parfums par designer (défaut: 10)')
+    parser.add_argument('--bench-latency-ms', type=float, default=20,
+                       help='Benchmark: latence simulée en ms (défaut: 20)')
+    parser.add_argument('--bench-429-rate', type=float, default=0.0,
+                       help='Benchmark: proportion de réponses 429 (défaut: 0)')
+    parser.add_argument('--bench-sequential', action='store_true',
+                       help='Benchmark: étapes l\'une après l\'autre (comparaison)')
+    parser.add_argument('--crawl-profile', default='aggressive',
+                       help='Benchmark: profil de crawl (défaut: aggressive)')
     
     args = parser.parse_args()
     
@@ -174,6 +265,11 @@ Exemples d'utilisation:
         print("   Exécutez ce script depuis la racine du projet.")
         sys.exit(1)
     
+    # Benchmark : serveur local et MongoDB en mémoire
+    if args.benchmark:
+        run_benchmark(args)
+        sys.exit(0)
+    
     # Vérifier MongoDB
     if not check_mongodb():
         sys.exit(1)
@@ -192,29 +288,18 @@ Exemples d'utilisation:
     # Statistiques avant
     get_mongo_stats()
     
-    # Étape 1: Collecter les URLs
+    # Étapes 1 et 2 dans le même processus (elles se chevauchent)
+    spider_names = []
     if not args.data_only:
-        success = run_command(
-            "scrapy crawl perfume_urls",
-            "Étape 1/2: Collection des URLs de parfums"
-        )
-        
-        # Ne pas arrêter même en cas d'arrêt prématuré (429)
-        # On continue avec les URLs qu'on a
-        if not success:
-            print("\n⚠️  La collection d'URLs a rencontré un problème")
-            print("   Mais nous allons continuer avec les URLs déjà collectées...")
-    
-    # Étape 2: Scraper les données
+        spider_names.append("perfume_urls")
     if not args.urls_only:
-        success = run_command(
-            "scrapy crawl perfume_data",
-            "Étape 2/2: Scraping des données de parfums"
-        )
-        
-        if not success:
-            print("\n⚠️  Le scraping des données s'est arrêté")
-            print("   Vous pouvez reprendre avec: python run_scrapers.py --data-only")
+        spider_names.append("perfume_data")
+    
+    reasons = run_crawl(spider_names, profiling=args.profiling, recrawl=args.recrawl)
+    
+    if reasons.get("perfume_data") not in (None, "finished"):
+        print("\n⚠️  Le scraping des données s'est arrêté")
+        print("   Vous pouvez reprendre avec: python run_scrapers.py --data-only")
     
     # Statistiques finales
     print(f"\n{'='*70}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la lecture groupée contre la boucle de requêtes unitaires.
+
+Pour N parfums, compare :
+- boucle : N × GET /api/perfumes/<id> (une requête HTTP et un find_one chacune)
+- batch  : 1 × POST /api/perfumes/batch {"ids": [...]} (une requête `$in`)
+
+Connexion HTTP/1.1 keep-alive dans les deux cas : l'écart mesure les allers-
+retours HTTP et MongoDB économisés, pas l'ouverture des connexions.
+
+Usage: python scripts/bench_batch.py [--url http://localhost:5000] [--sizes 10 50 100] [--rounds 20]
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+class Client:
+    """Client JSON keep-alive minimal."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+    def request(self, method, path, body=None):
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            body = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        payload = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path}: HTTP {response.status} {payload[:200]!r}")
+        return json.loads(payload)
+
+    def close(self):
+        self.connection.close()
+
+
+def sample_ids(client, count):
+    """IDs de parfums existants (premières pages de la liste)."""
+    ids = []
+    page = 1
+    while len(ids) < count:
+        data = client.request("GET", f"/api/perfumes?per_page=100&page={page}")["data"]
+        if not data:
+            break
+        ids.extend(perfume["id"] for perfume in data)
+        page += 1
+    return ids[:count]
+
+
+def looped(client, ids):
+    return [client.request("GET", f"/api/perfumes/{perfume_id}")["data"] for perfume_id in ids]
+
+
+def batched(client, ids):
+    return client.request("POST", "/api/perfumes/batch", {"ids": ids})["data"]
+
+
+def measure(fn, client, ids, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn(client, ids)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de POST /api/perfumes/batch")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    client = Client(args.url)
+    ids = sample_ids(client, max(args.sizes))
+
+    print(f"\n{'='*72}")
+    print(f"{'N':>6}{'Boucle (ms)':>16}{'Batch (ms)':>16}{'Gain':>10}{'Requêtes':>16}")
+    print(f"{'─'*72}")
+    for size in args.sizes:
+        keys = ids[:size]
+        loop_ms, loop_result = measure(looped, client, keys, args.rounds)
+        batch_ms, batch_result = measure(batched, client, keys, args.rounds)
+        # Même contenu, même ordre
+        assert [p["id"] for p in batch_result] == [p["id"] for p in loop_result]
+        print(
+            f"{len(keys):>6}{loop_ms:>16.1f}{batch_ms:>16.1f}"
+            f"{loop_ms / batch_ms:>9.1f}x{f'{len(keys)} → 1':>16}"
+        )
+    print(f"{'='*72}\n")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
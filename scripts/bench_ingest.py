@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'écriture des parfums : ancien pipeline contre upserts groupés.
+
+Pour N items (défaut 1000), mesure écritures, octets envoyés et allers-
+retours MongoDB de trois passes :
+- crawl initial (tous les parfums sont nouveaux)
+- re-crawl sans changement
+- re-crawl avec une part de parfums modifiés (--changed, défaut 5 %)
+
+Ancien pipeline : insert_one par item, DuplicateKeyError pour un parfum
+connu, puis update_one limité aux documents d'un schéma antérieur (une
+modification du contenu n'est jamais écrite).
+Nouveau pipeline (ingest.py) : par lot, une lecture `$in` des empreintes
+et un bulk_write des seuls parfums nouveaux ou modifiés.
+
+Octets : taille BSON des documents / opérations d'écriture envoyés.
+Allers-retours : commandes envoyées à un serveur MongoDB (mongomock
+applique les opérations d'un bulk_write une par une).
+
+Usage: python scripts/bench_ingest.py [--items 1000] [--changed 0.05]
+       [--batch 100] [--mongo-uri mongomock://bench_ingest]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import bson
+from pymongo.errors import DuplicateKeyError
+from scrapy import Spider
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fragrantica_scraper.mongo import get_mongo_client
+from fragrantica_scraper.pipelines import MongoPerfumeDataPipeline
+
+DATABASE = "fragrantica_bench_ingest"
+ACCORDS = ["woody", "citrus", "floral", "amber", "musky", "fresh spicy", "powdery", "sweet"]
+
+
+def items(count, changed=0.0, generation=0):
+    """Items de parfums synthétiques ; les `changed` premiers pour cent ont une note modifiée."""
+    modified = int(count * changed)
+    for i in range(count):
+        yield {
+            "url": f"https://www.fragrantica.com/perfume/Brand-{i % 50}/Perfume-{i}.html",
+            "fragrantica_id": i,
+            "brand": f"Brand {i % 50}",
+            "name": f"Perfume {i}",
+            "accords": {accord: 100.0 - 10 * n for n, accord in enumerate(ACCORDS[: 4 + i % 4])},
+            "notes": {"top": ["Bergamot", "Pepper"], "middle": ["Lavender"], "base": ["Ambroxan"]},
+            "description": f"Perfume {i} by Brand {i % 50} is a fragrance for men. " * 4,
+            "rating": round(3.5 + (i % 10) / 10 + (0.01 * generation if i < modified else 0), 2),
+            "votes": 1000 + i,
+            "year": 2000 + i % 25,
+            "gender": "men",
+            "image_url": f"https://fimgs.net/mdimg/perfume/375x500.{i}.jpg",
+            "schema_version": 2,
+        }
+
+
+def legacy_pass(collection, batch):
+    """Ancien MongoPerfumeDataPipeline.process_item (insert puis DuplicateKeyError)."""
+    stats = {"writes": 0, "bytes": 0, "round_trips": 0, "inserted": 0, "updated": 0}
+    for document in batch:
+        document = dict(document)
+        stats["writes"] += 1
+        stats["round_trips"] += 1
+        stats["bytes"] += len(bson.encode(document))
+        try:
+            collection.insert_one(document)
+            stats["inserted"] += 1
+        except DuplicateKeyError:
+            document.pop("_id", None)
+            query = {
+                "url": document["url"],
+                "schema_version": {"$not": {"$gte": document.get("schema_version", 0)}},
+            }
+            update = {"$set": document}
+            stats["writes"] += 1
+            stats["round_trips"] += 1
+            stats["bytes"] += len(bson.encode(query)) + len(bson.encode(update))
+            stats["updated"] += collection.update_one(query, update).modified_count
+    return stats
+
+
+def upsert_pass(uri, batch, batch_size):
+    """MongoPerfumeDataPipeline actuel (lots, empreintes, bulk_write)."""
+    pipeline = MongoPerfumeDataPipeline(uri, DATABASE, write_batch=batch_size)
+    spider = Spider(name="perfume_data")
+    pipeline.open_spider(spider)
+    # Par lot : une lecture des empreintes, plus un bulk_write s'il y a à écrire
+    round_trips = 0
+    writes = 0
+    for document in batch:
+        pipeline.process_item(dict(document), spider)
+        if not len(pipeline.write_buffer):
+            round_trips += 1 + (pipeline.writes > writes)
+            writes = pipeline.writes
+    if len(pipeline.write_buffer):
+        pipeline._flush_documents()
+        round_trips += 1 + (pipeline.writes > writes)
+    return {
+        "writes": pipeline.writes,
+        "bytes": pipeline.write_bytes,
+        "round_trips": round_trips,
+        "inserted": pipeline.items_saved,
+        "updated": pipeline.items_updated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'écriture des parfums")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--changed", type=float, default=0.05)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--mongo-uri", default="mongomock://bench_ingest")
+    args = parser.parse_args()
+
+    client = get_mongo_client(args.mongo_uri)
+    passes = [
+        ("Crawl initial", list(items(args.items))),
+        ("Re-crawl identique", list(items(args.items))),
+        (f"Re-crawl {args.changed:.0%} modifiés", list(items(args.items, args.changed, generation=1))),
+    ]
+    per_1k = 1000 / args.items
+
+    print(f"\n{'='*88}")
+    print(f"{'Passe':<24}{'Pipeline':<10}{'Écritures/1k':>14}{'Ko/1k':>10}"
+          f"{'Allers-retours':>16}{'Insérés':>8}{'Modifiés':>10}")
+    for label in ("ancien", "upsert"):
+        client.drop_database(DATABASE)
+        collection = client[DATABASE]["perfume_data"]
+        collection.create_index("url", unique=True)
+        print(f"{'─'*88}")
+        for name, batch in passes:
+            if label == "ancien":
+                stats = legacy_pass(collection, batch)
+            else:
+                stats = upsert_pass(args.mongo_uri, batch, args.batch)
+            print(
+                f"{name:<24}{label:<10}{stats['writes'] * per_1k:>14,.0f}"
+                f"{stats['bytes'] * per_1k / 1024:>10,.1f}{stats['round_trips'] * per_1k:>16,.0f}"
+                f"{stats['inserted']:>8}{stats['updated']:>10}"
+            )
+    print(f"{'='*88}\n")
+    client.drop_database(DATABASE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark du modèle Perfume sur une page de 100 parfums.
+
+Mesure, sur des documents synthétiques (scripts/bench_serialization.py) :
+- la mémoire allouée par instance Perfume (hors document MongoDB, tracemalloc) ;
+- la construction via Perfume.list_from_db ;
+- le rendu du template brand_detail.html (accès nom, marque, accords triés, id).
+
+Aucune base MongoDB n'est nécessaire : l'app Flask est montée sans connexion,
+avec les blueprints et les filtres de template de create_app.
+
+Usage: python scripts/bench_model.py [--per-page 100] [--rounds 300]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from flask import Flask, render_template
+
+from webapp.models.perfume import Perfume
+from webapp.routes import api_bp, main_bp, perfumes_bp
+from webapp.services.count_service import CountService
+from scripts.bench_serialization import make_documents, measure
+
+
+def render_app():
+    """App Flask minimale capable de rendre les templates de la webapp."""
+    app = Flask("webapp.app", root_path=str(Path(__file__).resolve().parent.parent / "webapp"))
+    app.register_blueprint(main_bp)
+    app.register_blueprint(perfumes_bp)
+    app.register_blueprint(api_bp)
+    # Mêmes filtres et variables globales que create_app
+    app.add_template_filter(lambda value: f"{value:,}".replace(",", " "), "format_number")
+    app.add_template_filter(lambda value, decimals=1: f"{value:.{decimals}f}%", "percentage")
+    app.context_processor(lambda: {"app_name": "Fragrantica Explorer", "app_version": "1.0.0"})
+    return app
+
+
+def instance_size(docs):
+    """Octets alloués par instance Perfume (documents déjà en mémoire)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    perfumes = Perfume.list_from_db(docs)
+    # Les valeurs dérivées font partie du coût réel d'une page rendue
+    for perfume in perfumes:
+        perfume.id, perfume.sorted_accords, perfume.perfume_id
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return allocated / len(perfumes)
+
+
+def render_page(app, docs):
+    with app.test_request_context("/brand/Bench"):
+        results = CountService.page(Perfume.list_from_db(docs), (5000, "eq"), 1, len(docs))
+        return render_template("brand_detail.html", brand_name="Bench", results=results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du modèle Perfume")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    docs = make_documents(args.per_page)
+    app = render_app()
+    render_page(app, docs)  # compilation du template
+
+    build_ms, _ = measure(lambda: Perfume.list_from_db(docs), args.rounds)
+    render_ms, html = measure(lambda: render_page(app, docs), args.rounds)
+    size = instance_size(docs)
+
+    print(f"\n{'='*56}")
+    print(f"Modèle Perfume, page de {args.per_page} parfums (médiane sur {args.rounds})")
+    print(f"{'='*56}")
+    print(f"{'Mémoire par instance':<36}{size:>12.0f} o")
+    print(f"{'list_from_db':<36}{build_ms:>12.3f} ms")
+    print(f"{'Rendu brand_detail.html':<36}{render_ms:>12.3f} ms")
+    print(f"{'Taille HTML':<36}{len(html) / 1024:>12.1f} Ko")
+    print(f"{'='*56}\n")
+
+
+if __name__ == "__main__":
+    main()
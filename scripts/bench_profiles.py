@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark des profils de crawl contre un serveur HTTP local.
+Mesure pour chaque profil : pages/s, latence de téléchargement (p50/p95)
+et nombre de connexions TCP ouvertes (réutilisation keep-alive).
+
+Usage: python scripts/bench_profiles.py [--pages N] [--latency-ms MS] [--profiles polite balanced ...]
+"""
+
+import argparse
+import gzip
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scrapy.utils.reactor import install_reactor
+
+install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+import scrapy
+from scrapy.crawler import CrawlerRunner
+from scrapy.settings import Settings
+from twisted.internet import defer, reactor
+
+from fragrantica_scraper.profiles import PROFILES, get_profile
+
+# Page de taille comparable à une page parfum Fragrantica (~150 Ko non compressés)
+PAGE_BODY = (
+    "<html><body><h1>Stand-in page</h1>"
+    + "<div class='w-full'><span class='truncate'>woody</span></div>" * 2500
+    + "</body></html>"
+).encode("utf-8")
+PAGE_BODY_GZIP = gzip.compress(PAGE_BODY)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serveur HTTP/1.1 keep-alive qui compte les connexions acceptées."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency):
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+
+        body = PAGE_BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = PAGE_BODY_GZIP
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInSpider(scrapy.Spider):
+    name = "bench_profiles"
+
+    def __init__(self, base_url, pages, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+        self.pages = pages
+        self.latencies = []
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for i in range(self.pages):
+            yield scrapy.Request(f"{self.base_url}/page/{i}", dont_filter=True)
+
+    def parse(self, response):
+        self.latencies.append(response.meta["download_latency"])
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@defer.inlineCallbacks
+def run_benchmarks(server, profiles, pages, results):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    for name in profiles:
+        settings = Settings({
+            "LOG_LEVEL": "WARNING",
+            "ROBOTSTXT_OBEY": False,
+            "TELNETCONSOLE_ENABLED": False,
+            "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
+        })
+        settings.setdict(get_profile(name), priority="spider")
+
+        server.connections = 0
+        runner = CrawlerRunner(settings)
+        crawler = runner.create_crawler(StandInSpider)
+
+        started = time.perf_counter()
+        yield runner.crawl(crawler, base_url=base_url, pages=pages)
+        elapsed = time.perf_counter() - started
+
+        latencies = crawler.spider.latencies
+        results.append({
+            "profile": name,
+            "pages": len(latencies),
+            "elapsed": elapsed,
+            "pages_per_sec": len(latencies) / elapsed if elapsed else 0,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "connections": server.connections,
+        })
+
+    reactor.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des profils de crawl")
+    parser.add_argument("--pages", type=int, default=30,
+                        help="Pages téléchargées par profil (défaut: 30)")
+    parser.add_argument("--latency-ms", type=float, default=50,
+                        help="Latence simulée du serveur en ms (défaut: 50)")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES),
+                        choices=list(PROFILES), help="Profils à mesurer")
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", 0), latency=args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"🖥️  Stand-in server on port {server.server_address[1]} "
+          f"({args.latency_ms:.0f} ms latency, {len(PAGE_BODY) // 1024} KB pages)")
+
+    results = []
+    reactor.callWhenRunning(run_benchmarks, server, args.profiles, args.pages, results)
+    reactor.run()
+    server.shutdown()
+
+    print(f"\n{'='*78}")
+    print(f"{'Profile':<12}{'Pages':>7}{'Time (s)':>10}{'Pages/s':>10}"
+          f"{'p50 (ms)':>11}{'p95 (ms)':>11}{'TCP conns':>12}")
+    print(f"{'-'*78}")
+    for r in results:
+        print(f"{r['profile']:<12}{r['pages']:>7}{r['elapsed']:>10.2f}"
+              f"{r['pages_per_sec']:>10.2f}{r['p50_ms']:>11.1f}{r['p95_ms']:>11.1f}"
+              f"{r['connections']:>12}")
+    print(f"{'='*78}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la sérialisation des réponses API (page de 100 parfums).
+
+Compare, sur des documents synthétiques au format du scraper :
+- construction des Perfume + to_dict() ;
+- JSON stdlib (équivalent de jsonify par défaut : clés triées, compact) ;
+- JSON orjson et MessagePack (webapp/utils/serializers.py).
+
+Usage: python scripts/bench_serialization.py [--per-page 100] [--rounds 300]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from webapp.models.perfume import Perfume
+from webapp.utils import serializers
+
+ACCORDS = [
+    "woody", "citrus", "floral", "white floral", "sweet", "powdery", "fresh",
+    "aromatic", "amber", "musky", "fruity", "vanilla", "warm spicy", "green",
+    "leather", "oud", "marine", "earthy", "lactonic", "tobacco",
+]
+NOTES = ["Bergamot", "Lemon", "Pear", "Jasmine", "Rose", "Iris", "Cedar",
+         "Sandalwood", "Vanilla", "Musk", "Patchouli", "Amber", "Vetiver"]
+
+
+def make_documents(count, seed=0):
+    """Documents MongoDB synthétiques (schéma v2 du scraper)."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        perfume_id = 10000 + i
+        docs.append({
+            "_id": ObjectId(),
+            "name": f"Perfume {perfume_id}",
+            "brand": f"Brand {i % 40}",
+            "url": f"https://www.fragrantica.com/perfume/Brand-{i % 40}/Perfume-{perfume_id}.html",
+            "accords": {a: round(rng.uniform(30, 100), 4) for a in rng.sample(ACCORDS, rng.randint(6, 12))},
+            "description": " ".join(rng.choice(NOTES) for _ in range(90)),
+            "notes": {level: rng.sample(NOTES, 3) for level in ("top", "middle", "base")},
+            "rating": round(rng.uniform(2.5, 4.8), 2),
+            "votes": rng.randint(10, 30000),
+            "year": rng.randint(1950, 2025),
+            "gender": rng.choice(["women", "men", "unisex"]),
+            "image_url": f"https://fimgs.net/mdimg/perfume/375x500.{perfume_id}.jpg",
+            "schema_version": 2,
+        })
+    return docs
+
+
+def payload(docs):
+    """Corps de /api/perfumes?per_page=N."""
+    return {
+        "success": True,
+        "data": [p.to_dict() for p in Perfume.list_from_db(docs)],
+        "pagination": {"page": 1, "per_page": len(docs), "total": 5000, "pages": 50},
+    }
+
+
+def stdlib_json(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def measure(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation API")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    docs = make_documents(args.per_page)
+    body = payload(docs)
+
+    rows = [("Perfume + to_dict()", *measure(lambda: payload(docs), args.rounds))]
+    rows.append(("json (stdlib, jsonify)", *measure(lambda: stdlib_json(body), args.rounds)))
+    if serializers.orjson is not None:
+        rows.append(("orjson", *measure(lambda: serializers.dumps_json(body), args.rounds)))
+    if serializers.msgpack is not None:
+        rows.append(("msgpack", *measure(lambda: serializers.dumps_msgpack(body), args.rounds)))
+
+    print(f"\n{'='*64}")
+    print(f"Sérialisation d'une page de {args.per_page} parfums (médiane sur {args.rounds})")
+    print(f"{'='*64}")
+    print(f"{'Étape':<28}{'Temps (ms)':>14}{'Taille (Ko)':>14}")
+    print(f"{'─'*64}")
+    for name, ms, result in rows:
+        size = f"{len(result) / 1024:.1f}" if isinstance(result, bytes) else "-"
+        print(f"{name:<28}{ms:>14.3f}{size:>14}")
+    print(f"{'='*64}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Test de charge HTTP des endpoints de la webapp.
+
+Client HTTP/1.1 keep-alive en boucle fermée (N clients concurrents, chacun
+enchaîne ses requêtes) : débit, latences p50/p95/p99 et erreurs par URL.
+
+Usage:
+    # Contre un serveur déjà lancé
+    python scripts/loadtest.py --url http://localhost:5000 --concurrency 32 --duration 20
+
+    # gunicorn (sync, app Flask) contre uvicorn (ASGI), même nombre de workers
+    python scripts/loadtest.py --compare --workers 4
+
+Le mode --compare lance lui-même les deux serveurs sur des ports locaux avec
+la configuration MongoDB courante (MONGO_URI / .env).
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_PATHS = [
+    "/api/perfumes?per_page=24",
+    "/api/perfumes?per_page=24&search=rose",
+    "/api/random",
+    "/api/stats",
+]
+
+SERVERS = {
+    "gunicorn": ["gunicorn", "--workers", "{workers}", "--timeout", "120",
+                 "--bind", "127.0.0.1:{port}", "webapp.app:app"],
+    "uvicorn": ["uvicorn", "webapp.asgi:app", "--workers", "{workers}",
+                "--host", "127.0.0.1", "--port", "{port}", "--no-access-log"],
+}
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def fetch(reader, writer, host, path):
+    """Envoie un GET keep-alive et lit la réponse. Retourne (code HTTP, keep-alive)."""
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+
+    length = None
+    chunked = False
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name == "connection" and "close" in value.lower():
+            keep_alive = False
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(base_url, paths, deadline, offset, results, timeout):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    reader = writer = None
+    i = offset
+
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            status, keep_alive = await asyncio.wait_for(
+                fetch(reader, writer, parts.netloc, path), timeout
+            )
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError,
+                asyncio.TimeoutError):
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            results[path]["errors"] += 1
+            await asyncio.sleep(0.01)
+            continue
+
+        results[path]["latencies"].append(time.perf_counter() - started)
+        if status >= 400:
+            results[path]["errors"] += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(base_url, paths, concurrency, duration, timeout=30):
+    """
+    Lance `concurrency` clients pendant `duration` secondes.
+
+    Returns:
+        dict: {chemin: {'latencies': [...], 'errors': int}}, durée réelle
+    """
+    results = {path: {"latencies": [], "errors": 0} for path in paths}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        client(base_url, paths, deadline, i, results, timeout) for i in range(concurrency)
+    ))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    rows = []
+    for path, r in results.items():
+        lat = r["latencies"]
+        rows.append({
+            "path": path,
+            "requests": len(lat),
+            "rps": len(lat) / elapsed if elapsed else 0,
+            "p50_ms": percentile(lat, 50) * 1000,
+            "p95_ms": percentile(lat, 95) * 1000,
+            "p99_ms": percentile(lat, 99) * 1000,
+            "errors": r["errors"],
+        })
+    every = [x for r in results.values() for x in r["latencies"]]
+    rows.append({
+        "path": "TOTAL",
+        "requests": len(every),
+        "rps": len(every) / elapsed if elapsed else 0,
+        "p50_ms": percentile(every, 50) * 1000,
+        "p95_ms": percentile(every, 95) * 1000,
+        "p99_ms": percentile(every, 99) * 1000,
+        "errors": sum(r["errors"] for r in results.values()),
+    })
+    return rows
+
+
+def print_rows(title, rows):
+    print(f"\n{title}")
+    print(f"{'URL':<42}{'Req':>8}{'Req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Err':>6}")
+    print(f"{'─'*92}")
+    for r in rows:
+        print(f"{r['path'][:41]:<42}{r['requests']:>8}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}"
+              f"{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['errors']:>6}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server not ready on port {port}")
+
+
+def compare(args):
+    """Lance gunicorn puis uvicorn avec le même nombre de workers et les mesure."""
+    summaries = {}
+    for name, template in SERVERS.items():
+        port = free_port()
+        cmd = [part.format(workers=args.workers, port=port) for part in template]
+        print(f"🚀 {name}: {' '.join(cmd)}")
+        process = subprocess.Popen(cmd, cwd=ROOT, env=os.environ.copy(),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready(port, process)
+            base_url = f"http://127.0.0.1:{port}"
+            # Échauffement (connexions MongoDB, imports paresseux)
+            asyncio.run(run_load(base_url, args.paths, args.concurrency, 2))
+            results, elapsed = asyncio.run(
+                run_load(base_url, args.paths, args.concurrency, args.duration)
+            )
+            summaries[name] = summarize(results, elapsed)
+            print_rows(f"{name} ({args.workers} workers, {args.concurrency} clients)", summaries[name])
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(f"\n{'='*60}")
+    print(f"{'Serveur':<12}{'Req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Err':>8}")
+    print(f"{'─'*60}")
+    for name, rows in summaries.items():
+        total = rows[-1]
+        print(f"{name:<12}{total['rps']:>10.1f}{total['p50_ms']:>10.1f}"
+              f"{total['p95_ms']:>10.1f}{total['p99_ms']:>10.1f}{total['errors']:>8}")
+    print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de la webapp")
+    parser.add_argument("--url", default="http://localhost:5000",
+                        help="URL du serveur à tester (défaut: http://localhost:5000)")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS,
+                        help="Chemins demandés à tour de rôle")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="Clients concurrents (défaut: 32)")
+    parser.add_argument("--duration", type=float, default=20,
+                        help="Durée de la mesure en secondes (défaut: 20)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare gunicorn (sync) et uvicorn (ASGI)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="Workers par serveur en mode --compare (défaut: nombre de cœurs)")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args)
+        return
+
+    results, elapsed = asyncio.run(
+        run_load(args.url, args.paths, args.concurrency, args.duration)
+    )
+    print_rows(f"{args.url} ({args.concurrency} clients, {elapsed:.1f} s)", summarize(results, elapsed))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,9 @@ from pymongo import MongoClient
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fragrantica_scraper import designer_stats
+
 # ✅ Charger les variables d'environnement
 load_dotenv()
 
@@ -71,25 +74,25 @@ class MongoUtils:
         print(f"Perfume URLs collected:    {urls_count:,}")
         
         if urls_count > 0:
-            brands = self.db.perfume_urls.distinct('designer')
-            print(f"Unique brands:             {len(brands):,}")
+            brands = designer_stats.designer_count(self.db)
+            print(f"Unique brands:             {brands:,}")
         
         # Data
         data_count = self.db.perfume_data.count_documents({})
         print(f"\nPerfumes scraped:          {data_count:,}")
         
         if data_count > 0:
-            # Marques les plus représentées
-            pipeline = [
-                {"$group": {"_id": "$brand", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 5}
-            ]
-            top_brands = list(self.db.perfume_data.aggregate(pipeline))
+            # Marques les plus représentées (compteurs tenus par les pipelines)
+            top_brands = designer_stats.top_designers(
+                self.db, designer_stats.PERFUMES_SCRAPED, limit=5
+            )
             
             print("\nTop 5 brands:")
             for i, brand in enumerate(top_brands, 1):
-                print(f"  {i}. {brand['_id']}: {brand['count']:,} perfumes")
+                print(f"  {i}. {brand['_id']}: {brand['perfumes_scraped']:,} perfumes")
+            
+            done = designer_stats.fully_scraped(self.db)
+            print(f"\nFully scraped brands:      {len(done):,}")
         
         # Progress
         if urls_count > 0:
@@ -100,6 +103,30 @@ class MongoUtils:
             print(f"Progress:                  {progress:.1f}%")
             print(f"{'='*70}\n")
     
+    def rebuild_designer_stats(self):
+        """Recalcule designer_stats depuis perfume_urls et perfume_data."""
+        print(f"🔄 Rebuilding {designer_stats.COLLECTION}...")
+        count = designer_stats.rebuild(self.db)
+        print(f"✓ {count:,} designers written to {designer_stats.COLLECTION}")
+    
+    def backfill_timestamps(self):
+        """
+        Horodate les parfums écrits avant created_at/updated_at.
+        
+        La date d'insertion est celle de l'ObjectId : ces documents entrent
+        dans /api/changes dans l'ordre où ils ont été scrapés.
+        """
+        print("🕒 Backfilling created_at / updated_at on perfume_data...")
+        result = self.db.perfume_data.update_many(
+            {'updated_at': {'$exists': False}},
+            [{'$set': {
+                'created_at': {'$ifNull': ['$created_at', {'$toDate': '$_id'}]},
+                'updated_at': {'$toDate': '$_id'},
+            }}]
+        )
+        self.db.perfume_data.create_index([('updated_at', 1), ('_id', 1)])
+        print(f"✓ {result.modified_count:,} documents timestamped")
+    
     def reset_collection(self, collection_name):
         """Vide une collection (avec confirmation)."""
         count = self.db[collection_name].count_documents({})
@@ -134,6 +161,8 @@ def main():
         print("  export-all         - Export both collections")
         print("  reset-urls         - Clear URLs collection")
         print("  reset-data         - Clear data collection")
+        print("  rebuild-designer-stats - Recompute per-designer counters")
+        print("  backfill-timestamps - Add created_at/updated_at to older perfumes")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -153,6 +182,12 @@ def main():
             utils.export_to_json('perfume_urls', 'data/perfume_urls.json')
             utils.export_to_json('perfume_data', 'data/perfume_data.json')
         
+        elif command == 'rebuild-designer-stats':
+            utils.rebuild_designer_stats()
+        
+        elif command == 'backfill-timestamps':
+            utils.backfill_timestamps()
+        
         elif command == 'reset-urls':
             utils.reset_collection('perfume_urls')
         
@@ -4,6 +4,7 @@
 import os
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from fragrantica_scraper import designer_stats
 
 load_dotenv()
 
@@ -22,16 +23,12 @@ def test_url_loading():
     total = db.perfume_urls.count_documents({})
     print(f"Total URLs en base: {total}")
     
-    # Test 2: Compter par designer
-    designers_count = db.perfume_urls.aggregate([
-        {"$group": {"_id": "$designer", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ])
+    # Test 2: Compter par designer (compteurs tenus par les pipelines)
+    designers_count = designer_stats.top_designers(db, designer_stats.URLS_FOUND, limit=10)
     
     print("\nTop 10 designers par nombre d'URLs:")
     for doc in designers_count:
-        print(f"  {doc['_id']}: {doc['count']} URLs")
+        print(f"  {doc['_id']}: {doc['urls_found']} URLs")
     
     # Test 3: Charger toutes les URLs en mémoire (comme le spider)
     print("\nChargement de toutes les URLs en mémoire...")
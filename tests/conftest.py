@@ -0,0 +1,97 @@
+"""
+Fixtures partagées pour les tests hors-ligne des parsers.
+Les pages HTML de tests/fixtures/ reproduisent le balisage de Fragrantica.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+BASE_URL = "https://www.fragrantica.com"
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def load_response(filename, url, meta=None):
+    """
+    Construit une HtmlResponse Scrapy depuis une page de fixture.
+    
+    Args:
+        filename (str): Nom du fichier dans tests/fixtures/
+        url (str): URL à associer à la réponse
+        meta (dict): Meta de la requête (ex: {"designer": ...})
+    
+    Returns:
+        HtmlResponse: Réponse prête à passer à un callback
+    """
+    body = (FIXTURES_DIR / filename).read_bytes()
+    request = Request(url, meta=meta or {})
+    return HtmlResponse(url=url, body=body, encoding="utf-8", request=request)
+
+
+def run_crawl_script(script, env=None, timeout=120):
+    """
+    Exécute un crawl dans un processus séparé (le reactor Twisted ne peut
+    être lancé qu'une fois par processus).
+    
+    Args:
+        script (str): Code Python qui affiche un JSON sur sa dernière ligne
+        env (dict): Variables d'environnement ajoutées
+    
+    Returns:
+        Valeur JSON de la dernière ligne de sortie
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT_DIR, capture_output=True, text=True, timeout=timeout,
+        env={**os.environ, "PYTHONPATH": str(ROOT_DIR), **(env or {})},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture
+def designers_response():
+    return load_response("designers.html", f"{BASE_URL}/designers/")
+
+
+@pytest.fixture
+def designer_response():
+    return load_response(
+        "designer_zoologist.html",
+        f"{BASE_URL}/designers/Zoologist-Perfumes.html",
+        meta={"designer": "Zoologist Perfumes"},
+    )
+
+
+@pytest.fixture
+def perfume_response():
+    return load_response(
+        "perfume_cockatiel.html",
+        f"{BASE_URL}/perfume/Zoologist-Perfumes/Cockatiel-75184.html",
+        meta={"designer": "Zoologist Perfumes"},
+    )
+
+
+@pytest.fixture
+def flat_notes_response():
+    return load_response(
+        "perfume_flat_notes.html",
+        f"{BASE_URL}/perfume/d-Annam/White-Rice-89243.html",
+        meta={"designer": "d'Annam"},
+    )
+
+
+@pytest.fixture
+def minimal_response():
+    return load_response(
+        "perfume_minimal.html",
+        f"{BASE_URL}/perfume/Unknown-Designer/Nothing-1.html",
+        meta={"designer": "Unknown Designer"},
+    )
@@ -0,0 +1,250 @@
+"""
+Tests du mode ASGI (webapp/asgi.py) : chaque endpoint /api/* répond comme
+l'API Flask (webapp/routes/api.py) sur les mêmes données (base mongomock).
+
+mongomock n'a pas de client asynchrone : AsyncDatabase l'expose avec
+l'interface d'AsyncMongoClient utilisée par les services asynchrones.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+pytest.importorskip("mongomock")
+pytest.importorskip("httpx")
+
+# webapp.config exige SECRET_KEY à l'import (fourni par .env hors tests)
+os.environ.setdefault("SECRET_KEY", "test")
+
+import mongomock
+from starlette.testclient import TestClient
+
+from webapp.asgi import create_asgi_app
+from webapp.routes import api_bp
+from webapp.services.async_services import AsyncPerfumeService, AsyncStatsService
+from webapp.utils.catalog import init_catalog
+from webapp.utils.counts import init_counts
+from webapp.utils.data_version import DataVersion, init_data_version
+from webapp.utils.executor import init_executor
+from webapp.utils.sampling import init_sampling
+from webapp.utils.serializers import init_serializers
+
+CONFIG = {
+    'MONGO_DATABASE': 'fragrantica_test_asgi',
+    'COLLECTION_DATA': 'perfume_data',
+    'COLLECTION_URLS': 'perfume_urls',
+    'DATA_VERSION_TTL': 0,
+    # Pas de change streams sous mongomock : lecture par l'index
+    'CHANGES_CHANGE_STREAMS': False,
+    'CHANGES_PAGE_SIZE': 500,
+    'BATCH_MAX_ITEMS': 100,
+}
+
+
+class AsyncCursor:
+    """Curseur mongomock avec l'interface d'AsyncCursor."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, skip):
+        self.cursor = self.cursor.skip(skip)
+        return self
+
+    def limit(self, limit):
+        self.cursor = self.cursor.limit(limit)
+        return self
+
+    def hint(self, index):
+        self.cursor = self.cursor.hint(index)
+        return self
+
+    async def to_list(self, length=None):
+        docs = list(self.cursor)
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.cursor:
+            yield doc
+
+
+class AsyncCollection:
+    """Collection mongomock avec l'interface d'AsyncCollection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    async def find_one(self, *args, **kwargs):
+        return self.collection.find_one(*args, **kwargs)
+
+    async def count_documents(self, query, **kwargs):
+        return self.collection.count_documents(query, **kwargs)
+
+    async def estimated_document_count(self):
+        return self.collection.estimated_document_count()
+
+
+class AsyncDatabase:
+    """Base mongomock avec l'interface d'AsyncDatabase."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.db[name])
+
+
+def seed(db):
+    now = datetime(2026, 1, 1)
+    brands = ["Dior", "Chanel", "Creed"]
+    accords = ["woody", "citrus", "floral", "amber"]
+    db.perfume_data.insert_many([
+        {
+            "name": f"Sauvage {i}" if i % 5 == 0 else f"Perfume {i}",
+            "brand": brands[i % len(brands)],
+            "url": f"https://www.fragrantica.com/perfume/{brands[i % len(brands)]}/Perfume-{i}.html",
+            "accords": {accords[i % 4]: 90.0, accords[(i + 1) % 4]: 60.0},
+            "rating": 4.0,
+            "year": 2000 + i,
+            "updated_at": now + timedelta(minutes=i // 3),
+        }
+        for i in range(30)
+    ])
+    db.perfume_urls.insert_many([{"perfume_url": f"u{i}"} for i in range(40)])
+
+
+@pytest.fixture(scope="module")
+def db():
+    db = mongomock.MongoClient()[CONFIG['MONGO_DATABASE']]
+    seed(db)
+    return db
+
+
+@pytest.fixture(scope="module")
+def flask_client(db):
+    app = Flask(__name__)
+    app.config.update(CONFIG)
+    app.extensions['mongo_client'] = db.client
+    init_serializers(app)
+    init_executor(app)
+    init_data_version(app)
+    init_sampling(app)
+    init_catalog(app)
+    init_counts(app)
+    app.register_blueprint(api_bp)
+    yield app.test_client()
+    app.extensions['query_executor'].shutdown()
+
+
+@pytest.fixture(scope="module")
+def asgi_client(db):
+    app = create_asgi_app()
+    # Services branchés sur la base de test (le lifespan ouvrirait un AsyncMongoClient)
+    async_db = AsyncDatabase(db)
+    data_version = DataVersion(ttl=0)
+    app.state.perfumes = AsyncPerfumeService(async_db, CONFIG, data_version)
+    app.state.stats = AsyncStatsService(async_db, CONFIG, data_version)
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def perfume(db):
+    return db.perfume_data.find_one({"name": "Perfume 7"})
+
+
+def get_both(flask_client, asgi_client, path, **kwargs):
+    method = kwargs.pop('method', 'get')
+    expected = getattr(flask_client, method)(path, **kwargs)
+    response = getattr(asgi_client, method)(path, **kwargs)
+    assert response.status_code == expected.status_code
+    return expected.get_json(), response.json()
+
+
+@pytest.mark.parametrize("path", [
+    "/api/perfumes",
+    "/api/perfumes?page=2&per_page=4",
+    "/api/perfumes?brand=Dior&search=sauv",
+    "/api/perfumes/000000000000000000000000",
+    "/api/perfumes/not-an-id",
+    "/api/changes",
+    "/api/changes?limit=7",
+    "/api/changes?since=%25%25%25",
+    "/api/search?q=sauvage&limit=3",
+    "/api/search",
+    "/api/brands",
+    "/api/brands/Chanel?per_page=5",
+    "/api/accords",
+    "/api/stats",
+    "/api/autocomplete?q=per&limit=3",
+])
+def test_routes_match_flask(flask_client, asgi_client, path):
+    expected, body = get_both(flask_client, asgi_client, path)
+
+    assert body == expected
+
+
+def test_detail_matches_flask(flask_client, asgi_client, perfume):
+    expected, body = get_both(flask_client, asgi_client, f"/api/perfumes/{perfume['_id']}")
+
+    assert body == expected
+    assert body['data']['name'] == "Perfume 7"
+
+
+def test_not_found_matches_flask(flask_client, asgi_client):
+    expected, body = get_both(flask_client, asgi_client, "/api/perfumes/000000000000000000000000")
+
+    assert body == expected == {'success': False, 'error': 'Perfume not found'}
+    assert asgi_client.get("/api/unknown").json() == {'success': False, 'error': 'Resource not found'}
+
+
+def test_batch_matches_flask(flask_client, asgi_client, perfume):
+    payload = {"ids": [str(perfume['_id']), "000000000000000000000000"], "urls": [perfume['url']]}
+    expected, body = get_both(flask_client, asgi_client, "/api/perfumes/batch", method='post', json=payload)
+
+    assert body == expected
+    assert body['count'] == 2
+    assert body['missing'] == {'ids': ["000000000000000000000000"]}
+
+    expected, body = get_both(flask_client, asgi_client, "/api/perfumes/batch", method='post', json={})
+    assert body == expected
+    assert body['success'] is False
+
+
+def test_changes_pages_match_flask(flask_client, asgi_client):
+    path = "/api/changes?limit=12"
+    seen = []
+    while True:
+        expected, body = get_both(flask_client, asgi_client, path)
+        assert body == expected
+        seen.extend(p['id'] for p in body['data'])
+        if not body['has_more']:
+            break
+        path = f"/api/changes?limit=12&since={body['next_token']}"
+
+    assert len(seen) == len(set(seen)) == 30
+
+
+def test_random_returns_distinct_perfumes(asgi_client, db):
+    body = asgi_client.get("/api/random?limit=5").json()
+
+    ids = {str(doc['_id']) for doc in db.perfume_data.find({}, {'_id': 1})}
+    assert body['success'] is True and body['count'] == 5
+    assert len({p['id'] for p in body['data']} & ids) == 5
+
+
+def test_responses_vary_on_accept(asgi_client):
+    response = asgi_client.get("/api/brands")
+
+    assert response.headers['vary'] == 'Accept'
+    assert response.headers['content-type'] == 'application/json'
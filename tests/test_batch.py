@@ -0,0 +1,61 @@
+"""
+Tests de la lecture groupée de parfums (POST /api/perfumes/batch).
+"""
+import pytest
+from bson import ObjectId
+
+from webapp.services.perfume_service import PerfumeService
+
+URL = "https://www.fragrantica.com/perfume/Dior/Sauvage-{}.html"
+
+
+def test_batch_keys_validation():
+    keys = PerfumeService.batch_keys({"urls": [URL.format(1)], "perfume_ids": [31861, " 2 "]}, 10)
+    assert keys == {"urls": [URL.format(1)], "perfume_ids": ["31861", "2"]}
+
+    for payload in (None, [], {}, {"ids": "abc"}, {"ids": [None]}, {"perfume_ids": [True]}):
+        with pytest.raises(ValueError):
+            PerfumeService.batch_keys(payload, 10)
+    with pytest.raises(ValueError, match="At most 2"):
+        PerfumeService.batch_keys({"ids": ["a"], "urls": ["b", "c"]}, 2)
+
+
+def test_batch_query_is_a_single_in_filter():
+    oid = ObjectId()
+    query = PerfumeService.batch_query({
+        "ids": [str(oid), "not-an-id"], "urls": [URL.format(1)], "perfume_ids": ["42", "x"],
+    })
+
+    assert query["$or"] == [
+        {"_id": {"$in": [oid]}},
+        {"url": {"$in": [URL.format(1)]}},
+        {"fragrantica_id": {"$in": [42]}},
+    ]
+    assert PerfumeService.batch_query({"ids": ["bad"]}) is None
+
+
+def test_batch_resolve_keeps_key_order_and_reports_missing():
+    docs = [{"_id": ObjectId(), "url": URL.format(n), "fragrantica_id": n} for n in (1, 2)]
+    # Document antérieur à fragrantica_id : numéro lu dans l'URL
+    docs.append({"_id": ObjectId(), "url": URL.format(3)})
+    keys = {
+        "ids": [str(docs[2]["_id"]), "missing-id"],
+        "urls": [URL.format(1)],
+        "perfume_ids": ["2", "99", "1", "3"],
+    }
+
+    found, missing = PerfumeService.batch_resolve(docs, keys)
+
+    assert found == [docs[2], docs[0], docs[1], docs[0], docs[2]]
+    assert missing == {"ids": ["missing-id"], "perfume_ids": ["99"]}
+
+
+def test_batch_perfume_ids_with_leading_zeros_are_found():
+    docs = [{"_id": ObjectId(), "url": URL.format(32191), "fragrantica_id": 32191}]
+    keys = PerfumeService.batch_keys({"perfume_ids": ["032191", 32191, "x1"]}, 10)
+
+    assert keys == {"perfume_ids": ["32191", "32191", "x1"]}
+    assert PerfumeService.batch_query(keys) == {"fragrantica_id": {"$in": [32191, 32191]}}
+    found, missing = PerfumeService.batch_resolve(docs, keys)
+    assert found == [docs[0], docs[0]]
+    assert missing == {"perfume_ids": ["x1"]}
@@ -0,0 +1,71 @@
+"""
+Tests du serveur Fragrantica local et du benchmark de crawl de bout en bout.
+"""
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from fragrantica_scraper.mock_server import start_mock_server
+from tests.conftest import run_crawl_script
+
+
+@pytest.fixture
+def server():
+    server = start_mock_server(designers=2, perfumes_per_designer=3, page_size=2)
+    yield server
+    server.shutdown()
+
+
+def fetch(url):
+    try:
+        with urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode("utf-8")
+    except HTTPError as e:
+        return e.code, ""
+
+
+def test_mock_server_serves_paginated_site(server):
+    status, index = fetch(f"{server.base_url}/designers/")
+    assert status == 200
+    assert index.count('href="/designers/') == 2
+
+    status, page1 = fetch(f"{server.base_url}/designers/Designer-0001.html")
+    assert page1.count('href="/perfume/') == 2
+    assert 'rel="next"' in page1
+    _, page2 = fetch(f"{server.base_url}/designers/Designer-0001.html?page=2")
+    assert page2.count('href="/perfume/') == 1
+    assert 'rel="next"' not in page2
+
+    status, perfume = fetch(f"{server.base_url}/perfume/Designer-0001/Perfume-1000.html")
+    assert status == 200 and "Perfume 1000 Designer 0001" in perfume
+    assert fetch(f"{server.base_url}/perfume/Designer-0001/Perfume-9999.html")[0] == 404
+    assert (server.requests_count, server.count_429) == (5, 0)
+
+
+def test_mock_server_429_rate():
+    server = start_mock_server(designers=1, rate_429=1.0)
+    try:
+        assert fetch(f"{server.base_url}/designers/")[0] == 429
+        assert server.count_429 == 1
+    finally:
+        server.shutdown()
+
+
+def test_run_benchmark_fetches_pages_and_counts_429():
+    result = run_crawl_script("""
+import json
+from fragrantica_scraper.benchmark import run_benchmark
+
+result = run_benchmark(designers=5, perfumes_per_designer=10, latency_ms=1, jitter_ms=0, rate_429=0.05)
+print(json.dumps({"server": result["server"], "stages": result["stages"]}))
+""")
+
+    urls, data = result["stages"]
+    # 50 URLs + un état par designer
+    assert (urls["pages"], urls["items"]) == (6, 55)
+    assert data["pages"] > 0
+    # Le 429 (ignoré par StopOn429Middleware) est compté comme par le serveur
+    assert result["server"]["status_429"] >= 1
+    assert urls["status_429"] + data["status_429"] == result["server"]["status_429"]
+    assert urls["pages"] + data["pages"] == result["server"]["requests"]
@@ -0,0 +1,98 @@
+"""
+Tests de l'identifiant canonique des parfums et du dédoublonnage.
+
+L'audit (agrégations côté serveur) est ignoré sans serveur MongoDB :
+MONGO_TEST_URI (défaut: mongodb://localhost:27017/).
+"""
+import os
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from scrapy import Spider
+
+from fragrantica_scraper import canonical
+from fragrantica_scraper.mongo import get_mongo_client
+from fragrantica_scraper.pipelines import MongoPerfumeDataPipeline
+
+URL = "https://www.fragrantica.com/perfume/{}/{}-{}.html"
+
+
+def test_perfume_id_and_brand_from_url():
+    url = URL.format("French-Avenue", "NOMAD", 122623)
+    assert canonical.perfume_id(url) == 122623
+    assert canonical.brand_slug(url) == "French-Avenue"
+    assert canonical.perfume_id("https://www.fragrantica.com/designers/Dior.html") is None
+
+    # Designer du listing retenu s'il correspond au slug (accents, apostrophes)
+    assert canonical.resolve_brand(URL.format("d-Annam", "White-Rice", 1), designer="d'Annam") == "d'Annam"
+    assert canonical.resolve_brand(URL.format("Hermes", "Terre", 2), designer="Hermès") == "Hermès"
+    assert canonical.resolve_brand(url, designer="Zoologist Perfumes") == "French Avenue"
+    assert canonical.resolve_brand(url, page_brand=" French Avenue ", designer="Zoologist") == "French Avenue"
+    assert canonical.resolve_brand("https://example.com/p", designer="Dior") == "Dior"
+
+
+def test_data_pipeline_keeps_one_document_per_fragrantica_id():
+    pytest.importorskip("mongomock")
+    uri = "mongomock://test_canonical"
+    client = get_mongo_client(uri)
+    client.drop_database("fragrantica")
+    db = client["fragrantica"]
+
+    pipeline = MongoPerfumeDataPipeline(uri, "fragrantica", write_batch=1)
+    spider = Spider(name="perfume_data")
+    pipeline.open_spider(spider)
+    old_url, new_url = URL.format("Zoologist", "Cow", 72365), URL.format("Zoologist-Perfumes", "Cow", 72365)
+    for url, version in ((old_url, 1), (new_url, 2), (new_url, 2)):
+        pipeline.process_item(
+            {"url": url, "brand": "Zoologist Perfumes", "name": "Cow",
+             "fragrantica_id": canonical.perfume_id(url), "schema_version": version},
+            spider,
+        )
+    # Sans numéro : hors de l'index unique
+    for name in ("a", "b"):
+        pipeline.process_item({"url": f"https://example.com/{name}", "fragrantica_id": None}, spider)
+
+    docs = list(db.perfume_data.find({"fragrantica_id": 72365}))
+    assert [(d["url"], d["schema_version"]) for d in docs] == [(new_url, 2)]
+    assert db.perfume_data.count_documents({"fragrantica_id": {"$exists": False}}) == 2
+    assert (pipeline.items_saved, pipeline.items_updated, pipeline.items_unchanged) == (3, 1, 1)
+    client.drop_database("fragrantica")
+
+
+@pytest.fixture
+def server_db():
+    uri = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017/")
+    client = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"MongoDB non disponible sur {uri}")
+    client.drop_database("fragrantica_test_canonical")
+    yield client["fragrantica_test_canonical"]
+    client.drop_database("fragrantica_test_canonical")
+    client.close()
+
+
+def test_audit_and_fix(server_db):
+    server_db.perfume_data.insert_many([
+        {"url": URL.format("Zoologist-Perfumes", "Cow", 72365), "brand": "Zoologist Perfumes", "schema_version": 1},
+        {"url": URL.format("Zoologist", "Cow", 72365), "brand": "Zoologist Perfumes", "schema_version": 2},
+        {"url": URL.format("French-Avenue", "NOMAD", 122623), "brand": "Zoologist Perfumes"},
+        {"url": URL.format("d-Annam", "White-Rice", 89243), "brand": "d'Annam"},
+    ])
+
+    report = canonical.audit(server_db)
+    assert (report["duplicate_groups"], report["duplicate_documents"]) == (1, 1)
+    assert report["missing_ids"] == 4
+    # Zoologist/Cow (URL renommée) et French-Avenue/NOMAD
+    assert report["brand_mismatches"] == 2
+
+    stats = canonical.fix(server_db)
+    assert stats == {"ids_set": 4, "duplicates_removed": 1, "brands_fixed": 2}
+    cow = server_db.perfume_data.find_one({"fragrantica_id": 72365})
+    assert (cow["schema_version"], cow["brand"]) == (2, "Zoologist")
+    assert server_db.perfume_data.find_one({"fragrantica_id": 122623})["brand"] == "French Avenue"
+    assert canonical.audit(server_db)["brand_mismatches"] == 0
+    assert "fragrantica_id_1" in server_db.perfume_data.index_information()
@@ -0,0 +1,76 @@
+"""
+Tests du catalogue en mémoire (autocomplétion, comptage des marques).
+"""
+from webapp.utils.catalog import Catalog
+
+
+def docs(*rows, start=0, updated_at=1):
+    return [
+        {"_id": start + i, "name": name, "brand": brand, "updated_at": updated_at}
+        for i, (name, brand) in enumerate(rows)
+    ]
+
+
+def loaded(rows):
+    catalog = Catalog()
+    version = (len(rows), 0, "v1", 1)
+    catalog.apply(version, docs(*rows), catalog.pending_query(version))
+    return catalog
+
+
+def test_prefix_completion_is_case_insensitive():
+    catalog = loaded([
+        ("Sauvage", "Dior"), ("Santal 33", "Le Labo"), ("sauvage Elixir", "Dior"),
+        ("Aventus", "Creed"), ("Dior Homme", "Dior"),
+    ])
+
+    assert [p["name"] for p in catalog.complete_names("SAU")] == ["Sauvage", "sauvage Elixir"]
+    assert [p["name"] for p in catalog.complete_names("sa", limit=1)] == ["Santal 33"]
+    assert catalog.complete_names("zz") == []
+    assert catalog.complete_names("  ") == []
+    assert catalog.complete_brands("d") == [{"name": "Dior", "count": 3}]
+    assert catalog.search_brands("ab") == ["Le Labo"]
+    assert catalog.brands_by_count()[0] == {"_id": "Dior", "count": 3}
+
+
+def test_incremental_refresh_loads_only_new_documents():
+    catalog = loaded([("Aventus", "Creed"), ("Sauvage", "Dior")])
+    assert catalog.pending_query((2, 0, "v1", 1)) is None
+
+    query = catalog.pending_query((3, 0, "v2", 1))
+    assert query == {"_id": {"$gt": 1}}
+    catalog.apply((3, 0, "v2", 1), docs(("Viking", "Creed"), start=2), query)
+
+    assert catalog.version == (3, 0, "v2", 1)
+    assert catalog.complete_brands("cr") == [{"name": "Creed", "count": 2}]
+    assert [p["id"] for p in catalog.complete_names("v")] == ["2"]
+
+    # Moins de documents qu'avant : rechargement complet
+    assert catalog.pending_query((2, 0, "v3", 1)) == {}
+
+
+def test_count_mismatch_forces_full_reload():
+    catalog = loaded([("Aventus", "Creed"), ("Sauvage", "Dior")])
+    query = catalog.pending_query((4, 0, "v2", 1))
+    catalog.apply((4, 0, "v2", 1), docs(("Viking", "Creed"), start=2), query)
+
+    assert catalog.version is None
+    assert catalog.pending_query((4, 0, "v2", 1)) == {}
+
+
+def test_rewritten_documents_replace_their_entries():
+    catalog = loaded([("Aventus", "Creed"), ("Sauvage", "Dior")])
+
+    # Même nombre, même dernier _id : seul updated_at a bougé
+    query = catalog.pending_query((2, 0, "v1", 2))
+    assert query == {"$or": [{"_id": {"$gt": 1}}, {"updated_at": {"$gte": 1}}]}
+    catalog.apply((2, 0, "v1", 2), docs(("Aventus Cologne", "Creed"), updated_at=2), query)
+
+    assert catalog.version == (2, 0, "v1", 2)
+    assert [p["name"] for p in catalog.complete_names("av")] == ["Aventus Cologne"]
+    assert catalog.complete_brands("cr") == [{"name": "Creed", "count": 1}]
+
+    # Marque corrigée : l'ancienne disparaît du comptage
+    catalog.apply((2, 0, "v1", 3), docs(("Sauvage", "Christian Dior"), start=1, updated_at=3), query)
+    assert catalog.complete_brands("d") == []
+    assert catalog.brand_counts == {"Creed": 1, "Christian Dior": 1}
@@ -0,0 +1,79 @@
+"""
+Tests de la synchronisation incrémentale (/api/changes) : jetons et pages.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from webapp.services.changes_service import ChangesService, StreamBatch
+
+T0 = datetime(2026, 5, 1, 12, 0, 0, 123000)
+
+
+def docs(*minutes):
+    return [{"_id": ObjectId(), "name": f"P{m}", "updated_at": T0 + timedelta(minutes=m)} for m in minutes]
+
+
+def test_token_round_trip():
+    oid = ObjectId()
+    token = ChangesService.encode_token({"t": T0, "i": oid, "r": {"_data": "82AB"}})
+
+    assert ChangesService.decode_token(token) == {"t": T0, "i": oid, "r": {"_data": "82AB"}}
+    assert ChangesService.decode_token(None) == {"t": None, "i": None, "r": None}
+    for bad in ("%%%", "bm90LWpzb24", ChangesService.encode_token({"t": T0})[:-3] + "AAA"):
+        with pytest.raises(ValueError):
+            ChangesService.decode_token(bad)
+
+
+def test_query_resumes_after_position_with_id_tie_break():
+    oid = ObjectId()
+    query = ChangesService.changes_query({"t": T0, "i": oid}, until=T0 + timedelta(hours=1))
+
+    after, bound = query["$and"]
+    assert after == {"$or": [
+        {"updated_at": {"$gt": T0}},
+        {"updated_at": T0, "_id": {"$gt": oid}},
+    ]}
+    assert bound == {"updated_at": {"$lte": T0 + timedelta(hours=1)}}
+    assert ChangesService.changes_query({"t": None}) == {"updated_at": {"$ne": None}}
+
+
+def test_index_pages_advance_and_hand_over_resume_token():
+    start = ChangesService.decode_token(None)
+    batch = docs(1, 2, 3)
+
+    first = ChangesService.index_page(start, batch, limit=2, resume_token={"_data": "R"})
+    position = ChangesService.decode_token(first["next_token"])
+    assert first["has_more"] is True and len(first["perfumes"]) == 2
+    # Rattrapage non terminé : pas encore de jeton de reprise
+    assert (position["t"], position["i"], position["r"]) == (batch[1]["updated_at"], batch[1]["_id"], None)
+
+    last = ChangesService.index_page(position, batch[2:], limit=2, resume_token={"_data": "R"})
+    assert last["has_more"] is False
+    assert ChangesService.decode_token(last["next_token"])["r"] == {"_data": "R"}
+
+    # Page vide : la position est conservée
+    empty = ChangesService.index_page(position, [], limit=2)
+    assert ChangesService.decode_token(empty["next_token"])["i"] == batch[1]["_id"]
+
+
+def test_streams_detection():
+    assert ChangesService.streams_supported({"setName": "rs0"})
+    assert ChangesService.streams_supported({"msg": "isdbgrid"})
+    assert not ChangesService.streams_supported({"isWritablePrimary": True})
+
+
+def test_stream_batch_keeps_last_version_of_each_document():
+    a, b = docs(1, 2)
+    batch = StreamBatch(limit=4)
+    for change in ({"fullDocument": a}, {"fullDocument": b}, {"operationType": "update"}):
+        batch.add(change)
+    assert not batch.full
+
+    batch.add({"fullDocument": dict(a, name="P1 bis")})
+    found, resume_token, has_more = batch.result({"_data": "R"})
+
+    # Une seule version de `a`, à la position de sa dernière modification
+    assert [doc["name"] for doc in found] == ["P2", "P1 bis"]
+    assert (resume_token, has_more) == ({"_data": "R"}, True)
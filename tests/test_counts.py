@@ -0,0 +1,47 @@
+"""
+Tests du cache des comptages de pagination.
+"""
+from webapp.services.count_service import CountService
+from webapp.utils.counts import CAPPED, ESTIMATED, EXACT, CountCache
+
+REGEX = {'name': {'$regex': 'sau', '$options': 'i'}}
+
+
+def test_cache_is_keyed_by_normalized_filter_and_version():
+    cache = CountCache()
+    cache.store('v1', {'brand': 'Dior', 'year': 2015}, 12)
+
+    assert cache.get('v1', {'year': 2015, 'brand': 'Dior'}) == (12, EXACT)
+    assert cache.get('v1', {'brand': 'Creed'}) is None
+    assert cache.get('v2', {'brand': 'Dior', 'year': 2015}) is None
+
+    # Nouvelle version : les comptages précédents sont oubliés
+    cache.store('v2', {}, 5000, ESTIMATED)
+    assert len(cache) == 1
+    assert cache.get('v2', {}) == (5000, ESTIMATED)
+
+
+def test_regex_counts_are_capped():
+    cache = CountCache(cap=1000, max_entries=2)
+
+    assert cache.limit_for({'brand': 'Dior'}) is None
+    assert cache.limit_for({'$or': [REGEX, {'brand': 'Dior'}]}) == 1001
+    assert cache.store('v1', REGEX, 1001) == (1000, CAPPED)
+    assert cache.store('v1', {'name': {'$regex': 'x'}}, 40) == (40, EXACT)
+
+    # LRU borné : l'entrée la plus ancienne est évincée
+    cache.store('v1', {'brand': 'Dior'}, 3)
+    assert cache.get('v1', REGEX) is None
+    assert len(cache) == 2
+
+
+def test_capped_pages_stay_navigable():
+    full_page = list(range(24))
+
+    capped = CountService.page(full_page, (1000, CAPPED), 42, 24)
+    assert (capped['pages'], capped['has_next']) == (42, True)
+    assert CountService.pagination(capped)['total_exact'] is False
+
+    exact = CountService.page(full_page[:16], (1000, EXACT), 42, 24)
+    assert exact['has_next'] is False
+    assert CountService.pagination(exact)['total_exact'] is True
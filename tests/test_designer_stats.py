@@ -0,0 +1,82 @@
+"""
+Tests des compteurs par designer tenus par les pipelines (base mongomock).
+"""
+import pytest
+from scrapy import Spider
+
+from fragrantica_scraper import designer_stats
+from fragrantica_scraper.mongo import get_mongo_client
+from fragrantica_scraper.pipelines import MongoPerfumeDataPipeline, MongoPerfumeURLsPipeline
+
+pytest.importorskip("mongomock")
+
+MONGO_URI = "mongomock://test_designer_stats"
+DATABASE = "fragrantica"
+
+
+@pytest.fixture
+def db():
+    client = get_mongo_client(MONGO_URI)
+    client.drop_database(DATABASE)
+    yield client[DATABASE]
+    client.drop_database(DATABASE)
+
+
+def crawl(pipeline, spider_name, items):
+    spider = Spider(name=spider_name)
+    pipeline.open_spider(spider)
+    for item in items:
+        pipeline.process_item(item, spider)
+    # La connexion mongomock est partagée : ne pas la fermer
+    if spider_name == "perfume_data":
+        pipeline._flush_documents()
+    pipeline._flush_designer_stats()
+
+
+def url(designer, i):
+    return {"designer": designer, "perfume_url": f"https://www.fragrantica.com/perfume/{designer}/P-{i}.html"}
+
+
+def perfume(brand, i, designer=None):
+    document = {"brand": brand, "name": f"P {i}", "url": f"https://www.fragrantica.com/perfume/{brand}/P-{i}.html"}
+    if designer:
+        document["designer"] = designer
+    return document
+
+
+def test_pipelines_maintain_counters(db):
+    urls = MongoPerfumeURLsPipeline(MONGO_URI, DATABASE, stats_flush_items=2)
+    crawl(urls, "perfume_urls", [url("Dior", i) for i in range(3)] + [url("Creed", 0), url("Dior", 0)])
+
+    data = MongoPerfumeDataPipeline(MONGO_URI, DATABASE, stats_flush_items=2)
+    crawl(data, "perfume_data", [perfume("Dior", i, "Dior") for i in range(3)] + [perfume("Dior", 0, "Dior")])
+    # Parfum d'une autre marque listé chez Creed : compté pour Creed
+    crawl(data, "perfume_data", [perfume("Zoologist", 0, "Creed")])
+
+    dior = db.designer_stats.find_one({"_id": "Dior"})
+    # Doublons ignorés : seules les insertions sont comptées
+    assert (dior["urls_found"], dior["perfumes_scraped"], dior["remaining"]) == (3, 3, 0)
+    assert dior["last_activity"] is not None
+
+    top = designer_stats.top_designers(db, designer_stats.URLS_FOUND)
+    assert [(d["_id"], d["urls_found"]) for d in top] == [("Dior", 3), ("Creed", 1)]
+    assert db.designer_stats.find_one({"_id": "Creed"})["remaining"] == 0
+    assert db.designer_stats.find_one({"_id": "Zoologist"}) is None
+    assert sorted(d["_id"] for d in designer_stats.fully_scraped(db)) == ["Creed", "Dior"]
+    assert designer_stats.designer_count(db) == 2
+
+
+def test_rebuild_matches_incremental_counters(db):
+    db.perfume_urls.insert_many([url("Dior", i) for i in range(4)] + [url("Creed", 0)])
+    # Documents antérieurs au champ designer : comptés sur la marque
+    db.perfume_data.insert_many([perfume("Dior", 0), perfume("Le Labo", 0), perfume("Zoologist", 0, "Creed")])
+    db.designer_stats.insert_one({"_id": "Gone", "urls_found": 9})
+
+    assert designer_stats.rebuild(db) == 3
+
+    stats = {doc["_id"]: doc for doc in db.designer_stats.find()}
+    assert set(stats) == {"Dior", "Creed", "Le Labo"}
+    assert (stats["Dior"]["urls_found"], stats["Dior"]["perfumes_scraped"]) == (4, 1)
+    assert stats["Creed"]["remaining"] == 0
+    assert stats["Le Labo"]["remaining"] == -1
+    assert stats["Creed"]["last_activity"] is not None
@@ -0,0 +1,94 @@
+"""
+Tests du pool de requêtes concurrentes (délai, résultats partiels).
+"""
+import os
+import time
+
+import pytest
+from flask import Flask
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+from webapp.utils.executor import QueryExecutor
+
+MONGO_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017/")
+# Aucun serveur n'écoute sur ce port : la sélection de serveur attend
+UNREACHABLE_URI = "mongodb://localhost:1/?serverSelectionTimeoutMS=30000"
+
+
+class MaxTimeRecorder(monitoring.CommandListener):
+    """Enregistre le maxTimeMS des commandes envoyées au serveur."""
+
+    def __init__(self):
+        self.max_time_ms = {}
+
+    def started(self, event):
+        self.max_time_ms[event.command_name] = event.command.get("maxTimeMS")
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.fixture
+def executor():
+    executor = QueryExecutor(Flask(__name__), max_workers=2, deadline_ms=500)
+    yield executor
+    executor.shutdown()
+
+
+def test_slow_calls_are_replaced_by_their_default(executor):
+    results, missing = executor.run(
+        {'fast': lambda: 'ok', 'slow': lambda: time.sleep(1) or 'late'},
+        defaults={'slow': 'default'},
+    )
+
+    assert results == {'fast': 'ok', 'slow': 'default'}
+    assert missing == ['slow']
+
+
+def test_mongodb_calls_are_bounded_by_the_deadline(executor):
+    client = MongoClient(UNREACHABLE_URI, connect=False)
+    failed_after = []
+
+    def ping():
+        started = time.monotonic()
+        try:
+            return client.admin.command('ping')
+        except PyMongoError:
+            failed_after.append(time.monotonic() - started)
+            raise
+
+    try:
+        results, missing = executor.run({'ping': ping}, defaults={'ping': None})
+        # Le thread est libéré par PyMongo au délai (et non après serverSelectionTimeoutMS)
+        deadline = time.monotonic() + 2
+        while not failed_after and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        client.close()
+
+    assert results == {'ping': None} and missing == ['ping']
+    assert failed_after and failed_after[0] < 2
+
+
+def test_commands_carry_the_remaining_deadline_as_max_time_ms(executor):
+    recorder = MaxTimeRecorder()
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=1000, event_listeners=[recorder])
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"MongoDB non disponible sur {MONGO_URI}")
+
+    try:
+        results, missing = executor.run({
+            'find': lambda: client.fragrantica_test_executor.perfume_data.find_one({}),
+        })
+    finally:
+        client.close()
+
+    assert missing == []
+    assert 0 < recorder.max_time_ms['find'] <= 500
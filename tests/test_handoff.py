@@ -0,0 +1,68 @@
+"""
+Tests du passage des URLs entre spiders et du budget de requêtes partagé.
+"""
+import pytest
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.project import get_project_settings
+
+from fragrantica_scraper.handoff import UrlHandoff
+from fragrantica_scraper.middlewares import RateBudget, SharedRateLimitMiddleware
+from fragrantica_scraper.profiles import PROFILES
+from fragrantica_scraper.spiders.perfume_urls_spider import PerfumeURLsSpider
+
+
+def test_handoff_buffers_until_consumer_attached():
+    handoff = UrlHandoff()
+    received = []
+
+    handoff.put("https://example.com/a.html", "A")
+    handoff.attach(lambda url, designer: received.append((url, designer)))
+    handoff.put("https://example.com/b.html", "B")
+
+    assert received == [("https://example.com/a.html", "A"),
+                        ("https://example.com/b.html", "B")]
+    assert handoff.sent == 2
+    assert not handoff.closed
+
+
+def test_handoff_ignores_urls_after_detach():
+    handoff = UrlHandoff()
+    received = []
+    handoff.attach(lambda url, designer: received.append(url))
+
+    handoff.detach()
+    handoff.put("https://example.com/a.html", "A")
+
+    assert received == []
+
+
+def test_handoff_shared_by_name():
+    UrlHandoff.discard("test")
+    assert UrlHandoff.shared("test") is UrlHandoff.shared("test")
+    UrlHandoff.discard("test")
+
+
+def test_rate_budget_spaces_reservations():
+    budget = RateBudget(rate=10)
+
+    delays = [budget.reserve() for _ in range(5)]
+
+    assert delays[0] == 0
+    # 5 requêtes à 10/s : la dernière attend ~0.4 s
+    assert 0.35 < delays[-1] <= 0.4
+    assert delays == sorted(delays)
+
+
+@pytest.mark.parametrize("profile", list(PROFILES))
+def test_default_settings_do_not_cap_profile_throughput(profile):
+    settings = get_project_settings()
+    settings.set("CRAWL_PROFILE", profile, priority="cmdline")
+    PerfumeURLsSpider.update_settings(settings)
+    crawler = Crawler(PerfumeURLsSpider, settings)
+
+    # Pas de budget global par défaut : seul le profil règle le débit
+    assert crawler.settings.getfloat("GLOBAL_RATE_LIMIT") == 0
+    with pytest.raises(NotConfigured):
+        SharedRateLimitMiddleware.from_crawler(crawler)
+    assert crawler.settings.getint("CONCURRENT_REQUESTS") == PROFILES[profile]["CONCURRENT_REQUESTS"]
@@ -0,0 +1,44 @@
+"""
+Tests du bundle de la page d'accueil (reconstruction, résultats partiels).
+"""
+from webapp.services.homepage_service import HomepageRefresher, HomepageService
+
+
+class StaticRefresher(HomepageRefresher):
+    """Rafraîchisseur dont les bundles sont fournis par le test."""
+
+    def __init__(self, bundles):
+        super().__init__(app=None, interval=60)
+        self.bundles = iter(bundles)
+
+    def _build(self):
+        return next(self.bundles)
+
+
+def bundle(featured, latest, partial=()):
+    return {
+        'featured': featured, 'latest': latest, 'stats': {},
+        'version': (1, 1, 'a'), 'built_at': 0.0, 'partial': list(partial)
+    }
+
+
+def test_partial_refresh_keeps_previous_values():
+    refresher = StaticRefresher([
+        bundle(['a', 'b'], ['x']),
+        bundle([], ['y'], partial=['featured']),
+    ])
+
+    refresher.refresh()
+    current = refresher.refresh()
+
+    assert current['featured'] == ['a', 'b']
+    assert current['latest'] == ['y']
+
+
+def test_pick_featured_draws_from_pool():
+    pool = bundle(list(range(36)), [])
+    picked = HomepageService.pick_featured(pool, limit=6)
+
+    assert len(set(picked)) == 6
+    assert set(picked) <= set(range(36))
+    assert HomepageService.pick_featured(bundle([1, 2], []), limit=6) in ([1, 2], [2, 1])
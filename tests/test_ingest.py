@@ -0,0 +1,106 @@
+"""
+Tests de l'écriture idempotente des parfums (base mongomock).
+"""
+from datetime import datetime
+
+import pytest
+from scrapy import Spider
+
+from fragrantica_scraper.ingest import HASH_FIELD, PerfumeWriteBuffer, content_hash
+from fragrantica_scraper.mongo import get_mongo_client
+from fragrantica_scraper.pipelines import MongoPerfumeDataPipeline
+
+pytest.importorskip("mongomock")
+
+MONGO_URI = "mongomock://test_ingest"
+DATABASE = "fragrantica"
+
+
+@pytest.fixture
+def db():
+    client = get_mongo_client(MONGO_URI)
+    client.drop_database(DATABASE)
+    yield client[DATABASE]
+    client.drop_database(DATABASE)
+
+
+def perfume(i, rating=4.0):
+    return {
+        "url": f"https://www.fragrantica.com/perfume/Dior/P-{i}.html",
+        "fragrantica_id": i,
+        "brand": "Dior",
+        "name": f"P {i}",
+        "accords": {"woody": 100.0, "citrus": 50.0},
+        "rating": rating,
+        "schema_version": 2,
+    }
+
+
+def crawl(items, batch=10):
+    pipeline = MongoPerfumeDataPipeline(MONGO_URI, DATABASE, write_batch=batch)
+    spider = Spider(name="perfume_data")
+    pipeline.open_spider(spider)
+    for item in items:
+        pipeline.process_item(dict(item), spider)
+    # La connexion mongomock est partagée : ne pas la fermer
+    pipeline._flush_documents()
+    return pipeline
+
+
+def test_content_hash_ignores_key_order_and_timestamps():
+    doc = perfume(1)
+    reordered = dict(reversed(list(doc.items())), updated_at=datetime(2026, 1, 1))
+    assert content_hash(reordered) == content_hash(doc)
+    assert content_hash(perfume(1, rating=4.1)) != content_hash(doc)
+
+
+def test_recrawl_updates_in_place_and_skips_unchanged(db):
+    first = crawl([perfume(i) for i in range(25)])
+    assert (first.items_saved, first.writes) == (25, 25)
+    created = db.perfume_data.find_one({"fragrantica_id": 3})
+
+    # Re-crawl identique : aucune écriture
+    same = crawl([perfume(i) for i in range(25)])
+    assert (same.items_saved, same.items_unchanged, same.writes, same.write_bytes) == (0, 25, 0, 0)
+
+    # Un parfum modifié : une seule mise à jour, created_at conservé
+    changed = crawl([perfume(i, rating=4.5 if i == 3 else 4.0) for i in range(25)])
+    assert (changed.items_updated, changed.items_unchanged, changed.writes) == (1, 24, 1)
+    updated = db.perfume_data.find_one({"fragrantica_id": 3})
+    assert updated["rating"] == 4.5
+    assert updated["created_at"] == created["created_at"]
+    assert updated["updated_at"] >= created["updated_at"]
+    assert db.perfume_data.count_documents({}) == 25
+
+
+def test_legacy_documents_are_matched_by_url(db):
+    # Document antérieur : ni numéro ni empreinte
+    legacy = {k: v for k, v in perfume(7).items() if k != "fragrantica_id"}
+    db.perfume_data.insert_one(dict(legacy))
+
+    buffer = PerfumeWriteBuffer(batch_size=10)
+    buffer.add(perfume(7))
+    buffer.add(perfume(7, rating=3.0))  # même parfum dans le lot : le dernier gagne
+    result = buffer.flush(db.perfume_data)
+
+    assert (result["inserted"], result["updated"], result["writes"]) == ([], 1, 1)
+    doc = db.perfume_data.find_one({"url": perfume(7)["url"]})
+    assert (doc["fragrantica_id"], doc["rating"]) == (7, 3.0)
+    assert doc[HASH_FIELD] == content_hash(perfume(7, rating=3.0))
+    assert db.perfume_data.count_documents({}) == 1
+
+
+def test_pending_batch_is_written_after_max_delay_without_new_items(db):
+    pipeline = MongoPerfumeDataPipeline(MONGO_URI, DATABASE, write_batch=10, write_max_delay=60)
+    spider = Spider(name="perfume_data")
+    pipeline.open_spider(spider)
+    pipeline.process_item(perfume(1), spider)
+
+    # Contrôle périodique (LoopingCall) : rien avant le délai
+    pipeline._flush_due_documents()
+    assert db.perfume_data.count_documents({}) == 0
+
+    pipeline.write_buffer.max_delay = 0
+    pipeline._flush_due_documents()
+    assert db.perfume_data.count_documents({}) == 1
+    assert not pipeline.write_buffer.is_due()
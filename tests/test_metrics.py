@@ -0,0 +1,47 @@
+"""
+Tests des métriques du crawl (sans serveur HTTP ni crawl complet).
+"""
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from fragrantica_scraper.metrics import ParseTimeMiddleware, get_metrics
+from fragrantica_scraper.spiders.perfume_data_spider import PerfumeSpider
+from tests.conftest import run_crawl_script
+
+
+def test_parse_time_middleware_observes_callback(perfume_response):
+    spider = PerfumeSpider()
+    metrics = get_metrics()
+    labels = {"spider": "perfume_data", "callback": "parse"}
+    count = lambda: metrics["registry"].get_sample_value("fragrantica_parse_seconds_count", labels) or 0
+    before = count()
+
+    middleware = ParseTimeMiddleware(metrics["parse"])
+    output = list(middleware.process_spider_output(
+        perfume_response, spider.parse_perfume(perfume_response), spider
+    ))
+
+    assert len(output) == 1
+    assert count() == before + 1
+
+
+def test_429_responses_are_counted_before_stop_on_429():
+    # Crawl du serveur local : le 429 passe par StopOn429Middleware (IgnoreRequest)
+    counts = run_crawl_script("""
+import json
+from fragrantica_scraper.benchmark import run_benchmark
+from fragrantica_scraper.metrics import get_metrics
+
+result = run_benchmark(designers=5, perfumes_per_designer=10, latency_ms=1, jitter_ms=0,
+                       rate_429=0.05, metrics=True)
+registry = get_metrics()["registry"]
+counted = sum(
+    registry.get_sample_value("fragrantica_responses_total", {"spider": name, "status": "429"}) or 0
+    for name in ("perfume_urls", "perfume_data")
+)
+print(json.dumps({"server": result["server"]["status_429"], "metrics": counted}))
+""", env={"METRICS_PORT": "0"})
+
+    assert counts["server"] >= 1
+    assert counts["metrics"] == counts["server"]
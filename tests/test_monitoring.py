@@ -0,0 +1,128 @@
+"""
+Tests de l'instrumentation des requêtes Flask (Server-Timing, /metrics).
+
+Les commandes MongoDB sont simulées : les routes de test transmettent des
+événements au listener pymongo enregistré par init_monitoring.
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from webapp.utils import monitoring
+from webapp.utils.executor import QueryExecutor
+from webapp.utils.monitoring import current_queries, init_monitoring
+
+_request_ids = iter(range(1, 1_000_000))
+
+
+def run_command(name="find", collection="perfume_data", micros=2000):
+    """Émet les événements started/succeeded d'une commande MongoDB."""
+    request_id = next(_request_ids)
+    monitoring._listener.started(SimpleNamespace(
+        command_name=name, command={name: collection}, request_id=request_id
+    ))
+    monitoring._listener.succeeded(SimpleNamespace(
+        command_name=name, request_id=request_id, duration_micros=micros
+    ))
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    init_monitoring(app)
+    barrier = threading.Barrier(2)
+
+    @app.route("/queries/<int:count>")
+    def queries(count):
+        for _ in range(count):
+            run_command()
+        return "ok"
+
+    @app.route("/interleaved/<int:count>")
+    def interleaved(count):
+        # Deux requêtes simultanées : leurs deux premières commandes alternent
+        for i in range(count):
+            if i < 2:
+                barrier.wait(timeout=5)
+            run_command()
+        return "ok"
+
+    @app.route("/threaded")
+    def threaded():
+        executor = QueryExecutor(app, max_workers=2)
+        try:
+            executor.run({"a": run_command, "b": run_command})
+        finally:
+            executor.shutdown()
+        return "ok"
+
+    return app
+
+
+def db_timing(response):
+    app_timing, db = response.headers["Server-Timing"].split(", ")
+    assert app_timing.startswith("app;dur=")
+    return db
+
+
+@pytest.fixture
+def client():
+    return make_app().test_client()
+
+
+def test_server_timing_counts_request_queries(client):
+    assert db_timing(client.get("/queries/3")) == 'db;dur=6.0;desc="3 queries"'
+    # Rien ne reste de la requête précédente
+    assert db_timing(client.get("/queries/0")) == 'db;dur=0.0;desc="0 queries"'
+    assert current_queries() is None
+
+
+def test_commands_outside_requests_are_not_recorded(client):
+    run_command()
+
+    assert db_timing(client.get("/queries/1")) == 'db;dur=2.0;desc="1 queries"'
+
+
+def test_executor_threads_count_for_their_request(client):
+    assert db_timing(client.get("/threaded")) == 'db;dur=4.0;desc="2 queries"'
+
+
+def test_concurrent_requests_do_not_share_queries(client):
+    responses = {}
+
+    def fetch(count):
+        responses[count] = client.get(f"/interleaved/{count}")
+
+    threads = [threading.Thread(target=fetch, args=(count,)) for count in (2, 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert db_timing(responses[2]) == 'db;dur=4.0;desc="2 queries"'
+    assert db_timing(responses[4]) == 'db;dur=8.0;desc="4 queries"'
+
+
+def test_monitoring_can_be_disabled():
+    response = make_app(MONITORING_ENABLED=False).test_client().get("/queries/1")
+
+    assert "Server-Timing" not in response.headers
+
+
+def test_metrics_endpoint_is_disabled_by_default(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_endpoint_exposes_histograms():
+    pytest.importorskip("prometheus_client")
+    client = make_app(METRICS_ENDPOINT_ENABLED=True).test_client()
+    client.get("/queries/2")
+
+    response = client.get("/metrics")
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert 'webapp_request_seconds_count{endpoint="queries",method="GET",status="200"}' in body
+    assert 'webapp_mongo_command_seconds_count{collection="perfume_data",command="find"}' in body
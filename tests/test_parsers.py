@@ -0,0 +1,270 @@
+"""
+Tests de non-régression des parsers sur les pages de fixtures.
+Un sélecteur cassé doit faire échouer ces tests, pas un crawl complet.
+"""
+from datetime import timedelta
+
+import pytest
+
+from fragrantica_scraper.designer_stats import utcnow
+from fragrantica_scraper.items import ITEM_SCHEMA_VERSION, DesignerStateItem
+from fragrantica_scraper.spiders.perfume_data_spider import PerfumeSpider
+from fragrantica_scraper.spiders.perfume_urls_spider import PerfumeURLsSpider, links_fingerprint
+from tests.conftest import BASE_URL, load_response
+
+
+@pytest.fixture
+def urls_spider():
+    return PerfumeURLsSpider()
+
+
+@pytest.fixture
+def data_spider():
+    return PerfumeSpider()
+
+
+# ═══════════════════════════════════════════════════════════
+# PerfumeURLsSpider.parse
+# ═══════════════════════════════════════════════════════════
+def test_parse_designers_index(urls_spider, designers_response):
+    requests = list(urls_spider.parse(designers_response))
+    
+    assert [r.url for r in requests] == [
+        "https://www.fragrantica.com/designers/d-Annam.html",
+        "https://www.fragrantica.com/designers/French-Avenue.html",
+        "https://www.fragrantica.com/designers/Yves-Saint-Laurent.html",
+        "https://www.fragrantica.com/designers/Zoologist-Perfumes.html",
+    ]
+    assert [r.meta["designer"] for r in requests] == [
+        "d'Annam", "French Avenue", "Yves Saint Laurent", "Zoologist Perfumes",
+    ]
+    assert all(r.callback == urls_spider.parse_designer for r in requests)
+
+
+def test_parse_designers_index_refetches_incomplete(urls_spider, designers_response):
+    # État sans complete=True (parcours interrompu ou antérieur) : toujours dû
+    urls_spider.designer_states = {
+        "https://www.fragrantica.com/designers/French-Avenue.html": {
+            "fetched_at": utcnow(), "unchanged_runs": 3,
+        },
+    }
+    
+    requests = list(urls_spider.parse(designers_response))
+    
+    assert "French Avenue" in [r.meta["designer"] for r in requests]
+    assert len(requests) == 4
+
+
+def test_parse_designers_index_refetches_only_due(urls_spider, designers_response):
+    now = utcnow()
+    urls_spider.designer_states = {
+        # Fetché hier : pas encore dû
+        "https://www.fragrantica.com/designers/d-Annam.html": {
+            "fetched_at": now - timedelta(days=1), "unchanged_runs": 0, "complete": True,
+        },
+        # Fetché il y a 10 jours : dû (intervalle de base 7 jours)
+        "https://www.fragrantica.com/designers/French-Avenue.html": {
+            "fetched_at": now - timedelta(days=10), "unchanged_runs": 0, "complete": True,
+        },
+        # Inchangé 2 fois : intervalle doublé deux fois (28 jours)
+        "https://www.fragrantica.com/designers/Zoologist-Perfumes.html": {
+            "fetched_at": now - timedelta(days=20), "unchanged_runs": 2, "complete": True,
+        },
+    }
+    
+    requests = list(urls_spider.parse(designers_response))
+    
+    assert [r.meta["designer"] for r in requests] == [
+        "French Avenue", "Yves Saint Laurent",
+    ]
+
+
+# ═══════════════════════════════════════════════════════════
+# PerfumeURLsSpider.parse_designer
+# ═══════════════════════════════════════════════════════════
+def _url_items(items):
+    return [item for item in items if not isinstance(item, DesignerStateItem)]
+
+
+def test_parse_designer(urls_spider, designer_response):
+    items = _url_items(urls_spider.parse_designer(designer_response))
+    
+    assert {item["designer"] for item in items} == {"Zoologist Perfumes"}
+    # Toutes les URLs, normalisées et triées par ID de parfum
+    assert [item["perfume_url"] for item in items] == [
+        "https://www.fragrantica.com/perfume/Zoologist-Perfumes/Hummingbird-42047.html",
+        "https://www.fragrantica.com/perfume/Zoologist-Perfumes/Bat-52480.html",
+        "https://www.fragrantica.com/perfume/Zoologist-Perfumes/Cow-72365.html",
+        "https://www.fragrantica.com/perfume/Zoologist-Perfumes/Cockatiel-75184.html",
+    ]
+
+
+def test_parse_designer_skips_existing_urls(urls_spider, designer_response):
+    urls_spider.existing_urls = {
+        "https://www.fragrantica.com/perfume/Zoologist-Perfumes/Cow-72365.html",
+    }
+    
+    items = _url_items(urls_spider.parse_designer(designer_response))
+    
+    assert len(items) == 3
+    assert all("Cow-72365" not in item["perfume_url"] for item in items)
+
+
+def test_parse_designer_state(urls_spider, designer_response):
+    states = [
+        item for item in urls_spider.parse_designer(designer_response)
+        if isinstance(item, DesignerStateItem)
+    ]
+    
+    assert len(states) == 1
+    assert states[0]["designer_url"] == designer_response.url
+    assert states[0]["perfume_count"] == 4
+    assert states[0]["unchanged_runs"] == 0
+    assert states[0]["pages"] == 1
+    assert states[0]["complete"] is True
+
+
+def test_parse_designer_unchanged_fingerprint(urls_spider, designer_response):
+    first = list(urls_spider.parse_designer(designer_response))[-1]
+    urls_spider.designer_states = {designer_response.url: dict(first, unchanged_runs=1)}
+    urls_spider.existing_urls = set()
+    
+    items = list(urls_spider.parse_designer(designer_response))
+    
+    # Liste de liens identique : seul l'état est émis
+    assert len(items) == 1
+    assert items[0]["links_hash"] == first["links_hash"]
+    assert items[0]["unchanged_runs"] == 2
+
+
+def test_parse_designer_paginated(urls_spider):
+    designer_url = "https://www.fragrantica.com/designers/Yves-Saint-Laurent.html"
+    page1 = load_response(
+        "designer_ysl_page1.html", designer_url,
+        meta={"designer": "Yves Saint Laurent", "designer_url": designer_url},
+    )
+    
+    output = list(urls_spider.parse_designer(page1))
+    
+    # Page 1 : URLs émises tout de suite, pas d'état, requête vers la page 2
+    *items, next_request = output
+    assert [i["perfume_url"].rsplit("/", 1)[-1] for i in items] == [
+        "Opium-747.html", "Y-Eau-de-Parfum-50757.html", "Libre-56077.html",
+    ]
+    assert next_request.url == designer_url + "?page=2"
+    assert next_request.meta["page"] == 2
+    
+    page2 = load_response(
+        "designer_ysl_page2.html", next_request.url, meta=next_request.meta,
+    )
+    output = list(urls_spider.parse_designer(page2))
+    
+    *items, state = output
+    assert [i["perfume_url"].rsplit("/", 1)[-1] for i in items] == ["Kouros-749.html"]
+    assert isinstance(state, DesignerStateItem)
+    assert state["designer_url"] == designer_url
+    assert state["perfume_count"] == 4
+    assert state["pages"] == 2
+    assert state["complete"] is True
+
+
+def test_parse_designer_paginated_unchanged_fingerprint(urls_spider):
+    designer_url = "https://www.fragrantica.com/designers/Yves-Saint-Laurent.html"
+    
+    def crawl_designer():
+        meta = {"designer": "Yves Saint Laurent", "designer_url": designer_url}
+        *_, next_request = urls_spider.parse_designer(
+            load_response("designer_ysl_page1.html", designer_url, meta=meta)
+        )
+        # Liens vus gardés par le spider, pas recopiés dans la requête
+        assert "seen_links" not in next_request.meta
+        return list(urls_spider.parse_designer(
+            load_response("designer_ysl_page2.html", next_request.url, meta=next_request.meta)
+        ))[-1]
+    
+    first = crawl_designer()
+    urls_spider.designer_states = {designer_url: dict(first, unchanged_runs=1)}
+    state = crawl_designer()
+    
+    # Empreinte sur les deux pages : inchangée, re-fetch espacé
+    assert state["links_hash"] == first["links_hash"]
+    assert state["unchanged_runs"] == 2
+    assert urls_spider.designer_links == {}
+
+
+def test_links_fingerprint_ignores_order():
+    assert links_fingerprint(["a", "b"]) == links_fingerprint(["b", "a"])
+    assert links_fingerprint(["a", "b"]) != links_fingerprint(["a"])
+
+
+# ═══════════════════════════════════════════════════════════
+# PerfumeSpider.parse_perfume
+# ═══════════════════════════════════════════════════════════
+def test_parse_perfume(data_spider, perfume_response):
+    item = next(data_spider.parse_perfume(perfume_response))
+    
+    assert item["url"] == perfume_response.url
+    assert item["fragrantica_id"] == 75184
+    assert item["name"] == "Cockatiel Zoologist Perfumes"
+    assert item["brand"] == "Zoologist Perfumes"
+    assert item["accords"] == {
+        "powdery": 100.0,
+        "fruity": 77.3219,
+        "sweet": 72.3656,
+        "green": 56.8731,
+    }
+    assert item["notes"] == {
+        "top": ["Pear", "Mandarin Orange"],
+        "middle": ["Orris Root"],
+        "base": ["Vanilla", "Musk"],
+    }
+    assert item["rating"] == 4.12
+    assert item["votes"] == 1024
+    assert item["year"] == 2022
+    assert item["gender"] == "unisex"
+    assert item["image_url"] == "https://fimgs.net/mdimg/perfume/375x500.75184.jpg"
+    assert item["description"].startswith("Cockatiel by Zoologist Perfumes")
+    assert item["schema_version"] == ITEM_SCHEMA_VERSION
+
+
+def test_parse_perfume_flat_notes(data_spider, flat_notes_response):
+    item = next(data_spider.parse_perfume(flat_notes_response))
+    
+    assert item["name"] == "White Rice d'Annam"
+    assert item["notes"] == {"all": ["Rice", "Jasmine"]}
+    assert item["gender"] == "women"
+    assert item["rating"] is None
+    assert item["votes"] is None
+    assert item["year"] is None
+    # Pas d'image dans la page : repli sur og:image
+    assert item["image_url"] == "https://fimgs.net/mdimg/perfume/o.89243.jpg"
+
+
+def test_parse_perfume_minimal(data_spider, minimal_response):
+    item = next(data_spider.parse_perfume(minimal_response))
+    
+    assert item["name"] == "Unknown"
+    assert item["brand"] == "Unknown Designer"
+    assert item["accords"] == {}
+    assert item["notes"] == {}
+    assert item["description"] is None
+    assert item["image_url"] is None
+
+
+def test_parse_perfume_brand_from_page_or_url(data_spider):
+    # Marque de la page, même si le listing venait d'un autre designer
+    page_brand = load_response(
+        "perfume_cockatiel.html",
+        f"{BASE_URL}/perfume/Zoologist-Perfumes/Cockatiel-75184.html",
+        meta={"designer": "French Avenue"},
+    )
+    assert next(data_spider.parse_perfume(page_brand))["brand"] == "Zoologist Perfumes"
+    
+    # Sans marque dans la page : slug de l'URL plutôt que le designer du listing
+    url_brand = load_response(
+        "perfume_flat_notes.html",
+        f"{BASE_URL}/perfume/French-Avenue/NOMAD-122623.html",
+        meta={"designer": "Zoologist Perfumes"},
+    )
+    item = next(data_spider.parse_perfume(url_brand))
+    assert (item["brand"], item["fragrantica_id"]) == ("French Avenue", 122623)
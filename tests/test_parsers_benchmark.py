@@ -0,0 +1,60 @@
+"""
+Benchmarks de débit des parsers (pages/s) sur les pages de fixtures.
+Usage: python -m pytest tests/test_parsers_benchmark.py --benchmark-only
+"""
+import pytest
+
+from fragrantica_scraper.spiders.perfume_data_spider import PerfumeSpider
+from fragrantica_scraper.spiders.perfume_urls_spider import PerfumeURLsSpider
+from tests.conftest import load_response, BASE_URL
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _report_pages_per_sec(benchmark):
+    """Ajoute le débit en pages/s au rapport pytest-benchmark."""
+    if benchmark.stats is None:  # --benchmark-disable
+        return
+    mean = benchmark.stats.stats.mean
+    benchmark.extra_info["pages_per_sec"] = round(1 / mean, 1) if mean else None
+
+
+def test_bench_parse_designers_index(benchmark, designers_response):
+    spider = PerfumeURLsSpider()
+    
+    benchmark(lambda: list(spider.parse(designers_response)))
+    _report_pages_per_sec(benchmark)
+
+
+def test_bench_parse_designer(benchmark):
+    spider = PerfumeURLsSpider()
+    
+    def run():
+        # Réinitialiser le cache pour que chaque tour émette tous les items
+        spider.existing_urls = set()
+        response = load_response(
+            "designer_zoologist.html",
+            f"{BASE_URL}/designers/Zoologist-Perfumes.html",
+            meta={"designer": "Zoologist Perfumes"},
+        )
+        return list(spider.parse_designer(response))
+    
+    benchmark(run)
+    _report_pages_per_sec(benchmark)
+
+
+def test_bench_parse_perfume(benchmark):
+    spider = PerfumeSpider()
+    
+    def run():
+        # Une réponse neuve par tour : le cache de sélecteurs de parsel
+        # ne doit pas fausser la mesure
+        response = load_response(
+            "perfume_cockatiel.html",
+            f"{BASE_URL}/perfume/Zoologist-Perfumes/Cockatiel-75184.html",
+            meta={"designer": "Zoologist Perfumes"},
+        )
+        return list(spider.parse_perfume(response))
+    
+    benchmark(run)
+    _report_pages_per_sec(benchmark)
@@ -0,0 +1,134 @@
+"""
+Tests du modèle Perfume de la webapp (slots, lecture paresseuse, cache).
+"""
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from webapp.models.perfume import Perfume, _Field
+
+DOC = {
+    "_id": ObjectId("65f0c0ffee0000000000beef"),
+    "name": "Cockatiel",
+    "brand": "Zoologist",
+    "url": "https://www.fragrantica.com/perfume/Zoologist-Perfumes/Cockatiel-60583.html",
+    "accords": {"floral": 80.5, "green": 100.0, "fresh": 62.1},
+    "description": None,
+}
+
+# Document complet (schéma v2) : chaque projection en retient une partie
+FULL_DOC = {
+    **DOC,
+    "description": "A green floral.",
+    "notes": {"top": ["Pear"], "middle": ["Jasmine"], "base": ["Moss"]},
+    "rating": 4.2,
+    "votes": 1200,
+    "year": 2019,
+    "gender": "unisex",
+    "image_url": "https://fimgs.net/mdimg/perfume/375x500.60583.jpg",
+    "updated_at": datetime(2026, 5, 1, 12, 0),
+    "designer": "Zoologist Perfumes",
+}
+
+
+def project(doc, projection):
+    """Applique une projection d'inclusion comme MongoDB (_id inclus sauf `_id: 0`)."""
+    fields = [key for key, value in projection.items() if value and key != "_id"]
+    projected = {key: doc[key] for key in fields if key in doc}
+    if projection.get("_id", 1):
+        projected["_id"] = doc["_id"]
+    return projected
+
+
+def test_fields_read_from_document_with_defaults():
+    perfume = Perfume({"_id": DOC["_id"], "description": None, "notes": {}})
+
+    assert perfume.id == "65f0c0ffee0000000000beef"
+    assert perfume.name == "Unknown"
+    assert perfume.brand == "Unknown Brand"
+    assert perfume.description == ""
+    assert perfume.notes == {}
+    assert perfume.rating is None
+    assert perfume.perfume_id is None
+    assert perfume.dominant_accord is None
+
+    with pytest.raises(AttributeError):
+        perfume.extra = 1
+
+
+def test_sorted_accords_computed_once():
+    perfume = Perfume.from_db(dict(DOC))
+
+    first = perfume.sorted_accords
+    assert first == [("green", 100.0), ("floral", 80.5), ("fresh", 62.1)]
+    assert perfume.sorted_accords is first
+    assert perfume.dominant_accord == ("green", 100.0)
+    assert perfume.top_accords(2) == first[:2]
+    assert perfume.perfume_id == "60583"
+
+
+def test_list_from_db_accepts_iterators():
+    perfumes = Perfume.list_from_db(iter([DOC, dict(DOC, name="Bee")]))
+
+    assert [p.name for p in perfumes] == ["Cockatiel", "Bee"]
+    assert perfumes[1].to_dict() == Perfume(dict(DOC, name="Bee")).to_dict()
+    assert perfumes[0].to_dict()["dominant_accord"] == "green"
+    assert Perfume.from_db(None) is None
+
+
+@pytest.mark.parametrize("view", sorted(Perfume.PROJECTIONS))
+def test_projected_documents_round_trip(view):
+    projection = Perfume.PROJECTIONS[view]
+    perfume = Perfume.from_db(project(FULL_DOC, projection))
+
+    data = perfume.to_dict()
+    full = Perfume(FULL_DOC).to_dict()
+    defaults = Perfume({}).to_dict()
+    for key in ("name", "brand", "url", "description", "notes", "rating", "year", "image_url"):
+        # Champ projeté : valeur du document ; sinon valeur par défaut
+        expected = full if projection.get(key) else defaults
+        assert data[key] == expected[key], key
+    assert data["accords"] == full["accords"]
+    assert data["id"] == ("" if projection.get("_id") == 0 else str(FULL_DOC["_id"]))
+
+
+def test_missing_projected_fields_come_back_as_defaults():
+    perfume = Perfume.from_db({"_id": FULL_DOC["_id"]})
+
+    assert perfume.to_dict() == {
+        "id": "65f0c0ffee0000000000beef", "perfume_id": None, "name": "Unknown",
+        "brand": "Unknown Brand", "url": "", "accords": {}, "dominant_accord": None,
+        "description": "", "notes": {}, "rating": None, "votes": None, "year": None,
+        "gender": None, "image_url": "",
+    }
+    assert perfume.updated_at is None
+    assert perfume.top_accords() == []
+
+
+def test_detail_projection_covers_to_dict_fields():
+    # mongomock ajoute `_id` aux projections qu'il reçoit (autres tests)
+    detail = set(Perfume.PROJECTIONS["detail"]) - {"_id"}
+
+    assert detail == set(Perfume.DETAIL_FIELDS)
+    assert set(Perfume.PROJECTIONS["changes"]) - {"_id"} == detail | {"updated_at"}
+    assert Perfume.PROJECTIONS["export"]["_id"] == 0
+
+
+def test_fields_are_slotted_descriptors():
+    perfume = Perfume(dict(FULL_DOC))
+
+    assert not hasattr(perfume, "__dict__")
+    assert isinstance(Perfume.name, _Field) and Perfume.name.key == "name"
+    assert not hasattr(Perfume.name, "__dict__")
+    # Lecture à l'accès : une modification du document est visible
+    perfume._data["name"] = "Cockatiel (2024)"
+    assert perfume.name == "Cockatiel (2024)"
+
+
+def test_top_accords_is_a_method():
+    perfume = Perfume(dict(FULL_DOC, accords={f"a{i}": float(i) for i in range(8)}))
+
+    assert callable(perfume.top_accords)
+    assert perfume.top_accords() == [(f"a{i}", float(i)) for i in range(7, 2, -1)]
+    assert perfume.top_accords(limit=2) == [("a7", 7.0), ("a6", 6.0)]
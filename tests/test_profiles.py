@@ -0,0 +1,85 @@
+"""
+Tests des profils de crawl nommés (polite, balanced, aggressive).
+"""
+import pytest
+from scrapy.settings import SETTINGS_PRIORITIES, Settings
+from scrapy.utils.project import get_project_settings
+
+from fragrantica_scraper.profiles import (
+    DEFAULT_PROFILE, HTTP2_SETTINGS, PROFILES, apply_profile, get_profile
+)
+from fragrantica_scraper.spiders.perfume_data_spider import PerfumeSpider
+from fragrantica_scraper.spiders.perfume_urls_spider import PerfumeURLsSpider
+
+THROUGHPUT_KEYS = (
+    "CONCURRENT_REQUESTS", "CONCURRENT_REQUESTS_PER_DOMAIN", "DOWNLOAD_DELAY",
+    "AUTOTHROTTLE_ENABLED", "AUTOTHROTTLE_START_DELAY", "AUTOTHROTTLE_MAX_DELAY",
+    "AUTOTHROTTLE_TARGET_CONCURRENCY",
+)
+
+
+def crawl_settings(**values):
+    settings = Settings()
+    for key, value in values.items():
+        settings.set(key, value, priority="cmdline")
+    return settings
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_apply_profile_sets_throughput_keys(profile):
+    settings = crawl_settings(CRAWL_PROFILE=profile)
+    apply_profile(settings)
+
+    for key in THROUGHPUT_KEYS:
+        assert settings[key] == PROFILES[profile][key], key
+    assert settings.getbool("DNSCACHE_ENABLED")
+    assert settings.getint("DOWNLOAD_TIMEOUT") == PROFILES[profile].get("DOWNLOAD_TIMEOUT", 60)
+
+
+def test_profiles_order_by_throughput():
+    polite, balanced, aggressive = (PROFILES[name] for name in ("polite", "balanced", "aggressive"))
+
+    assert polite["CONCURRENT_REQUESTS"] < balanced["CONCURRENT_REQUESTS"] < aggressive["CONCURRENT_REQUESTS"]
+    assert polite["DOWNLOAD_DELAY"] > balanced["DOWNLOAD_DELAY"] > aggressive["DOWNLOAD_DELAY"]
+
+
+def test_default_profile_is_polite():
+    settings = Settings()
+    apply_profile(settings)
+
+    assert DEFAULT_PROFILE == "polite"
+    assert settings.getint("CONCURRENT_REQUESTS") == PROFILES["polite"]["CONCURRENT_REQUESTS"]
+
+
+def test_explicit_settings_override_the_profile():
+    settings = crawl_settings(CRAWL_PROFILE="aggressive", CONCURRENT_REQUESTS=3, DOWNLOAD_DELAY=1.5)
+    apply_profile(settings)
+
+    # Priorité "cmdline" (-s) au-dessus de "spider"
+    assert settings.getint("CONCURRENT_REQUESTS") == 3
+    assert settings.getfloat("DOWNLOAD_DELAY") == 1.5
+    assert settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN") == 16
+    assert settings.getpriority("CONCURRENT_REQUESTS_PER_DOMAIN") == SETTINGS_PRIORITIES["spider"]
+
+
+@pytest.mark.parametrize("spidercls", [PerfumeURLsSpider, PerfumeSpider])
+def test_spiders_apply_the_profile_over_project_settings(spidercls):
+    settings = get_project_settings()
+    settings.set("CRAWL_PROFILE", "balanced", priority="cmdline")
+    spidercls.update_settings(settings)
+
+    for key in THROUGHPUT_KEYS:
+        assert settings[key] == PROFILES["balanced"][key], key
+
+
+def test_http2_adds_the_download_handler():
+    settings = crawl_settings(CRAWL_PROFILE="balanced", CRAWL_HTTP2=True)
+    apply_profile(settings)
+
+    assert settings.getdict("DOWNLOAD_HANDLERS") == HTTP2_SETTINGS["DOWNLOAD_HANDLERS"]
+    assert "DOWNLOAD_HANDLERS" not in get_profile("balanced")
+
+
+def test_unknown_profile_raises_a_clear_error():
+    with pytest.raises(ValueError, match=r"Unknown crawl profile 'turbo' \(available: polite, balanced, aggressive\)"):
+        apply_profile(crawl_settings(CRAWL_PROFILE="turbo"))
@@ -0,0 +1,49 @@
+"""
+Tests des hooks de profilage (minuteries et sortie collapsed).
+"""
+import json
+
+import pytest
+
+from fragrantica_scraper.profiling import HotPathProfiler, profiled, profiler
+
+
+@pytest.fixture
+def active_profiler():
+    profiler.start(interval=0.001)
+    yield profiler
+    profiler.stop()
+
+
+def test_hooks_are_transparent_when_inactive():
+    @profiled("test.gen")
+    def gen():
+        yield 1
+        yield 2
+
+    assert list(gen()) == [1, 2]
+    assert "test.gen" not in profiler.timers
+
+
+def test_generator_callback_counts_one_call(active_profiler):
+    @profiled("test.callback")
+    def callback():
+        yield {"a": 1}
+        yield {"b": 2}
+
+    assert list(callback()) == [{"a": 1}, {"b": 2}]
+    assert active_profiler.timers["test.callback"][0] == 1
+
+
+def test_dump_writes_timers_and_collapsed(tmp_path):
+    local = HotPathProfiler()
+    local.start(interval=0.001)
+    with local.timed("test.block"):
+        sum(range(200000))
+    local.stop()
+
+    directory = local.dump(tmp_path)
+
+    timers = json.loads((directory / "timers.json").read_text())
+    assert timers["test.block"]["calls"] == 1
+    assert (directory / "all.collapsed").exists()
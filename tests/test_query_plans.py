@@ -0,0 +1,169 @@
+"""
+Plans d'exécution des requêtes de la webapp.
+
+Chaque méthode de PerfumeService / StatsService est exécutée contre un
+MongoDB local (base de test jetable) avec les index de utils/indexes.py ;
+toutes les commandes de lecture émises sont rejouées avec explain() et le
+test échoue si un plan retenu contient un COLLSCAN.
+
+Ignoré sans serveur MongoDB : MONGO_TEST_URI (défaut: mongodb://localhost:27017/).
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+from webapp.services import ChangesService, PerfumeService, StatsService
+from webapp.utils.catalog import init_catalog
+from webapp.utils.counts import init_counts
+from webapp.utils.data_version import init_data_version
+from webapp.utils.indexes import init_indexes
+from webapp.utils.sampling import init_sampling
+
+MONGO_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017/")
+DATABASE = "fragrantica_test_query_plans"
+
+READ_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+# Requêtes de service ; `doc` est un parfum de la base de test
+QUERIES = {
+    "get_all": lambda doc: PerfumeService.get_all(),
+    "get_all_brand": lambda doc: PerfumeService.get_all(brand=doc["brand"]),
+    "get_all_search": lambda doc: PerfumeService.get_all(search="sauv"),
+    "get_all_brand_search": lambda doc: PerfumeService.get_all(brand=doc["brand"], search="sauv"),
+    "get_by_id": lambda doc: PerfumeService.get_by_id(str(doc["_id"])),
+    "get_by_url": lambda doc: PerfumeService.get_by_url(doc["url"]),
+    "get_many": lambda doc: PerfumeService.get_many({
+        "ids": [str(doc["_id"])], "urls": [doc["url"]], "perfume_ids": ["12"],
+    }),
+    "search": lambda doc: PerfumeService.search("dior"),
+    "get_by_brand": lambda doc: PerfumeService.get_by_brand(doc["brand"], page=2, per_page=2),
+    "get_by_accord": lambda doc: PerfumeService.get_by_accord("woody"),
+    "get_random": lambda doc: PerfumeService.get_random(limit=3),
+    "get_latest": lambda doc: PerfumeService.get_latest(),
+    "get_changes": lambda doc: ChangesService.get_changes(limit=50),
+    "get_changes_since": lambda doc: ChangesService.get_changes(
+        ChangesService.encode_token({"t": doc["updated_at"], "i": doc["_id"]}), limit=50
+    ),
+    "get_overview": lambda doc: StatsService.get_overview(),
+    "get_brands_stats": lambda doc: StatsService.get_brands_stats(),
+    "search_brand": lambda doc: StatsService.search_brand("di"),
+}
+# StatsService.get_accords_stats lit volontairement tous les documents
+# (moyennes par accord) : exclu de la vérification.
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Enregistre les commandes de lecture envoyées au serveur."""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name in READ_COMMANDS:
+            self.commands.append(event.command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def seed(db):
+    now = datetime(2026, 1, 1)
+    brands = ["Dior", "Chanel", "Creed", "Le Labo"]
+    accords = ["woody", "citrus", "floral", "amber"]
+    db.perfume_data.insert_many([
+        {
+            "name": f"Sauvage {i}" if i % 5 == 0 else f"Perfume {i}",
+            "brand": brands[i % len(brands)],
+            "url": f"https://www.fragrantica.com/perfume/Brand/Perfume-{i}.html",
+            "fragrantica_id": i,
+            "accords": {accords[i % 4]: 90.0, accords[(i + 1) % 4]: 60.0},
+            "updated_at": now + timedelta(minutes=i // 3),
+        }
+        for i in range(200)
+    ])
+    db.perfume_urls.insert_many([
+        {"perfume_url": f"https://www.fragrantica.com/perfume/Brand/Perfume-{i}.html"}
+        for i in range(250)
+    ])
+
+
+@pytest.fixture(scope="module")
+def mongo():
+    recorder = CommandRecorder()
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=1000, event_listeners=[recorder])
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"MongoDB non disponible sur {MONGO_URI}")
+
+    client.drop_database(DATABASE)
+    seed(client[DATABASE])
+    yield client, recorder
+    client.drop_database(DATABASE)
+    client.close()
+
+
+@pytest.fixture(scope="module")
+def app(mongo):
+    client, _ = mongo
+    app = Flask(__name__)
+    app.config.update(
+        MONGO_DATABASE=DATABASE,
+        COLLECTION_DATA="perfume_data",
+        COLLECTION_URLS="perfume_urls",
+        DATA_VERSION_TTL=0,
+        # Les lectures de change stream ne sont pas des plans de requête
+        CHANGES_CHANGE_STREAMS=False,
+    )
+    app.extensions["mongo_client"] = client
+    init_indexes(app)
+    init_data_version(app)
+    return app
+
+
+def winning_stages(explain):
+    """Étapes des plans retenus, quel que soit le format de explain()."""
+    stages = []
+
+    def walk(node, in_plan):
+        if isinstance(node, dict):
+            if in_plan and "stage" in node:
+                stages.append(node["stage"])
+            for key, value in node.items():
+                walk(value, in_plan or key in ("winningPlan", "queryPlan"))
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, in_plan)
+
+    walk(explain, False)
+    return stages
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_service_query_uses_an_index(app, mongo, name):
+    client, recorder = mongo
+    db = client[DATABASE]
+    doc = db.perfume_data.find_one({"name": "Sauvage 0"})
+
+    # Caches vides : les chargements du réservoir, du catalogue et les
+    # comptages sont vérifiés aussi
+    init_sampling(app)
+    init_catalog(app)
+    init_counts(app)
+    recorder.commands.clear()
+    with app.app_context():
+        QUERIES[name](doc)
+
+    assert recorder.commands, f"{name}: aucune commande enregistrée"
+    for command in recorder.commands:
+        command = {k: v for k, v in command.items() if not k.startswith("$") and k != "lsid"}
+        explain = db.command({"explain": command, "verbosity": "queryPlanner"})
+        assert "COLLSCAN" not in winning_stages(explain), f"{name}: {command}"
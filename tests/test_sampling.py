@@ -0,0 +1,58 @@
+"""
+Tests du tirage aléatoire par réservoir d'IDs et de la version des données.
+"""
+from webapp.utils.data_version import DataVersion, membership
+from webapp.utils.sampling import IdReservoir, ordered
+
+
+def test_reservoir_reloads_only_on_version_change():
+    reservoir = IdReservoir()
+    loads = []
+
+    def load_ids():
+        loads.append(1)
+        return range(100)
+
+    assert reservoir.refresh((100, 100, "a"), load_ids) is True
+    assert reservoir.refresh((100, 100, "a"), load_ids) is False
+    assert reservoir.refresh((101, 100, "b"), load_ids) is True
+    assert len(loads) == 2
+
+    picked = reservoir.sample(10)
+    assert len(picked) == len(set(picked)) == 10
+    assert set(picked) <= set(range(100))
+    assert len(reservoir.sample(500)) == 100
+
+
+def test_ordered_follows_sampled_ids_and_skips_missing():
+    docs = [{"_id": 1, "name": "a"}, {"_id": 3, "name": "c"}]
+    assert [doc["name"] for doc in ordered(docs, [3, 2, 1])] == ["c", "a"]
+
+
+def test_data_version_is_cached_for_ttl():
+    version = DataVersion(ttl=60)
+    assert version.is_stale()
+
+    value = version.update(10, 12, {"_id": "abc"}, {"updated_at": 5})
+    assert value == (10, 12, "abc", 5)
+    assert not version.is_stale()
+
+    version.ttl = 0
+    assert version.is_stale()
+    assert version.update(0, 0, None) == (0, 0, None, None)
+
+
+def test_rewrites_do_not_reload_the_reservoir():
+    reservoir = IdReservoir()
+    loads = []
+
+    def load_ids():
+        loads.append(1)
+        return range(10)
+
+    # Seul updated_at change (re-crawl) : même ensemble de documents
+    assert reservoir.refresh(membership((10, 10, "a", 1)), load_ids) is True
+    assert reservoir.refresh(membership((10, 10, "a", 2)), load_ids) is False
+    assert reservoir.refresh(membership((11, 10, "b", 3)), load_ids) is True
+    assert len(loads) == 2
+    assert membership(None) is None
@@ -0,0 +1,103 @@
+"""
+Tests de la sérialisation des réponses API (JSON orjson, MessagePack).
+"""
+from datetime import date, datetime
+
+import pytest
+from bson import ObjectId
+from flask import Flask, jsonify
+
+from webapp.utils import serializers
+from webapp.utils.serializers import (
+    JSON_MIMETYPE, ORJSONProvider, dumps_json, init_serializers, negotiate, serialize
+)
+
+msgpack = pytest.importorskip("msgpack")
+
+OID = ObjectId("65f0c0ffee0000000000abcd")
+WHEN = datetime(2026, 5, 1, 12, 30, 0, 123000)
+PAYLOAD = {'id': OID, 'updated_at': WHEN, 'day': date(2026, 5, 1), 'name': 'Sauvage', 'accords': {'woody': 90.5}}
+DECODED = {
+    'id': '65f0c0ffee0000000000abcd', 'updated_at': '2026-05-01T12:30:00.123000',
+    'day': '2026-05-01', 'name': 'Sauvage', 'accords': {'woody': 90.5},
+}
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON_MIMETYPE),
+    ("", JSON_MIMETYPE),
+    ("*/*", JSON_MIMETYPE),
+    ("application/json", JSON_MIMETYPE),
+    ("text/html", JSON_MIMETYPE),
+    ("application/msgpack", "application/msgpack"),
+    ("application/x-msgpack", "application/x-msgpack"),
+    ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+    ("application/msgpack;q=0.2, application/json;q=0.9", JSON_MIMETYPE),
+    ("application/msgpack, */*;q=0.1", "application/msgpack"),
+    ("application/json, application/msgpack", JSON_MIMETYPE),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_negotiate_without_msgpack(monkeypatch):
+    monkeypatch.setattr(serializers, "msgpack", None)
+
+    assert negotiate("application/msgpack") == JSON_MIMETYPE
+    assert serialize(PAYLOAD, "application/msgpack")[1] == JSON_MIMETYPE
+
+
+def test_json_encodes_object_ids_and_dates():
+    body, mimetype = serialize(PAYLOAD)
+
+    assert mimetype == JSON_MIMETYPE
+    assert serializers.orjson.loads(body) == DECODED
+    with pytest.raises(TypeError):
+        dumps_json({'value': object()})
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    expected = dumps_json(PAYLOAD)
+    monkeypatch.setattr(serializers, "orjson", None)
+
+    assert dumps_json(PAYLOAD) == expected
+
+
+def test_msgpack_encodes_object_ids_and_dates():
+    body, mimetype = serialize(PAYLOAD, "application/msgpack")
+
+    assert mimetype == "application/msgpack"
+    assert msgpack.unpackb(body) == DECODED
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    init_serializers(app)
+
+    @app.route("/payload")
+    def payload():
+        return jsonify(PAYLOAD)
+
+    return app.test_client()
+
+
+def test_provider_is_installed_unless_disabled(client):
+    assert isinstance(client.application.json, ORJSONProvider)
+
+    app = Flask(__name__)
+    app.config['FAST_JSON_ENABLED'] = False
+    init_serializers(app)
+    assert not isinstance(app.json, ORJSONProvider)
+
+
+def test_flask_responses_follow_accept_and_vary(client):
+    response = client.get("/payload")
+    assert response.mimetype == JSON_MIMETYPE
+    assert response.get_json() == DECODED
+    assert response.headers['Vary'] == 'Accept'
+
+    response = client.get("/payload", headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == "application/msgpack"
+    assert msgpack.unpackb(response.data) == DECODED
+    assert response.headers['Vary'] == 'Accept'
@@ -2,7 +2,19 @@
 Fragrantica Web Application.
 Application Flask pour visualiser les données de parfums.
 """
-from .app import create_app, app
+import importlib
 
 __version__ = '1.0.0'
-__all__ = ['create_app', 'app']
\ No newline at end of file
+__all__ = ['create_app', 'app']
+
+
+def __getattr__(name):
+    # Import paresseux : `import webapp.models` (scripts, benchmarks) ne crée
+    # pas l'application ni la connexion MongoDB
+    if name in __all__:
+        app_module = importlib.import_module('webapp.app')
+        # L'import du sous-module a lié `webapp.app` au module : rétablir
+        # les noms exportés (l'application Flask, pas le module)
+        globals().update(create_app=app_module.create_app, app=app_module.app)
+        return globals()[name]
+    raise AttributeError(f"module 'webapp' has no attribute {name!r}")
@@ -5,6 +5,15 @@ Point d'entrée de l'application web.
 from flask import Flask, render_template
 from webapp.config import get_config
 from webapp.utils.db import init_db
+from webapp.utils.indexes import init_indexes
+from webapp.utils.monitoring import init_monitoring
+from webapp.utils.executor import init_executor
+from webapp.utils.data_version import init_data_version
+from webapp.utils.sampling import init_sampling
+from webapp.utils.catalog import init_catalog
+from webapp.utils.counts import init_counts
+from webapp.utils.serializers import init_serializers
+from webapp.services.homepage_service import init_homepage
 from webapp.routes import main_bp, perfumes_bp, api_bp
 
 
@@ -26,9 +35,31 @@ def create_app(config_class=None):
     
     app.config.from_object(config_class)
     
+    # JSON rapide (orjson) et MessagePack pour les réponses API
+    init_serializers(app)
+    
+    # Instrumentation (latences, commandes MongoDB, /metrics) avant la connexion
+    init_monitoring(app)
+    
     # Initialiser la connexion MongoDB
     init_db(app)
     
+    # Index requis par les requêtes des services (idempotent)
+    init_indexes(app)
+    
+    # Pool pour les requêtes indépendantes lancées en parallèle
+    init_executor(app)
+    
+    # Version des données, réservoir d'IDs (tirage aléatoire), catalogue
+    # des marques et noms (autocomplétion) et totaux de pagination
+    init_data_version(app)
+    init_sampling(app)
+    init_catalog(app)
+    init_counts(app)
+    
+    # Données de la page d'accueil reconstruites en arrière-plan
+    init_homepage(app)
+    
     # Enregistrer les blueprints (routes)
     app.register_blueprint(main_bp)
     app.register_blueprint(perfumes_bp)
@@ -0,0 +1,289 @@
+"""
+Mode de service asynchrone (ASGI).
+
+Les endpoints JSON /api/* sont servis par Starlette avec le client MongoDB
+asynchrone de PyMongo : une requête lente (statistiques, recherche par
+regex) n'occupe plus un worker entier, les autres continuent d'être servis
+sur la même boucle d'événements. Les pages HTML restent servies par l'app
+Flask, montée derrière (via a2wsgi).
+
+Usage:
+    uvicorn webapp.asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+Comparaison avec gunicorn (sync) : python scripts/loadtest.py --compare
+"""
+import contextlib
+
+from pymongo import AsyncMongoClient
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from webapp.config import get_config
+from webapp.services.async_services import AsyncPerfumeService, AsyncStatsService
+from webapp.services.changes_service import ChangesService
+from webapp.services.count_service import CountService
+from webapp.services.perfume_service import PerfumeService
+from webapp.utils.data_version import DataVersion
+from webapp.utils.serializers import serialize
+
+
+def api_response(request, payload, status_code=200):
+    """Réponse JSON (orjson) ou MessagePack selon l'en-tête Accept."""
+    body, mimetype = serialize(payload, request.headers.get('accept'))
+    return Response(body, status_code=status_code, media_type=mimetype,
+                    headers={'Vary': 'Accept'})
+
+
+def _int_arg(request, name, default):
+    """Équivalent de request.args.get(name, default, type=int) de Flask."""
+    try:
+        return int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _error(request, message, status):
+    return api_response(request, {'success': False, 'error': message}, status)
+
+
+# Endpoints : mêmes paramètres et mêmes réponses que webapp/routes/api.py
+
+async def api_perfumes(request):
+    """API: Liste des parfums."""
+    page = _int_arg(request, 'page', 1)
+    per_page = min(_int_arg(request, 'per_page', 24), 100)
+
+    results = await request.app.state.perfumes.get_all(
+        page=page,
+        per_page=per_page,
+        brand=request.query_params.get('brand'),
+        search=request.query_params.get('search'),
+        view='detail'
+    )
+
+    return api_response(request, {
+        'success': True,
+        'data': [p.to_dict() for p in results['perfumes']],
+        'pagination': CountService.pagination(results)
+    })
+
+
+async def api_perfume_detail(request):
+    """API: Détail d'un parfum."""
+    perfume = await request.app.state.perfumes.get_by_id(request.path_params['perfume_id'])
+
+    if not perfume:
+        return _error(request, 'Perfume not found', 404)
+
+    return api_response(request, {'success': True, 'data': perfume.to_dict()})
+
+
+async def api_perfumes_batch(request):
+    """API: Plusieurs parfums en une requête (ids, urls, perfume_ids)."""
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+    perfumes_service = request.app.state.perfumes
+    try:
+        keys = PerfumeService.batch_keys(payload, perfumes_service.config.get('BATCH_MAX_ITEMS', 100))
+    except ValueError as e:
+        return _error(request, str(e), 400)
+
+    perfumes, missing = await perfumes_service.get_many(keys, view='detail')
+
+    return api_response(request, {
+        'success': True,
+        'data': [p.to_dict() for p in perfumes],
+        'count': len(perfumes),
+        'missing': missing
+    })
+
+
+async def api_changes(request):
+    """API: Parfums modifiés depuis une synchronisation précédente."""
+    perfumes_service = request.app.state.perfumes
+    page_size = perfumes_service.config.get('CHANGES_PAGE_SIZE', 500)
+    limit = min(_int_arg(request, 'limit', page_size), page_size)
+
+    try:
+        results = await perfumes_service.get_changes(
+            request.query_params.get('since'), limit=max(limit, 1)
+        )
+    except ValueError as e:
+        return _error(request, str(e), 400)
+
+    return api_response(request, {
+        'success': True,
+        'data': [ChangesService.to_dict(p) for p in results['perfumes']],
+        'count': len(results['perfumes']),
+        'next_token': results['next_token'],
+        'has_more': results['has_more'],
+        'mode': results['mode']
+    })
+
+
+async def api_search(request):
+    """API: Recherche de parfums."""
+    query = request.query_params.get('q', '')
+    if not query:
+        return _error(request, 'Query parameter "q" is required', 400)
+
+    limit = min(_int_arg(request, 'limit', 20), 100)
+    results = await request.app.state.perfumes.search(query, limit=limit, view='detail')
+
+    return api_response(request, {
+        'success': True,
+        'data': [p.to_dict() for p in results],
+        'count': len(results)
+    })
+
+
+async def api_brands(request):
+    """API: Liste des marques."""
+    brands = await request.app.state.stats.get_brands_stats()
+    return api_response(request, {'success': True, 'data': brands})
+
+
+async def api_brand_perfumes(request):
+    """API: Parfums d'une marque."""
+    brand_name = request.path_params['brand_name']
+    page = _int_arg(request, 'page', 1)
+    per_page = min(_int_arg(request, 'per_page', 24), 100)
+
+    results = await request.app.state.perfumes.get_by_brand(
+        brand_name=brand_name,
+        page=page,
+        per_page=per_page,
+        view='detail'
+    )
+
+    return api_response(request, {
+        'success': True,
+        'brand': brand_name,
+        'data': [p.to_dict() for p in results['perfumes']],
+        'pagination': CountService.pagination(results)
+    })
+
+
+async def api_accords(request):
+    """API: Liste des accords."""
+    accords = await request.app.state.stats.get_accords_stats()
+    return api_response(request, {'success': True, 'data': accords})
+
+
+async def api_stats(request):
+    """API: Statistiques globales."""
+    stats = await request.app.state.stats.get_dashboard_data()
+    return api_response(request, {'success': True, 'data': stats})
+
+
+async def api_random(request):
+    """API: Parfums aléatoires."""
+    limit = min(_int_arg(request, 'limit', 6), 50)
+    perfumes = await request.app.state.perfumes.get_random(limit=limit, view='detail')
+
+    return api_response(request, {
+        'success': True,
+        'data': [p.to_dict() for p in perfumes],
+        'count': len(perfumes)
+    })
+
+
+async def api_autocomplete(request):
+    """API: Suggestions de marques et de parfums pour un préfixe."""
+    query = request.query_params.get('q', '').strip()
+    limit = min(_int_arg(request, 'limit', 8), 20)
+    catalog = await request.app.state.stats.get_catalog()
+
+    return api_response(request, {
+        'success': True,
+        'query': query,
+        'brands': catalog.complete_brands(query, limit=limit),
+        'perfumes': catalog.complete_names(query, limit=limit)
+    })
+
+
+API_ROUTES = [
+    Route('/perfumes', api_perfumes),
+    Route('/perfumes/batch', api_perfumes_batch, methods=['POST']),
+    Route('/perfumes/{perfume_id}', api_perfume_detail),
+    Route('/changes', api_changes),
+    Route('/search', api_search),
+    Route('/brands', api_brands),
+    Route('/brands/{brand_name}', api_brand_perfumes),
+    Route('/accords', api_accords),
+    Route('/stats', api_stats),
+    Route('/random', api_random),
+    Route('/autocomplete', api_autocomplete),
+]
+
+
+async def api_not_found(request, exc):
+    return _error(request, 'Resource not found', 404)
+
+
+async def api_internal_error(request, exc):
+    return _error(request, 'Internal server error', 500)
+
+
+def create_asgi_app(config_class=None, flask_app=None):
+    """
+    Factory de l'application ASGI.
+
+    Args:
+        config_class: Classe de configuration (défaut: selon FLASK_ENV)
+        flask_app: App Flask servant les pages HTML (None: /api/* uniquement)
+
+    Returns:
+        Starlette: Application ASGI
+    """
+    config_class = config_class or get_config()
+    config = {k: getattr(config_class, k) for k in dir(config_class) if k.isupper()}
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        client = AsyncMongoClient(
+            config['MONGO_URI'],
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=config.get('MONGO_MAX_POOL_SIZE', 50)
+        )
+        db = client[config['MONGO_DATABASE']]
+        data_version = DataVersion(ttl=config.get('DATA_VERSION_TTL', 5))
+        app.state.perfumes = AsyncPerfumeService(db, config, data_version)
+        app.state.stats = AsyncStatsService(db, config, data_version)
+        yield
+        await client.close()
+
+    api = Starlette(
+        routes=API_ROUTES,
+        exception_handlers={404: api_not_found, 500: api_internal_error}
+    )
+    routes = [Mount('/api', app=api)]
+
+    if flask_app is not None:
+        from a2wsgi import WSGIMiddleware
+        routes.append(Mount('/', app=WSGIMiddleware(flask_app)))
+
+    asgi_app = Starlette(routes=routes, lifespan=lifespan)
+    # Les services sont portés par l'app racine : visibles depuis le sous-app
+    api.state = asgi_app.state
+    return asgi_app
+
+
+def _create_default_app():
+    from webapp.app import app as flask_app
+    return create_asgi_app(flask_app=flask_app)
+
+
+def __getattr__(name):
+    """
+    `app` créée au premier accès (uvicorn webapp.asgi:app) : importer le
+    module (tests, create_asgi_app) ne démarre pas l'app Flask ni sa
+    connexion MongoDB.
+    """
+    if name == 'app':
+        globals()['app'] = _create_default_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -25,9 +25,46 @@ class Config:
     COLLECTION_URLS = 'perfume_urls'
     COLLECTION_DATA = 'perfume_data'
     
+    # Requêtes concurrentes (voir utils/executor.py)
+    QUERY_WORKERS = int(os.getenv('QUERY_WORKERS', 8))
+    QUERY_DEADLINE_MS = int(os.getenv('QUERY_DEADLINE_MS', 2000))
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    
+    # Création des index au démarrage (voir utils/indexes.py)
+    MONGO_ENSURE_INDEXES = os.getenv('MONGO_ENSURE_INDEXES', 'True').lower() == 'true'
+    
+    # Version des données revérifiée au plus toutes les N secondes (voir utils/data_version.py)
+    DATA_VERSION_TTL = float(os.getenv('DATA_VERSION_TTL', 5))
+    
+    # Totaux de pagination en cache par filtre ; comptage des filtres regex
+    # arrêté à COUNT_CAP (affiché « 1000+ », voir utils/counts.py)
+    COUNT_CAP = int(os.getenv('COUNT_CAP', 1000))
+    COUNT_CACHE_SIZE = int(os.getenv('COUNT_CACHE_SIZE', 1024))
+    
+    # Page d'accueil : reconstruction en arrière-plan (0 = à chaque requête)
+    HOMEPAGE_REFRESH_SECONDS = float(os.getenv('HOMEPAGE_REFRESH_SECONDS', 60))
+    HOMEPAGE_FEATURED_POOL = int(os.getenv('HOMEPAGE_FEATURED_POOL', 36))
+    
+    # Réponses API via orjson / MessagePack (voir utils/serializers.py)
+    FAST_JSON_ENABLED = os.getenv('FAST_JSON_ENABLED', 'True').lower() == 'true'
+    
     # Pagination
     ITEMS_PER_PAGE = 24
     
+    # Clés acceptées par POST /api/perfumes/batch
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 100))
+    
+    # Synchronisation incrémentale /api/changes (voir services/changes_service.py)
+    CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', 500))
+    CHANGES_SETTLE_SECONDS = float(os.getenv('CHANGES_SETTLE_SECONDS', 5))
+    CHANGES_CHANGE_STREAMS = os.getenv('CHANGES_CHANGE_STREAMS', 'True').lower() == 'true'
+    
+    # Monitoring (voir utils/monitoring.py)
+    MONITORING_ENABLED = os.getenv('MONITORING_ENABLED', 'True').lower() == 'true'
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+    # Route /metrics (Prometheus) : non authentifiée, désactivée par défaut
+    METRICS_ENDPOINT_ENABLED = os.getenv('METRICS_ENDPOINT_ENABLED', 'False').lower() == 'true'
+    
     # Cache (optionnel)
     CACHE_TYPE = 'SimpleCache'
     CACHE_DEFAULT_TIMEOUT = 300
@@ -1,63 +1,139 @@
 """
 Modèle Perfume pour l'application.
 """
-from webapp.utils.formatters import format_accords, get_top_accords, extract_perfume_id
+from webapp.utils.formatters import format_accords, extract_perfume_id
+
+
+# Slot d'une valeur dérivée pas encore calculée
+_UNSET = object()
+
+
+class _Field:
+    """
+    Champ lu dans le document MongoDB au moment de l'accès.
+
+    Rien n'est copié à la construction : une carte qui n'affiche que le nom
+    et la marque ne touche jamais à la description ni aux notes.
+    """
+
+    __slots__ = ('key', 'default')
+
+    def __init__(self, key, default=None):
+        self.key = key
+        self.default = default
+
+    def __get__(self, perfume, owner=None):
+        if perfume is None:
+            return self
+        return perfume._data.get(self.key, self.default)
+
+
+class _OptionalField(_Field):
+    """Champ du schéma v2 : une valeur vide ou nulle est remplacée par le défaut."""
+
+    __slots__ = ()
+
+    def __get__(self, perfume, owner=None):
+        if perfume is None:
+            return self
+        return perfume._data.get(self.key) or self.default
 
 
 class Perfume:
     """
     Modèle représentant un parfum.
+
+    Enveloppe légère (__slots__) autour du document MongoDB : les champs sont
+    lus à la demande, les valeurs dérivées (id, perfume_id, accords triés)
+    sont calculées au premier accès puis conservées dans leur slot.
     """
-    
+
+    __slots__ = ('_data', '_id', '_perfume_id', '_sorted_accords')
+
+    # Champs lus par to_dict() et la page de détail
+    DETAIL_FIELDS = (
+        'url', 'name', 'brand', 'accords', 'description', 'notes',
+        'rating', 'votes', 'year', 'gender', 'image_url'
+    )
+
+    # Projections MongoDB par vue : seuls les champs affichés sont transférés
+    PROJECTIONS = {
+        # Cartes des listes HTML : nom, marque et accords (+ _id pour le lien)
+        'card': {'name': 1, 'brand': 1, 'accords': 1},
+        # Page de détail et réponses de l'API
+        'detail': dict.fromkeys(DETAIL_FIELDS, 1),
+        # Export de données : mêmes champs, sans l'identifiant interne
+        'export': {'_id': 0, **dict.fromkeys(DETAIL_FIELDS, 1)},
+        # Synchronisation incrémentale (/api/changes) : détail + date de modification
+        'changes': {**dict.fromkeys(DETAIL_FIELDS, 1), 'updated_at': 1},
+    }
+
+    url = _Field('url', '')
+    name = _Field('name', 'Unknown')
+    brand = _Field('brand', 'Unknown Brand')
+    accords = _Field('accords', {})
+
+    # Données enrichies (schéma v2 du scraper, absentes des anciens documents)
+    description = _OptionalField('description', '')
+    notes = _OptionalField('notes', {})
+    rating = _Field('rating')
+    votes = _Field('votes')
+    year = _Field('year')
+    gender = _Field('gender')
+    image_url = _OptionalField('image_url', '')
+
+    # Horodatage des pipelines (absent des documents non migrés)
+    updated_at = _Field('updated_at')
+
     def __init__(self, data):
         """
         Initialise un parfum depuis les données MongoDB.
-        
+
         Args:
             data (dict): Données du parfum depuis MongoDB
         """
         self._data = data
-        self.id = str(data.get('_id', ''))
-        self.url = data.get('url', '')
-        self.name = data.get('name', 'Unknown')
-        self.brand = data.get('brand', 'Unknown Brand')
-        self.accords = data.get('accords', {})
-        
-        # Données optionnelles (pour extension future)
-        self.description = data.get('description', '')
-        self.notes = data.get('notes', {})
-        self.rating = data.get('rating')
-        self.image_url = data.get('image_url', '')
-    
+        self._id = self._perfume_id = self._sorted_accords = _UNSET
+
+    @property
+    def id(self):
+        """Retourne l'ID MongoDB sous forme de chaîne (converti une fois)."""
+        if self._id is _UNSET:
+            self._id = str(self._data.get('_id', ''))
+        return self._id
+
     @property
     def perfume_id(self):
-        """Retourne l'ID du parfum extrait de l'URL."""
-        return extract_perfume_id(self.url)
-    
+        """Retourne l'ID du parfum extrait de l'URL (calculé une fois)."""
+        if self._perfume_id is _UNSET:
+            self._perfume_id = extract_perfume_id(self.url)
+        return self._perfume_id
+
     @property
     def sorted_accords(self):
-        """Retourne les accords triés par valeur décroissante."""
-        return format_accords(self.accords)
-    
-    @property
+        """Retourne les accords triés par valeur décroissante (triés une fois)."""
+        if self._sorted_accords is _UNSET:
+            self._sorted_accords = format_accords(self.accords)
+        return self._sorted_accords
+
     def top_accords(self, limit=5):
-        """Retourne les 5 premiers accords."""
-        return get_top_accords(self.accords, limit)
-    
+        """Retourne les `limit` premiers accords."""
+        return self.sorted_accords[:limit]
+
     @property
     def dominant_accord(self):
         """Retourne l'accord dominant."""
-        if self.sorted_accords:
-            return self.sorted_accords[0]
-        return None
-    
+        sorted_accords = self.sorted_accords
+        return sorted_accords[0] if sorted_accords else None
+
     def to_dict(self):
         """
         Convertit le parfum en dictionnaire (pour API JSON).
-        
+
         Returns:
             dict: Représentation du parfum
         """
+        dominant = self.dominant_accord
         return {
             'id': self.id,
             'perfume_id': self.perfume_id,
@@ -65,38 +141,54 @@ class Perfume:
             'brand': self.brand,
             'url': self.url,
             'accords': dict(self.sorted_accords),
-            'dominant_accord': self.dominant_accord[0] if self.dominant_accord else None,
+            'dominant_accord': dominant[0] if dominant else None,
             'description': self.description,
+            'notes': self.notes,
             'rating': self.rating,
+            'votes': self.votes,
+            'year': self.year,
+            'gender': self.gender,
             'image_url': self.image_url
         }
-    
+
     def __repr__(self):
         """Représentation du parfum."""
         return f"<Perfume {self.name} by {self.brand}>"
-    
+
     @staticmethod
     def from_db(data):
         """
         Factory method pour créer un Perfume depuis MongoDB.
-        
+
         Args:
             data (dict): Données MongoDB
-        
+
         Returns:
             Perfume: Instance de Perfume
         """
         return Perfume(data) if data else None
-    
+
     @staticmethod
     def list_from_db(data_list):
         """
-        Convertit une liste de données MongoDB en liste de Perfume.
-        
+        Convertit des données MongoDB en liste de Perfume.
+
+        Construction en masse : un curseur peut être passé directement (pas
+        de liste intermédiaire) et chaque instance est créée sans appel à
+        __init__, par simple affectation de ses slots.
+
         Args:
-            data_list (list): Liste de dictionnaires MongoDB
-        
+            data_list (iterable): Liste ou curseur de dictionnaires MongoDB
+
         Returns:
             list: Liste d'instances Perfume
         """
-        return [Perfume(data) for data in data_list]
\ No newline at end of file
+        new = object.__new__
+        perfumes = []
+        append = perfumes.append
+        for data in data_list:
+            perfume = new(Perfume)
+            perfume._data = data
+            perfume._id = perfume._perfume_id = perfume._sorted_accords = _UNSET
+            append(perfume)
+        return perfumes
@@ -3,11 +3,13 @@ Routes API REST pour l'application.
 Permet l'accès programmatique aux données.
 """
 from flask import Blueprint, jsonify, request, current_app
-from webapp.services import PerfumeService, StatsService
+from webapp.services import ChangesService, CountService, PerfumeService, StatsService
+from webapp.utils.catalog import get_catalog
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+
 @api_bp.route('/perfumes')
 def api_perfumes():
     """
@@ -34,18 +36,49 @@ def api_perfumes():
         page=page,
         per_page=per_page,
         brand=brand,
-        search=search
+        search=search,
+        view='detail'
     )
     
     return jsonify({
         'success': True,
         'data': [p.to_dict() for p in results['perfumes']],
-        'pagination': {
-            'page': results['page'],
-            'per_page': results['per_page'],
-            'total': results['total'],
-            'pages': results['pages']
-        }
+        'pagination': CountService.pagination(results)
+    })
+
+
+@api_bp.route('/perfumes/batch', methods=['POST'])
+def api_perfumes_batch():
+    """
+    API: Plusieurs parfums en une requête.
+    
+    Body JSON (au plus BATCH_MAX_ITEMS clés au total):
+        - ids (list): IDs MongoDB
+        - urls (list): URLs Fragrantica
+        - perfume_ids (list): IDs Fragrantica (fin de l'URL)
+    
+    Returns:
+        JSON avec les parfums trouvés (dans l'ordre des clés : ids, urls,
+        perfume_ids) et les clés introuvables par type
+    """
+    try:
+        keys = PerfumeService.batch_keys(
+            request.get_json(silent=True),
+            current_app.config.get('BATCH_MAX_ITEMS', 100)
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    perfumes, missing = PerfumeService.get_many(keys, view='detail')
+    
+    return jsonify({
+        'success': True,
+        'data': [p.to_dict() for p in perfumes],
+        'count': len(perfumes),
+        'missing': missing
     })
 
 
@@ -71,6 +104,40 @@ def api_perfume_detail(perfume_id):
     })
 
 
+@api_bp.route('/changes')
+def api_changes():
+    """
+    API: Parfums modifiés depuis une synchronisation précédente.
+    
+    Query params:
+        - since (str): Jeton `next_token` de l'appel précédent (absent: tout)
+        - limit (int): Nombre max de parfums (défaut et maximum: CHANGES_PAGE_SIZE)
+    
+    Returns:
+        JSON avec les parfums modifiés (ordre des modifications), next_token
+        et has_more (rappeler avec next_token tant qu'il est vrai)
+    """
+    page_size = current_app.config.get('CHANGES_PAGE_SIZE', 500)
+    limit = min(request.args.get('limit', page_size, type=int), page_size)
+    
+    try:
+        results = ChangesService.get_changes(request.args.get('since'), limit=max(limit, 1))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': [ChangesService.to_dict(p) for p in results['perfumes']],
+        'count': len(results['perfumes']),
+        'next_token': results['next_token'],
+        'has_more': results['has_more'],
+        'mode': results['mode']
+    })
+
+
 @api_bp.route('/search')
 def api_search():
     """
@@ -95,7 +162,7 @@ def api_search():
     # Limiter le nombre de résultats
     limit = min(limit, 100)
     
-    results = PerfumeService.search(query, limit=limit)
+    results = PerfumeService.search(query, limit=limit, view='detail')
     
     return jsonify({
         'success': True,
@@ -135,19 +202,15 @@ def api_brand_perfumes(brand_name):
     results = PerfumeService.get_by_brand(
         brand_name=brand_name,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        view='detail'
     )
     
     return jsonify({
         'success': True,
         'brand': brand_name,
         'data': [p.to_dict() for p in results['perfumes']],
-        'pagination': {
-            'page': results['page'],
-            'per_page': results['per_page'],
-            'total': results['total'],
-            'pages': results['pages']
-        }
+        'pagination': CountService.pagination(results)
     })
 
 
@@ -197,7 +260,7 @@ def api_random():
     limit = request.args.get('limit', 6, type=int)
     limit = min(limit, 50)
     
-    perfumes = PerfumeService.get_random(limit=limit)
+    perfumes = PerfumeService.get_random(limit=limit, view='detail')
     
     return jsonify({
         'success': True,
@@ -206,6 +269,32 @@ def api_random():
     })
 
 
+@api_bp.route('/autocomplete')
+def api_autocomplete():
+    """
+    API: Suggestions de marques et de parfums pour la barre de recherche.
+    
+    Query params:
+        - q (str): Début du nom de marque ou de parfum
+        - limit (int): Nombre de suggestions par type (max 20)
+    
+    Returns:
+        JSON avec les marques et parfums dont le nom commence par q
+    """
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 8, type=int), 20)
+    
+    # Recherche par préfixe dans le catalogue en mémoire (aucune requête MongoDB)
+    catalog = get_catalog()
+    
+    return jsonify({
+        'success': True,
+        'query': query,
+        'brands': catalog.complete_brands(query, limit=limit),
+        'perfumes': catalog.complete_names(query, limit=limit)
+    })
+
+
 # Error handlers pour l'API
 @api_bp.errorhandler(404)
 def api_not_found(error):
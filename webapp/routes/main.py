@@ -2,7 +2,7 @@
 Routes principales de l'application.
 """
 from flask import Blueprint, render_template, request, current_app
-from webapp.services import PerfumeService, StatsService
+from webapp.services import HomepageService, PerfumeService, StatsService
 
 main_bp = Blueprint('main', __name__)
 
@@ -13,18 +13,15 @@ def index():
     Page d'accueil.
     Affiche des parfums mis en avant et les statistiques.
     """
-    # Récupérer des parfums aléatoires pour la page d'accueil
-    featured_perfumes = PerfumeService.get_random(limit=6)
-    latest_perfumes = PerfumeService.get_latest(limit=12)
-    
-    # Statistiques globales
-    stats = StatsService.get_overview()
+    # Bundle reconstruit en arrière-plan (services/homepage_service.py) :
+    # aucune requête MongoDB sur le chemin de la requête
+    bundle = HomepageService.get_bundle()
     
     return render_template(
         'index.html',
-        featured_perfumes=featured_perfumes,
-        latest_perfumes=latest_perfumes,
-        stats=stats
+        featured_perfumes=HomepageService.pick_featured(bundle, limit=6),
+        latest_perfumes=bundle['latest'],
+        stats=bundle['stats']
     )
 
 
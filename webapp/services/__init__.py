@@ -1,7 +1,10 @@
 """
 Services pour la logique métier de l'application.
 """
+from .changes_service import ChangesService
+from .count_service import CountService
 from .perfume_service import PerfumeService
 from .stats_service import StatsService
+from .homepage_service import HomepageService
 
-__all__ = ['PerfumeService', 'StatsService']
+__all__ = ['ChangesService', 'CountService', 'PerfumeService', 'StatsService', 'HomepageService']
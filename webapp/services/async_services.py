@@ -0,0 +1,236 @@
+"""
+Versions asynchrones des services, pour le mode ASGI (webapp/asgi.py).
+Mêmes filtres et même mise en forme que PerfumeService / StatsService,
+exécutés avec le client asynchrone de PyMongo (AsyncMongoClient).
+"""
+import asyncio
+import logging
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import PyMongoError
+
+from webapp.models.perfume import Perfume
+from webapp.services.changes_service import (
+    CAPTURE_OPTIONS, STREAM_PIPELINE, ChangesService, StreamBatch
+)
+from webapp.services.count_service import CountService
+from webapp.services.perfume_service import PerfumeService
+from webapp.services.stats_service import StatsService
+from webapp.utils.catalog import Catalog
+from webapp.utils.counts import ESTIMATED, CountCache
+from webapp.utils.data_version import membership
+from webapp.utils.indexes import BRAND_NAME_INDEX
+from webapp.utils.sampling import IdReservoir, ordered
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPerfumeService:
+    """Requêtes de parfums sur une base AsyncMongoClient."""
+
+    def __init__(self, db, config, data_version):
+        self.db = db
+        self.config = config
+        self.collection = db[config['COLLECTION_DATA']]
+        self.data_version = data_version
+        self.reservoir = IdReservoir()
+        self.change_streams = None  # détecté au premier appel de get_changes
+        self.counts = CountCache(
+            cap=config.get('COUNT_CAP', 1000),
+            max_entries=config.get('COUNT_CACHE_SIZE', 1024)
+        )
+
+    async def count(self, query):
+        """Voir CountService.count (cache propre au worker)."""
+        version = membership(await self.data_version.current_async(self.db, self.config))
+        cached = self.counts.get(version, query)
+        if cached is not None:
+            return cached
+
+        if not query:
+            total = await self.collection.estimated_document_count()
+            return self.counts.store(version, query, total, ESTIMATED)
+
+        limit = self.counts.limit_for(query)
+        if limit:
+            total = await self.collection.count_documents(query, limit=limit)
+        else:
+            total = await self.collection.count_documents(query)
+        return self.counts.store(version, query, total)
+
+    async def _paginated(self, query, page, per_page, view, sort=None):
+        count = await self.count(query)
+        skip, _ = PerfumeService.paginate(count[0], page, per_page)
+
+        cursor = self.collection.find(query, Perfume.PROJECTIONS[view])
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.skip(skip).limit(per_page)
+        perfumes = Perfume.list_from_db(await cursor.to_list(length=per_page))
+
+        return CountService.page(perfumes, count, page, per_page)
+
+    async def get_all(self, page=1, per_page=24, brand=None, search=None, view='card'):
+        """Voir PerfumeService.get_all."""
+        return await self._paginated(
+            PerfumeService.list_query(brand, search), page, per_page, view,
+            sort=PerfumeService.LIST_SORT
+        )
+
+    async def get_by_brand(self, brand_name, page=1, per_page=24, view='card'):
+        """Voir PerfumeService.get_by_brand."""
+        return await self.get_all(page=page, per_page=per_page, brand=brand_name, view=view)
+
+    async def get_by_accord(self, accord_name, page=1, per_page=24, view='card'):
+        """Voir PerfumeService.get_by_accord."""
+        return await self._paginated(
+            PerfumeService.accord_query(accord_name), page, per_page, view,
+            sort=PerfumeService.LIST_SORT
+        )
+
+    async def get_by_id(self, perfume_id):
+        """Voir PerfumeService.get_by_id (None si l'ID est invalide)."""
+        try:
+            data = await self.collection.find_one(
+                {'_id': ObjectId(perfume_id)}, Perfume.PROJECTIONS['detail']
+            )
+        except (InvalidId, TypeError):
+            return None
+        return Perfume.from_db(data)
+
+    async def get_many(self, keys, view='detail'):
+        """Voir PerfumeService.get_many."""
+        query = PerfumeService.batch_query(keys)
+        docs = []
+        if query is not None:
+            cursor = self.collection.find(query, PerfumeService.batch_projection(view))
+            docs = await cursor.to_list(length=None)
+        found, missing = PerfumeService.batch_resolve(docs, keys)
+        return Perfume.list_from_db(found), missing
+
+    async def _use_streams(self):
+        if not ChangesService.streams_enabled(self.config):
+            return False
+        if self.change_streams is None:
+            try:
+                hello = await self.db.client.admin.command('hello')
+            except PyMongoError:
+                hello = {}
+            self.change_streams = ChangesService.streams_supported(hello)
+        return self.change_streams
+
+    async def _read_stream(self, resume_token, limit):
+        batch = StreamBatch(limit)
+        stream = await self.collection.watch(
+            STREAM_PIPELINE, **ChangesService.stream_options(resume_token)
+        )
+        async with stream:
+            while not batch.full:
+                change = await stream.try_next()
+                if change is None:
+                    break
+                batch.add(change)
+            return batch.result(stream.resume_token)
+
+    async def _capture_resume_token(self):
+        stream = await self.collection.watch(STREAM_PIPELINE, **CAPTURE_OPTIONS)
+        async with stream:
+            await stream.try_next()
+            return stream.resume_token
+
+    async def get_changes(self, token=None, limit=500):
+        """Voir ChangesService.get_changes."""
+        position = ChangesService.decode_token(token)
+
+        streams = await self._use_streams()
+        if streams and position.get('r'):
+            try:
+                docs, resume_token, has_more = await self._read_stream(position['r'], limit)
+                return ChangesService.stream_page(position, docs, resume_token, has_more)
+            except PyMongoError as e:
+                logger.warning(f"⚠️  Change stream resume failed, using updated_at index: {e}")
+
+        resume_token = None
+        if streams:
+            try:
+                resume_token = await self._capture_resume_token()
+            except PyMongoError as e:
+                logger.warning(f"⚠️  Change stream unavailable: {e}")
+
+        cursor = ChangesService.index_cursor(
+            self.collection, position, resume_token, self.config, limit
+        )
+        docs = await cursor.to_list(length=limit + 1)
+        return ChangesService.index_page(position, docs, limit, resume_token)
+
+    async def search(self, query, limit=20, view='card'):
+        """Voir PerfumeService.search."""
+        cursor = self.collection.find(
+            PerfumeService.search_query(query), Perfume.PROJECTIONS[view]
+        ).limit(limit)
+        return Perfume.list_from_db(await cursor.to_list(length=limit))
+
+    async def get_random(self, limit=6, view='card'):
+        """Voir PerfumeService.get_random (réservoir d'IDs propre au worker)."""
+        version = membership(await self.data_version.current_async(self.db, self.config))
+        if version != self.reservoir.version:
+            cursor = self.collection.find({}, {'_id': 1}).hint([('_id', 1)])
+            self.reservoir.replace([doc['_id'] async for doc in cursor], version)
+
+        ids = self.reservoir.sample(limit)
+        cursor = self.collection.find({'_id': {'$in': ids}}, Perfume.PROJECTIONS[view])
+        return Perfume.list_from_db(ordered(await cursor.to_list(length=limit), ids))
+
+
+class AsyncStatsService:
+    """Statistiques sur une base AsyncMongoClient."""
+
+    def __init__(self, db, config, data_version):
+        self.db = db
+        self.config = config
+        self.urls_collection = db[config['COLLECTION_URLS']]
+        self.data_collection = db[config['COLLECTION_DATA']]
+        self.data_version = data_version
+        self.catalog = Catalog()
+
+    async def get_overview(self):
+        """Voir StatsService.get_overview (les deux comptages en parallèle)."""
+        urls_count, data_count = await asyncio.gather(
+            self.urls_collection.estimated_document_count(),
+            self.data_collection.estimated_document_count()
+        )
+        return StatsService.summarize_overview(urls_count, data_count)
+
+    async def get_catalog(self):
+        """Catalogue en mémoire du worker, mis à jour si les données ont changé."""
+        version = await self.data_version.current_async(self.db, self.config)
+        query = self.catalog.pending_query(version)
+        if query is not None:
+            cursor = self.data_collection.find(query, Catalog.PROJECTION)
+            if not query:
+                cursor = cursor.hint(BRAND_NAME_INDEX)
+            self.catalog.apply(version, await cursor.to_list(length=None), query)
+        return self.catalog
+
+    async def get_brands_stats(self):
+        """Voir StatsService.get_brands_stats."""
+        catalog = await self.get_catalog()
+        return StatsService.summarize_brands(catalog.brands_by_count())
+
+    async def get_accords_stats(self):
+        """Voir StatsService.get_accords_stats."""
+        cursor = self.data_collection.find({}, {'accords': 1})
+        return StatsService.summarize_accords(await cursor.to_list(length=None))
+
+    async def get_dashboard_data(self):
+        """Voir StatsService.get_dashboard_data (trois requêtes en parallèle)."""
+        overview, brands, accords = await asyncio.gather(
+            self.get_overview(), self.get_brands_stats(), self.get_accords_stats()
+        )
+        return {
+            'overview': overview,
+            'brands': brands,
+            'accords': accords,
+            'partial': []
+        }
@@ -0,0 +1,324 @@
+"""
+Service de synchronisation incrémentale (/api/changes).
+
+Les pipelines du scraper horodatent chaque écriture (`updated_at`). Un
+client qui réplique les données demande les documents modifiés depuis son
+dernier jeton, page par page, au lieu de tout réexporter :
+
+    GET /api/changes              -> premiers documents + next_token
+    GET /api/changes?since=<jeton> -> suite, jusqu'à has_more == false
+
+Le jeton est opaque pour le client (JSON en base64url) et contient la
+position (updated_at, _id) du dernier document renvoyé : la page suivante
+est une lecture de l'index updated_at/_id (utils/indexes.py) à partir de
+cette position. Les documents écrits pendant les CHANGES_SETTLE_SECONDS
+dernières secondes sont laissés à la page suivante, le temps que les
+écritures concurrentes soient visibles.
+
+Sur un replica set, le jeton porte aussi un jeton de reprise de change
+stream, capturé à la fin du rattrapage : les appels suivants lisent le flux
+des modifications au lieu de l'index. Si la reprise échoue (oplog dépassé,
+serveur standalone), la lecture repart de la position (updated_at, _id).
+
+Les suppressions ne sont pas suivies : le scraper n'en fait pas.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from flask import current_app
+from pymongo.errors import PyMongoError
+
+from webapp.models.perfume import Perfume
+from webapp.utils.db import get_db
+from webapp.utils.indexes import CHANGES_INDEX
+
+# Modifications suivies dans le change stream
+STREAM_PIPELINE = [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace']}}}]
+# Attente maximale d'un événement du change stream (ms)
+STREAM_AWAIT_MS = 200
+# Arguments de `watch` pour capturer un jeton de reprise sans attendre
+CAPTURE_OPTIONS = {'max_await_time_ms': 1}
+
+
+class StreamBatch:
+    """
+    Événements lus dans un change stream, pour les services synchrone et
+    asynchrone : seule la dernière version de chaque document est gardée,
+    à la position de sa dernière modification.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.events = 0
+        self.docs = {}
+
+    @property
+    def full(self):
+        """`limit` événements lus : la lecture s'arrête là."""
+        return self.events >= self.limit
+
+    def add(self, change):
+        """Ajoute un événement du change stream."""
+        self.events += 1
+        doc = change.get('fullDocument')
+        if doc is not None:
+            self.docs.pop(doc['_id'], None)
+            self.docs[doc['_id']] = doc
+
+    def result(self, resume_token):
+        """
+        Returns:
+            tuple: (documents, jeton de reprise, True si `limit` événements lus)
+        """
+        return list(self.docs.values()), resume_token, self.full
+
+
+class ChangesService:
+    """Service pour lire les documents modifiés depuis un jeton."""
+
+    # Jetons
+
+    @staticmethod
+    def encode_token(position):
+        """
+        Sérialise une position en jeton opaque.
+
+        Args:
+            position (dict): {'t': datetime, 'i': ObjectId, 'r': jeton de reprise}
+        """
+        updated_at = position.get('t')
+        payload = {
+            't': int(updated_at.replace(tzinfo=timezone.utc).timestamp() * 1000) if updated_at else None,
+            'i': str(position['i']) if position.get('i') else None,
+            'r': position.get('r'),
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_token(token):
+        """
+        Position encodée dans un jeton (position initiale si vide).
+
+        Raises:
+            ValueError: Jeton invalide
+        """
+        if not token:
+            return {'t': None, 'i': None, 'r': None}
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            payload = json.loads(raw)
+            millis = payload.get('t')
+            return {
+                't': datetime(1970, 1, 1) + timedelta(milliseconds=millis) if millis is not None else None,
+                'i': ObjectId(payload['i']) if payload.get('i') else None,
+                'r': payload.get('r'),
+            }
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            raise ValueError('Invalid "since" token') from e
+
+    # Lecture par l'index updated_at/_id
+
+    @staticmethod
+    def changes_query(position, until=None):
+        """
+        Filtre des documents postérieurs à `position` dans l'ordre (updated_at, _id).
+
+        Args:
+            position (dict): Position décodée (voir decode_token)
+            until (datetime): Borne haute de updated_at (optionnelle)
+        """
+        updated_at, last_id = position.get('t'), position.get('i')
+        if updated_at is None:
+            # Première synchronisation : tous les documents horodatés
+            query = {'updated_at': {'$ne': None}}
+        else:
+            after = [{'updated_at': {'$gt': updated_at}}]
+            if last_id is not None:
+                after.append({'updated_at': updated_at, '_id': {'$gt': last_id}})
+            query = {'$or': after} if len(after) > 1 else after[0]
+        if until is not None:
+            query = {'$and': [query, {'updated_at': {'$lte': until}}]}
+        return query
+
+    @staticmethod
+    def index_query(position, resume_token, config):
+        """
+        Filtre de la lecture par index.
+
+        Sans jeton de reprise, les CHANGES_SETTLE_SECONDS dernières secondes
+        sont exclues. Avec un jeton capturé avant la lecture, tout est lu :
+        les écritures suivantes seront vues par le change stream.
+        """
+        until = None
+        if resume_token is None:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            until = now - timedelta(seconds=config.get('CHANGES_SETTLE_SECONDS', 5))
+        return ChangesService.changes_query(position, until)
+
+    @staticmethod
+    def index_page(position, docs, limit, resume_token=None):
+        """Page d'une lecture par index (`docs` : au plus limit + 1 documents triés)."""
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        # Le jeton de reprise n'est transmis qu'une fois le rattrapage terminé
+        position = ChangesService.advance(position, docs, None if has_more else resume_token)
+        return ChangesService.page(docs, position, has_more, 'index')
+
+    @staticmethod
+    def advance(position, docs, resume_token=None):
+        """Position après `docs` (la plus récente), avec le jeton de reprise éventuel."""
+        position = dict(position, r=resume_token)
+        stamped = [(doc['updated_at'], doc['_id']) for doc in docs if doc.get('updated_at') is not None]
+        if stamped:
+            position['t'], position['i'] = max(stamped)
+        return position
+
+    @staticmethod
+    def page(docs, position, has_more, mode):
+        """
+        Réponse d'une page de modifications.
+
+        Returns:
+            dict: {
+                'perfumes': list[Perfume],
+                'next_token': str,
+                'has_more': bool,
+                'mode': 'index' ou 'stream'
+            }
+        """
+        return {
+            'perfumes': Perfume.list_from_db(docs),
+            'next_token': ChangesService.encode_token(position),
+            'has_more': has_more,
+            'mode': mode
+        }
+
+    # Change streams
+
+    @staticmethod
+    def streams_supported(hello):
+        """Change streams disponibles d'après la réponse à `hello` (replica set ou mongos)."""
+        return bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
+
+    @staticmethod
+    def streams_enabled(config):
+        """Lecture par change stream autorisée par la configuration (CHANGES_CHANGE_STREAMS)."""
+        return config.get('CHANGES_CHANGE_STREAMS', True)
+
+    @staticmethod
+    def stream_options(resume_token):
+        """Arguments de `watch` pour lire les modifications depuis `resume_token`."""
+        return {
+            'full_document': 'updateLookup',
+            'resume_after': resume_token,
+            'max_await_time_ms': STREAM_AWAIT_MS
+        }
+
+    @staticmethod
+    def stream_page(position, docs, resume_token, has_more):
+        """Page d'une lecture par change stream (voir StreamBatch.result)."""
+        position = ChangesService.advance(position, docs, resume_token)
+        return ChangesService.page(docs, position, has_more, 'stream')
+
+    @staticmethod
+    def index_cursor(collection, position, resume_token, config, limit):
+        """
+        Curseur de la lecture par index (au plus limit + 1 documents, voir index_page).
+
+        `find` n'étant pas une coroutine, le même curseur sert aux collections
+        synchrones et asynchrones (AsyncMongoClient).
+        """
+        query = ChangesService.index_query(position, resume_token, config)
+        return (
+            collection.find(query, Perfume.PROJECTIONS['changes'])
+            .sort(CHANGES_INDEX)
+            .hint(CHANGES_INDEX)
+            .limit(limit + 1)
+        )
+
+    @staticmethod
+    def _use_streams(db):
+        if not ChangesService.streams_enabled(current_app.config):
+            return False
+        if 'change_streams' not in current_app.extensions:
+            try:
+                hello = db.client.admin.command('hello')
+            except PyMongoError:
+                hello = {}
+            current_app.extensions['change_streams'] = ChangesService.streams_supported(hello)
+        return current_app.extensions['change_streams']
+
+    @staticmethod
+    def _read_stream(collection, resume_token, limit):
+        """Documents modifiés depuis `resume_token` (voir StreamBatch.result)."""
+        batch = StreamBatch(limit)
+        with collection.watch(STREAM_PIPELINE, **ChangesService.stream_options(resume_token)) as stream:
+            while not batch.full:
+                change = stream.try_next()
+                if change is None:
+                    break
+                batch.add(change)
+            return batch.result(stream.resume_token)
+
+    @staticmethod
+    def _capture_resume_token(collection):
+        """Jeton de reprise du change stream à l'instant présent."""
+        with collection.watch(STREAM_PIPELINE, **CAPTURE_OPTIONS) as stream:
+            stream.try_next()
+            return stream.resume_token
+
+    # Lecture
+
+    @staticmethod
+    def get_changes(token=None, limit=500):
+        """
+        Documents modifiés depuis `token`, dans l'ordre des modifications.
+
+        Args:
+            token (str): Jeton `next_token` d'un appel précédent (None: tout)
+            limit (int): Nombre maximal de documents
+
+        Returns:
+            dict: Voir ChangesService.page
+
+        Raises:
+            ValueError: Jeton invalide
+        """
+        position = ChangesService.decode_token(token)
+        db = get_db()
+        collection = db[current_app.config['COLLECTION_DATA']]
+
+        streams = ChangesService._use_streams(db)
+        if streams and position.get('r'):
+            try:
+                docs, resume_token, has_more = ChangesService._read_stream(
+                    collection, position['r'], limit
+                )
+                return ChangesService.stream_page(position, docs, resume_token, has_more)
+            except PyMongoError as e:
+                current_app.logger.warning(f"⚠️  Change stream resume failed, using updated_at index: {e}")
+
+        # Jeton de reprise capturé avant la lecture par index
+        resume_token = None
+        if streams:
+            try:
+                resume_token = ChangesService._capture_resume_token(collection)
+            except PyMongoError as e:
+                current_app.logger.warning(f"⚠️  Change stream unavailable: {e}")
+
+        cursor = ChangesService.index_cursor(
+            collection, position, resume_token, current_app.config, limit
+        )
+        return ChangesService.index_page(position, list(cursor), limit, resume_token)
+
+    @staticmethod
+    def to_dict(perfume):
+        """Représentation API d'un document modifié."""
+        updated_at = perfume.updated_at
+        return {
+            **perfume.to_dict(),
+            'updated_at': updated_at.isoformat() if updated_at else None
+        }
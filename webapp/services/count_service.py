@@ -0,0 +1,97 @@
+"""
+Service de comptage des résultats paginés.
+Voir utils/counts.py pour le cache et la qualification des totaux.
+"""
+from flask import current_app
+from webapp.utils.db import get_db
+from webapp.utils.counts import CAPPED, ESTIMATED, EXACT, get_count_cache
+from webapp.utils.data_version import get_data_version, membership
+
+
+class CountService:
+    """Service pour compter les documents d'un filtre."""
+
+    @staticmethod
+    def count(query, collection_name=None):
+        """
+        Nombre de documents correspondant au filtre.
+
+        Sans filtre : métadonnées de la collection. Filtre regex : comptage
+        plafonné (COUNT_CAP). Résultat en cache jusqu'au prochain ajout ou
+        suppression de documents (membership de la version des données).
+
+        Args:
+            query (dict): Filtre MongoDB
+            collection_name (str): Collection (défaut: COLLECTION_DATA)
+
+        Returns:
+            tuple: (total, relation) avec relation 'eq', 'approx' ou 'gte'
+        """
+        cache = get_count_cache()
+        version = membership(get_data_version())
+        cached = cache.get(version, query)
+        if cached is not None:
+            return cached
+
+        db = get_db()
+        collection = db[collection_name or current_app.config['COLLECTION_DATA']]
+
+        if not query:
+            return cache.store(version, query, collection.estimated_document_count(), ESTIMATED)
+
+        limit = cache.limit_for(query)
+        if limit:
+            count = collection.count_documents(query, limit=limit)
+        else:
+            count = collection.count_documents(query)
+        return cache.store(version, query, count)
+
+    @staticmethod
+    def page(perfumes, count, page, per_page):
+        """
+        Résultats paginés à partir d'un comptage (voir count).
+
+        Un total plafonné ne borne pas la navigation : la page suivante
+        existe tant que la page courante est pleine.
+
+        Returns:
+            dict: {
+                'perfumes': list[Perfume],
+                'total': int,
+                'total_relation': str,
+                'page': int,
+                'pages': int,
+                'per_page': int,
+                'has_next': bool
+            }
+        """
+        total, relation = count
+        pages = (total + per_page - 1) // per_page  # Arrondi supérieur
+        has_next = page < pages or (relation == CAPPED and len(perfumes) == per_page)
+        return {
+            'perfumes': perfumes,
+            'total': total,
+            'total_relation': relation,
+            'page': page,
+            'pages': pages,
+            'per_page': per_page,
+            'has_next': has_next
+        }
+
+    @staticmethod
+    def pagination(results):
+        """
+        Métadonnées de pagination des réponses API.
+
+        `total_exact` est faux pour un total estimé ('approx') ou plafonné
+        ('gte' : au moins `total` résultats).
+        """
+        return {
+            'page': results['page'],
+            'per_page': results['per_page'],
+            'total': results['total'],
+            'total_exact': results['total_relation'] == EXACT,
+            'total_relation': results['total_relation'],
+            'pages': results['pages'],
+            'has_next': results['has_next']
+        }
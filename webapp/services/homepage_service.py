@@ -0,0 +1,145 @@
+"""
+Données de la page d'accueil, reconstruites en arrière-plan.
+
+La page d'accueil affiche des parfums mis en avant, les derniers ajouts et
+les compteurs généraux : des données qui ne changent qu'avec le scraper.
+Un thread par worker reconstruit ce « bundle » toutes les
+HOMEPAGE_REFRESH_SECONDS secondes, ou plus tôt si la version des données
+change (utils/data_version.py). La requête sur / ne fait que piocher les
+parfums mis en avant dans la réserve et rendre le template.
+"""
+import os
+import random
+import threading
+import time
+
+from flask import current_app
+
+from webapp.services.perfume_service import PerfumeService
+from webapp.services.stats_service import EMPTY_OVERVIEW, StatsService
+from webapp.utils.data_version import get_data_version
+from webapp.utils.executor import get_executor
+
+
+class HomepageService:
+    """Service pour les données de la page d'accueil."""
+
+    @staticmethod
+    def build_bundle(featured_pool=36, latest=12):
+        """
+        Construit le bundle de la page d'accueil (requêtes en parallèle).
+
+        Args:
+            featured_pool (int): Taille de la réserve de parfums mis en avant
+            latest (int): Nombre de derniers ajouts
+
+        Returns:
+            dict: {'featured', 'latest', 'stats', 'version', 'built_at', 'partial'}
+        """
+        version = get_data_version()
+        results, missing = get_executor().run(
+            {
+                'featured': lambda: PerfumeService.get_random(limit=featured_pool),
+                'latest': lambda: PerfumeService.get_latest(limit=latest),
+                'stats': StatsService.get_overview,
+            },
+            defaults={'featured': [], 'latest': [], 'stats': EMPTY_OVERVIEW}
+        )
+        results.update(version=version, built_at=time.monotonic(), partial=missing)
+        return results
+
+    @staticmethod
+    def get_bundle():
+        """Retourne le bundle courant du worker."""
+        return current_app.extensions['homepage'].get()
+
+    @staticmethod
+    def pick_featured(bundle, limit=6):
+        """Tire les parfums mis en avant d'une requête dans la réserve du bundle."""
+        pool = bundle['featured']
+        return random.sample(pool, min(limit, len(pool)))
+
+
+class HomepageRefresher:
+    """Thread de reconstruction du bundle, démarré dans chaque worker."""
+
+    def __init__(self, app, interval=60, featured_pool=36):
+        self.app = app
+        self.interval = interval
+        self.featured_pool = featured_pool
+        self.bundle = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def get(self):
+        """Bundle courant ; construit sur place s'il n'existe pas encore."""
+        if self.interval <= 0:
+            return self._build()
+
+        self._ensure_thread()
+        bundle = self.bundle
+        if bundle is None:
+            with self._lock:
+                if self.bundle is None:
+                    self.refresh()
+                bundle = self.bundle
+        return bundle
+
+    def refresh(self):
+        """Reconstruit le bundle. Une requête en échec garde la valeur précédente."""
+        bundle = self._build()
+        previous = self.bundle
+        if previous is not None:
+            for name in bundle['partial']:
+                bundle[name] = previous[name]
+        self.bundle = bundle
+        return bundle
+
+    def is_due(self):
+        """True si le bundle a expiré ou si les données ont changé."""
+        bundle = self.bundle
+        if bundle is None:
+            return True
+        if time.monotonic() - bundle['built_at'] >= self.interval:
+            return True
+        return get_data_version() != bundle['version']
+
+    def _build(self):
+        return HomepageService.build_bundle(featured_pool=self.featured_pool)
+
+    def _ensure_thread(self):
+        # Un thread par processus : après un fork (gunicorn --preload),
+        # le thread du parent n'existe plus dans le worker
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='homepage-refresher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        # La version des données est revérifiée à son propre rythme
+        # (DATA_VERSION_TTL) : inutile de se réveiller plus souvent
+        tick = min(self.interval, self.app.config.get('DATA_VERSION_TTL', 5))
+        while True:
+            time.sleep(tick)
+            with self.app.app_context():
+                try:
+                    if self.is_due():
+                        self.refresh()
+                except Exception as e:
+                    self.app.logger.error(f"✗ Homepage refresh failed: {e}")
+
+
+def init_homepage(app):
+    """Crée le rafraîchisseur de la page d'accueil de l'application."""
+    app.extensions['homepage'] = HomepageRefresher(
+        app,
+        interval=app.config.get('HOMEPAGE_REFRESH_SECONDS', 60),
+        featured_pool=app.config.get('HOMEPAGE_FEATURED_POOL', 36)
+    )
@@ -4,14 +4,56 @@ Contient toute la logique métier pour les requêtes de parfums.
 """
 from flask import current_app
 from webapp.utils.db import get_db
+from webapp.utils.formatters import extract_perfume_id
+from webapp.utils.data_version import get_data_version, membership
+from webapp.utils.sampling import get_reservoir, ordered
 from webapp.models.perfume import Perfume
+from webapp.services.count_service import CountService
 
 
 class PerfumeService:
     """Service pour gérer les opérations liées aux parfums."""
     
+    # Tri des listes paginées : par nom, _id pour un ordre stable entre les
+    # pages (index name/_id et brand/name/_id, voir utils/indexes.py)
+    LIST_SORT = [('name', 1), ('_id', 1)]
+    
+    # Filtres MongoDB (partagés avec le service asynchrone de webapp/asgi.py)
+    
     @staticmethod
-    def get_all(page=1, per_page=24, brand=None, search=None):
+    def list_query(brand=None, search=None):
+        """Filtre de la liste paginée (marque exacte, nom contenant `search`)."""
+        query = {}
+        if brand:
+            query['brand'] = brand
+        if search:
+            query['name'] = {'$regex': search, '$options': 'i'}
+        return query
+    
+    @staticmethod
+    def search_query(query):
+        """Filtre de recherche dans le nom ou la marque (case-insensitive)."""
+        return {
+            '$or': [
+                {'name': {'$regex': query, '$options': 'i'}},
+                {'brand': {'$regex': query, '$options': 'i'}}
+            ]
+        }
+    
+    @staticmethod
+    def accord_query(accord_name):
+        """Filtre des parfums qui ont un accord donné."""
+        return {f'accords.{accord_name}': {'$exists': True}}
+    
+    @staticmethod
+    def paginate(total, page, per_page):
+        """Retourne (skip, nombre de pages)."""
+        skip = (page - 1) * per_page
+        pages = (total + per_page - 1) // per_page  # Arrondi supérieur
+        return skip, pages
+    
+    @staticmethod
+    def get_all(page=1, per_page=24, brand=None, search=None, view='card'):
         """
         Récupère tous les parfums avec pagination et filtres optionnels.
         
@@ -20,44 +62,31 @@ class PerfumeService:
             per_page (int): Nombre d'éléments par page
             brand (str): Filtre par marque (optionnel)
             search (str): Recherche dans le nom (optionnel)
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'card')
         
         Returns:
-            dict: {
-                'perfumes': list[Perfume],
-                'total': int,
-                'page': int,
-                'pages': int,
-                'per_page': int
-            }
+            dict: Résultats paginés (voir CountService.page)
         """
         db = get_db()
         collection = db[current_app.config['COLLECTION_DATA']]
         
         # Construire le filtre
-        query = {}
-        if brand:
-            query['brand'] = brand
-        if search:
-            query['name'] = {'$regex': search, '$options': 'i'}
-        
-        # Compter le total
-        total = collection.count_documents(query)
+        query = PerfumeService.list_query(brand, search)
         
-        # Calculer la pagination
-        skip = (page - 1) * per_page
-        pages = (total + per_page - 1) // per_page  # Arrondi supérieur
+        # Total en cache par filtre ; estimé sans filtre, plafonné pour une regex
+        count = CountService.count(query)
+        skip, _ = PerfumeService.paginate(count[0], page, per_page)
         
         # Récupérer les données
-        cursor = collection.find(query).skip(skip).limit(per_page)
-        perfumes = Perfume.list_from_db(list(cursor))
-        
-        return {
-            'perfumes': perfumes,
-            'total': total,
-            'page': page,
-            'pages': pages,
-            'per_page': per_page
-        }
+        cursor = (
+            collection.find(query, Perfume.PROJECTIONS[view])
+            .sort(PerfumeService.LIST_SORT)
+            .skip(skip)
+            .limit(per_page)
+        )
+        perfumes = Perfume.list_from_db(cursor)
+        
+        return CountService.page(perfumes, count, page, per_page)
     
     @staticmethod
     def get_by_id(perfume_id):
@@ -76,7 +105,9 @@ class PerfumeService:
         collection = db[current_app.config['COLLECTION_DATA']]
         
         try:
-            data = collection.find_one({'_id': ObjectId(perfume_id)})
+            data = collection.find_one(
+                {'_id': ObjectId(perfume_id)}, Perfume.PROJECTIONS['detail']
+            )
             return Perfume.from_db(data)
         except Exception as e:
             current_app.logger.error(f"Error fetching perfume {perfume_id}: {e}")
@@ -96,17 +127,147 @@ class PerfumeService:
         db = get_db()
         collection = db[current_app.config['COLLECTION_DATA']]
         
-        data = collection.find_one({'url': url})
+        data = collection.find_one({'url': url}, Perfume.PROJECTIONS['detail'])
         return Perfume.from_db(data)
     
+    # Lecture groupée (POST /api/perfumes/batch)
+    
+    # Clés acceptées, dans l'ordre de restitution des résultats
+    BATCH_KINDS = ('ids', 'urls', 'perfume_ids')
+    
+    @staticmethod
+    def batch_keys(payload, max_items):
+        """
+        Valide le corps d'une requête groupée.
+        
+        Args:
+            payload (dict): {'ids': [...], 'urls': [...], 'perfume_ids': [...]}
+            max_items (int): Nombre maximal de clés, toutes listes confondues
+        
+        Returns:
+            dict: {type: liste de chaînes} pour chaque type présent ; les
+            perfume_ids numériques sous forme canonique ("032191" -> "32191"),
+            comparée telle quelle par batch_query et batch_resolve
+        
+        Raises:
+            ValueError: Corps invalide, vide ou trop volumineux
+        """
+        if not isinstance(payload, dict):
+            raise ValueError('Request body must be a JSON object')
+        
+        keys = {}
+        for kind in PerfumeService.BATCH_KINDS:
+            values = payload.get(kind)
+            if values is None:
+                continue
+            if not isinstance(values, list) or not all(
+                isinstance(value, (str, int)) and not isinstance(value, bool) for value in values
+            ):
+                raise ValueError(f'"{kind}" must be a list of strings')
+            keys[kind] = [str(value).strip() for value in values]
+        
+        if 'perfume_ids' in keys:
+            keys['perfume_ids'] = [
+                str(int(value)) if value.isdecimal() else value for value in keys['perfume_ids']
+            ]
+        
+        total = sum(len(values) for values in keys.values())
+        if not total:
+            raise ValueError(f'At least one of {", ".join(PerfumeService.BATCH_KINDS)} is required')
+        if total > max_items:
+            raise ValueError(f'At most {max_items} items per request ({total} given)')
+        return keys
+    
     @staticmethod
-    def search(query, limit=20):
+    def batch_query(keys):
+        """
+        Filtre unique couvrant toutes les clés : un `$in` par type de clé,
+        sur _id, url et fragrantica_id (numéro en fin d'URL, « ...-32191.html »).
+        
+        Returns:
+            dict: Filtre MongoDB, ou None si aucune clé n'est valide
+        """
+        from bson import ObjectId
+        
+        object_ids = [ObjectId(value) for value in keys.get('ids', ()) if ObjectId.is_valid(value)]
+        urls = list(keys.get('urls', ()))
+        fragrantica_ids = [int(value) for value in keys.get('perfume_ids', ()) if value.isdecimal()]
+        
+        clauses = []
+        if object_ids:
+            clauses.append({'_id': {'$in': object_ids}})
+        if urls:
+            clauses.append({'url': {'$in': urls}})
+        if fragrantica_ids:
+            clauses.append({'fragrantica_id': {'$in': fragrantica_ids}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+    
+    @staticmethod
+    def batch_projection(view):
+        """Projection `view` avec les champs nécessaires à batch_resolve."""
+        return {**Perfume.PROJECTIONS[view], 'url': 1, 'fragrantica_id': 1}
+    
+    @staticmethod
+    def batch_resolve(docs, keys):
+        """
+        Associe les documents trouvés aux clés demandées.
+        
+        Returns:
+            tuple: (documents dans l'ordre des clés, {type: clés introuvables})
+        """
+        by_key = {'ids': {}, 'urls': {}, 'perfume_ids': {}}
+        for doc in docs:
+            by_key['ids'][str(doc['_id'])] = doc
+            by_key['urls'][doc.get('url')] = doc
+            fragrantica_id = doc.get('fragrantica_id')
+            by_key['perfume_ids'][
+                str(fragrantica_id) if fragrantica_id is not None else extract_perfume_id(doc.get('url'))
+            ] = doc
+        
+        found = []
+        missing = {}
+        for kind, values in keys.items():
+            for value in values:
+                doc = by_key[kind].get(value)
+                if doc is None:
+                    missing.setdefault(kind, []).append(value)
+                else:
+                    found.append(doc)
+        return found, missing
+    
+    @staticmethod
+    def get_many(keys, view='detail'):
+        """
+        Récupère des parfums par _id, URL ou ID Fragrantica en une requête.
+        
+        Args:
+            keys (dict): Clés validées par batch_keys
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'detail')
+        
+        Returns:
+            tuple: (list[Perfume] dans l'ordre des clés, {type: clés introuvables})
+        """
+        query = PerfumeService.batch_query(keys)
+        docs = []
+        if query is not None:
+            db = get_db()
+            collection = db[current_app.config['COLLECTION_DATA']]
+            # URL et numéro servent à rapprocher les documents des clés demandées
+            docs = collection.find(query, PerfumeService.batch_projection(view))
+        found, missing = PerfumeService.batch_resolve(docs, keys)
+        return Perfume.list_from_db(found), missing
+    
+    @staticmethod
+    def search(query, limit=20, view='card'):
         """
         Recherche de parfums par nom ou marque.
         
         Args:
             query (str): Terme de recherche
             limit (int): Nombre max de résultats
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'card')
         
         Returns:
             list[Perfume]: Liste de parfums correspondants
@@ -115,18 +276,13 @@ class PerfumeService:
         collection = db[current_app.config['COLLECTION_DATA']]
         
         # Recherche dans le nom ou la marque (case-insensitive)
-        search_query = {
-            '$or': [
-                {'name': {'$regex': query, '$options': 'i'}},
-                {'brand': {'$regex': query, '$options': 'i'}}
-            ]
-        }
-        
-        cursor = collection.find(search_query).limit(limit)
-        return Perfume.list_from_db(list(cursor))
+        cursor = collection.find(
+            PerfumeService.search_query(query), Perfume.PROJECTIONS[view]
+        ).limit(limit)
+        return Perfume.list_from_db(cursor)
     
     @staticmethod
-    def get_by_brand(brand_name, page=1, per_page=24):
+    def get_by_brand(brand_name, page=1, per_page=24, view='card'):
         """
         Récupère tous les parfums d'une marque.
         
@@ -134,14 +290,15 @@ class PerfumeService:
             brand_name (str): Nom de la marque
             page (int): Numéro de page
             per_page (int): Nombre d'éléments par page
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'card')
         
         Returns:
             dict: Résultats paginés
         """
-        return PerfumeService.get_all(page=page, per_page=per_page, brand=brand_name)
+        return PerfumeService.get_all(page=page, per_page=per_page, brand=brand_name, view=view)
     
     @staticmethod
-    def get_by_accord(accord_name, page=1, per_page=24):
+    def get_by_accord(accord_name, page=1, per_page=24, view='card'):
         """
         Récupère les parfums contenant un accord spécifique.
         
@@ -149,6 +306,7 @@ class PerfumeService:
             accord_name (str): Nom de l'accord
             page (int): Numéro de page
             per_page (int): Nombre d'éléments par page
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'card')
         
         Returns:
             dict: Résultats paginés
@@ -157,30 +315,30 @@ class PerfumeService:
         collection = db[current_app.config['COLLECTION_DATA']]
         
         # Recherche les parfums qui ont cet accord
-        query = {f'accords.{accord_name}': {'$exists': True}}
+        query = PerfumeService.accord_query(accord_name)
         
-        total = collection.count_documents(query)
-        skip = (page - 1) * per_page
-        pages = (total + per_page - 1) // per_page
+        count = CountService.count(query)
+        skip, _ = PerfumeService.paginate(count[0], page, per_page)
         
-        cursor = collection.find(query).skip(skip).limit(per_page)
-        perfumes = Perfume.list_from_db(list(cursor))
+        # Même ordre que les autres listes : pages stables d'un appel à l'autre
+        cursor = (
+            collection.find(query, Perfume.PROJECTIONS[view])
+            .sort(PerfumeService.LIST_SORT)
+            .skip(skip)
+            .limit(per_page)
+        )
+        perfumes = Perfume.list_from_db(cursor)
         
-        return {
-            'perfumes': perfumes,
-            'total': total,
-            'page': page,
-            'pages': pages,
-            'per_page': per_page
-        }
+        return CountService.page(perfumes, count, page, per_page)
     
     @staticmethod
-    def get_random(limit=6):
+    def get_random(limit=6, view='card'):
         """
         Récupère des parfums aléatoires.
         
         Args:
             limit (int): Nombre de parfums à retourner
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'card')
         
         Returns:
             list[Perfume]: Liste de parfums aléatoires
@@ -188,18 +346,29 @@ class PerfumeService:
         db = get_db()
         collection = db[current_app.config['COLLECTION_DATA']]
         
-        pipeline = [{'$sample': {'size': limit}}]
-        cursor = collection.aggregate(pipeline)
+        # Tirage local dans le réservoir d'IDs (rechargé si des documents ont
+        # été ajoutés ou supprimés, par un parcours couvert de l'index _id),
+        # puis une seule requête $in sur ce même index
+        reservoir = get_reservoir()
+        load_ids = lambda: [
+            doc['_id'] for doc in collection.find({}, {'_id': 1}).hint([('_id', 1)])
+        ]
+        if reservoir.refresh(membership(get_data_version()), load_ids):
+            current_app.logger.info(f"🎲 ID reservoir reloaded: {len(reservoir.ids)} ids")
+        
+        ids = reservoir.sample(limit)
+        cursor = collection.find({'_id': {'$in': ids}}, Perfume.PROJECTIONS[view])
         
-        return Perfume.list_from_db(list(cursor))
+        return Perfume.list_from_db(ordered(cursor, ids))
     
     @staticmethod
-    def get_latest(limit=12):
+    def get_latest(limit=12, view='card'):
         """
         Récupère les derniers parfums ajoutés.
         
         Args:
             limit (int): Nombre de parfums
+            view (str): Projection de Perfume.PROJECTIONS (défaut: 'card')
         
         Returns:
             list[Perfume]: Liste des derniers parfums
@@ -208,6 +377,6 @@ class PerfumeService:
         collection = db[current_app.config['COLLECTION_DATA']]
         
         # Tri par _id décroissant (les plus récents)
-        cursor = collection.find().sort('_id', -1).limit(limit)
+        cursor = collection.find({}, Perfume.PROJECTIONS[view]).sort('_id', -1).limit(limit)
         
-        return Perfume.list_from_db(list(cursor))
\ No newline at end of file
+        return Perfume.list_from_db(cursor)
\ No newline at end of file
@@ -2,71 +2,36 @@
 Service de statistiques pour l'application.
 """
 from flask import current_app
+from webapp.utils.catalog import get_catalog
 from webapp.utils.db import get_db
+from webapp.utils.executor import get_executor
+
+
+# Valeurs affichées quand une requête échoue ou dépasse le délai
+EMPTY_OVERVIEW = {'total_urls': 0, 'total_perfumes': 0, 'remaining': 0, 'progress': 0}
+EMPTY_BRANDS = {'total_brands': 0, 'top_brands': [], 'all_brands': []}
+EMPTY_ACCORDS = {'total_accords': 0, 'top_accords': [], 'all_accords': []}
 
 
 class StatsService:
     """Service pour les statistiques de la base de données."""
     
+    # Mise en forme (partagée avec le service asynchrone de webapp/asgi.py)
+    
     @staticmethod
-    def get_overview():
-        """
-        Récupère les statistiques générales de la base.
-        
-        Returns:
-            dict: Statistiques globales
-        """
-        db = get_db()
-        
-        # Collections
-        urls_collection = db[current_app.config['COLLECTION_URLS']]
-        data_collection = db[current_app.config['COLLECTION_DATA']]
-        
-        # Comptages
-        urls_count = urls_collection.count_documents({})
-        data_count = data_collection.count_documents({})
-        
-        # Progression
+    def summarize_overview(urls_count, data_count):
+        """Statistiques générales depuis les deux comptages."""
         progress = (data_count / urls_count * 100) if urls_count > 0 else 0
-        remaining = urls_count - data_count
-        
         return {
             'total_urls': urls_count,
             'total_perfumes': data_count,
-            'remaining': remaining,
+            'remaining': urls_count - data_count,
             'progress': round(progress, 2)
         }
     
     @staticmethod
-    def get_brands_stats():
-        """
-        Récupère les statistiques par marque.
-        
-        Returns:
-            dict: {
-                'total_brands': int,
-                'top_brands': list[dict],
-                'all_brands': list[str]
-            }
-        """
-        db = get_db()
-        collection = db[current_app.config['COLLECTION_DATA']]
-        
-        # Pipeline d'agrégation pour les marques
-        pipeline = [
-            {
-                '$group': {
-                    '_id': '$brand',
-                    'count': {'$sum': 1}
-                }
-            },
-            {
-                '$sort': {'count': -1}
-            }
-        ]
-        
-        results = list(collection.aggregate(pipeline))
-        
+    def summarize_brands(results):
+        """Statistiques des marques depuis [{'_id': marque, 'count': n}] trié par nombre décroissant."""
         # Top 10 marques
         top_brands = [
             {'name': r['_id'], 'count': r['count']}
@@ -83,20 +48,11 @@ class StatsService:
         }
     
     @staticmethod
-    def get_accords_stats():
-        """
-        Récupère les statistiques sur les accords.
-        
-        Returns:
-            dict: Statistiques des accords
-        """
-        db = get_db()
-        collection = db[current_app.config['COLLECTION_DATA']]
-        
-        # Récupérer tous les accords
+    def summarize_accords(docs):
+        """Statistiques des accords depuis des documents {'accords': {...}}."""
         all_accords = {}
         
-        for doc in collection.find({}, {'accords': 1}):
+        for doc in docs:
             accords = doc.get('accords', {})
             for accord, value in accords.items():
                 if accord not in all_accords:
@@ -133,23 +89,78 @@ class StatsService:
             'all_accords': accords_list
         }
     
+    @staticmethod
+    def get_overview():
+        """
+        Récupère les statistiques générales de la base.
+        
+        Returns:
+            dict: Statistiques globales
+        """
+        db = get_db()
+        
+        # Collections
+        urls_collection = db[current_app.config['COLLECTION_URLS']]
+        data_collection = db[current_app.config['COLLECTION_DATA']]
+        
+        # Comptages sans filtre : lus dans les métadonnées des collections
+        urls_count = urls_collection.estimated_document_count()
+        data_count = data_collection.estimated_document_count()
+        
+        return StatsService.summarize_overview(urls_count, data_count)
+    
+    @staticmethod
+    def get_brands_stats():
+        """
+        Récupère les statistiques par marque.
+        
+        Returns:
+            dict: {
+                'total_brands': int,
+                'top_brands': list[dict],
+                'all_brands': list[str]
+            }
+        """
+        # Comptages tenus par le catalogue en mémoire (utils/catalog.py)
+        return StatsService.summarize_brands(get_catalog().brands_by_count())
+    
+    @staticmethod
+    def get_accords_stats():
+        """
+        Récupère les statistiques sur les accords.
+        
+        Returns:
+            dict: Statistiques des accords
+        """
+        db = get_db()
+        collection = db[current_app.config['COLLECTION_DATA']]
+        
+        return StatsService.summarize_accords(collection.find({}, {'accords': 1}))
+    
     @staticmethod
     def get_dashboard_data():
         """
         Récupère toutes les données pour le dashboard.
+        Les trois requêtes sont indépendantes et lancées en parallèle.
         
         Returns:
             dict: Données complètes pour le dashboard
+                ('partial' liste les blocs remplacés par une valeur vide)
         """
-        overview = StatsService.get_overview()
-        brands = StatsService.get_brands_stats()
-        accords = StatsService.get_accords_stats()
-        
-        return {
-            'overview': overview,
-            'brands': brands,
-            'accords': accords
-        }
+        results, missing = get_executor().run(
+            {
+                'overview': StatsService.get_overview,
+                'brands': StatsService.get_brands_stats,
+                'accords': StatsService.get_accords_stats,
+            },
+            defaults={
+                'overview': EMPTY_OVERVIEW,
+                'brands': EMPTY_BRANDS,
+                'accords': EMPTY_ACCORDS,
+            }
+        )
+        results['partial'] = missing
+        return results
     
     @staticmethod
     def search_brand(query):
@@ -162,12 +173,5 @@ class StatsService:
         Returns:
             list[str]: Liste des marques correspondantes
         """
-        db = get_db()
-        collection = db[current_app.config['COLLECTION_DATA']]
-        
-        # Recherche case-insensitive
-        brands = collection.distinct('brand', {
-            'brand': {'$regex': query, '$options': 'i'}
-        })
-        
-        return sorted(brands)
\ No newline at end of file
+        # Recherche case-insensitive dans le catalogue en mémoire
+        return get_catalog().search_brands(query)
\ No newline at end of file
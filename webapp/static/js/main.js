@@ -82,22 +82,88 @@ function enhanceSearch() {
     
     if (!searchInput) return;
     
-    // Debounce pour éviter trop de requêtes
+    // Liste de suggestions sous la barre de recherche
+    const suggestions = document.createElement('ul');
+    suggestions.className = 'search-suggestions';
+    suggestions.hidden = true;
+    searchInput.setAttribute('autocomplete', 'off');
+    searchInput.closest('.navbar-search').appendChild(suggestions);
+    
+    // Debounce pour éviter trop de requêtes ; une frappe annule la requête en cours
     let searchTimeout;
+    let controller;
     searchInput.addEventListener('input', (e) => {
         clearTimeout(searchTimeout);
         
-        searchTimeout = setTimeout(() => {
+        searchTimeout = setTimeout(async () => {
             const query = e.target.value.trim();
             
-            if (query.length >= 3) {
-                // Optionnel: suggestions en temps réel
-                console.log('Recherche:', query);
+            if (query.length < 2) {
+                suggestions.hidden = true;
+                return;
             }
-        }, 300);
+            
+            if (controller) controller.abort();
+            controller = new AbortController();
+            
+            try {
+                const response = await fetch(
+                    `/api/autocomplete?q=${encodeURIComponent(query)}&limit=6`,
+                    { signal: controller.signal, headers: { Accept: 'application/json' } }
+                );
+                const data = await response.json();
+                renderSuggestions(suggestions, data);
+            } catch (err) {
+                if (err.name !== 'AbortError') console.error('Autocomplétion:', err);
+            }
+        }, 150);
+    });
+    
+    searchInput.addEventListener('keydown', (e) => {
+        if (e.key === 'Escape') suggestions.hidden = true;
+    });
+    
+    document.addEventListener('click', (e) => {
+        if (!suggestions.contains(e.target) && e.target !== searchInput) {
+            suggestions.hidden = true;
+        }
     });
 }
 
+/**
+ * Affiche les marques puis les parfums suggérés
+ */
+function renderSuggestions(list, data) {
+    list.innerHTML = '';
+    
+    const addItem = (href, label, detail) => {
+        const item = document.createElement('li');
+        const link = document.createElement('a');
+        link.href = href;
+        link.textContent = label;
+        if (detail) {
+            const small = document.createElement('small');
+            small.textContent = detail;
+            link.appendChild(small);
+        }
+        item.appendChild(link);
+        list.appendChild(item);
+    };
+    
+    (data.brands || []).forEach(brand => addItem(
+        `/brand/${encodeURIComponent(brand.name)}`,
+        brand.name,
+        `${formatNumber(brand.count)} parfums`
+    ));
+    (data.perfumes || []).forEach(perfume => addItem(
+        `/perfumes/${perfume.id}`,
+        perfume.name,
+        perfume.brand
+    ));
+    
+    list.hidden = list.children.length === 0;
+}
+
 // ═══════════════════════════════════════════════════════════
 // Utilitaires
 // ═══════════════════════════════════════════════════════════
@@ -2,5 +2,14 @@
 Utilitaires pour l'application Flask.
 """
 from .db import get_db, init_db
+from .executor import get_executor, init_executor
+from .data_version import get_data_version, init_data_version
+from .sampling import get_reservoir, init_sampling
+from .catalog import get_catalog, init_catalog
+from .counts import get_count_cache, init_counts
 
-__all__ = ['get_db', 'init_db']
\ No newline at end of file
+__all__ = [
+    'get_db', 'init_db', 'get_executor', 'init_executor',
+    'get_data_version', 'init_data_version', 'get_reservoir', 'init_sampling',
+    'get_catalog', 'init_catalog', 'get_count_cache', 'init_counts'
+]
\ No newline at end of file
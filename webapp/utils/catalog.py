@@ -0,0 +1,212 @@
+"""
+Catalogue en mémoire des marques et des noms de parfums.
+
+Deux tableaux triés par clé normalisée (casefold) : les noms de parfums
+(avec marque et _id) et les marques (avec leur nombre de parfums). Une
+recherche par préfixe est une dichotomie (bisect) suivie d'un parcours des
+entrées qui commencent par le préfixe : quelques microsecondes, sans
+requête MongoDB. Sert l'autocomplétion (/api/autocomplete) et les
+statistiques de marques (/brands, /api/brands).
+
+Le catalogue suit la version des données (utils/data_version.py) : quand
+des documents ont été ajoutés ou réécrits, seuls ceux dont l'_id dépasse le
+dernier _id connu ou dont l'updated_at atteint le dernier updated_at connu
+sont chargés (et remplacent leur ancienne entrée) ; une suppression (ou un
+écart de comptage) déclenche un rechargement complet.
+"""
+import threading
+from bisect import bisect_left
+
+from flask import current_app
+
+from webapp.utils.data_version import get_data_version
+from webapp.utils.db import get_db
+from webapp.utils.indexes import BRAND_NAME_INDEX
+
+
+def normalize(text):
+    """Clé de tri et de recherche : insensible à la casse et aux espaces de bord."""
+    return (text or '').strip().casefold()
+
+
+class Catalog:
+    """Index trié des marques et des noms de parfums."""
+
+    # Champs lus dans perfume_data
+    PROJECTION = {'name': 1, 'brand': 1}
+
+    def __init__(self):
+        self.version = None
+        self.last_id = None
+        self.brand_counts = {}
+        # [(clé, nom, marque, id)] trié par clé
+        self._names = []
+        # [(clé, marque)] trié par clé
+        self._brands = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    # Chargement
+
+    def pending_query(self, version):
+        """
+        Filtre des documents à charger pour passer à `version`.
+
+        Returns:
+            dict: None si le catalogue est à jour, {} pour un rechargement
+            complet, sinon les documents ajoutés (_id après le dernier _id)
+            ou réécrits (updated_at depuis le dernier updated_at connu)
+        """
+        if version == self.version:
+            return None
+        if self.version is None or self.last_id is None or version[0] < self.version[0]:
+            return {}
+        last_updated = self.version[3]
+        if version[3] == last_updated:
+            return {'_id': {'$gt': self.last_id}}
+        if last_updated is None:
+            # Premières dates de mise à jour : pas de borne, tout recharger
+            return {}
+        # $gte : un document écrit dans la même milliseconde n'est pas perdu
+        return {'$or': [
+            {'_id': {'$gt': self.last_id}},
+            {'updated_at': {'$gte': last_updated}}
+        ]}
+
+    def apply(self, version, docs, query):
+        """
+        Intègre les documents chargés avec `query` (voir pending_query).
+
+        Les tableaux sont reconstruits puis remplacés d'un bloc : une
+        recherche concurrente voit l'ancien ou le nouveau catalogue. Un
+        document déjà présent (réécrit) remplace son ancienne entrée.
+        """
+        full = not query
+        docs = list(docs)
+        names = [] if full else list(self._names)
+        counts = {} if full else dict(self.brand_counts)
+        last_id = None if full else self.last_id
+
+        reloaded = set() if full else {str(doc['_id']) for doc in docs}
+        if reloaded:
+            kept = []
+            for entry in names:
+                if entry[3] in reloaded:
+                    counts[entry[2]] -= 1
+                    if not counts[entry[2]]:
+                        del counts[entry[2]]
+                else:
+                    kept.append(entry)
+            names = kept
+
+        for doc in docs:
+            name = doc.get('name') or 'Unknown'
+            brand = doc.get('brand') or 'Unknown Brand'
+            names.append((normalize(name), name, brand, str(doc['_id'])))
+            counts[brand] = counts.get(brand, 0) + 1
+            if last_id is None or doc['_id'] > last_id:
+                last_id = doc['_id']
+
+        # Timsort : l'ajout de quelques entrées à un tableau trié reste linéaire
+        names.sort()
+        brands = sorted((normalize(brand), brand) for brand in counts)
+
+        self._names, self._brands = names, brands
+        self.brand_counts, self.last_id = counts, last_id
+        # Suppressions mêlées aux ajouts : le comptage ne correspond plus,
+        # le prochain appel recharge tout
+        self.version = version if full or len(names) == version[0] else None
+
+    def refresh(self, version, find):
+        """
+        Met le catalogue à jour (client synchrone).
+
+        Args:
+            version: Version courante des données
+            find (callable): find(filtre) -> documents {'_id', 'name', 'brand'}
+
+        Returns:
+            bool: True si le catalogue a été rechargé
+        """
+        if version == self.version:
+            return False
+        with self._lock:
+            query = self.pending_query(version)
+            if query is None:
+                return False
+            self.apply(version, find(query), query)
+            return True
+
+    # Recherche
+
+    @staticmethod
+    def _prefix_range(entries, prefix):
+        start = bisect_left(entries, (prefix,))
+        end = start
+        while end < len(entries) and entries[end][0].startswith(prefix):
+            end += 1
+        return start, end
+
+    def complete_names(self, prefix, limit=8):
+        """Parfums dont le nom commence par `prefix` (ordre alphabétique)."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        names = self._names
+        start = bisect_left(names, (prefix,))
+        matches = []
+        for key, name, brand, perfume_id in names[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            matches.append({'id': perfume_id, 'name': name, 'brand': brand})
+        return matches
+
+    def complete_brands(self, prefix, limit=8):
+        """Marques commençant par `prefix`, les plus fournies d'abord."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        brands = self._brands
+        start, end = self._prefix_range(brands, prefix)
+        counts = self.brand_counts
+        matches = sorted(
+            (brand for _, brand in brands[start:end]),
+            key=lambda brand: -counts.get(brand, 0)
+        )
+        return [{'name': brand, 'count': counts.get(brand, 0)} for brand in matches[:limit]]
+
+    def search_brands(self, text):
+        """Marques dont le nom contient `text` (ordre alphabétique)."""
+        text = normalize(text)
+        return [brand for key, brand in self._brands if text in key]
+
+    def brands_by_count(self):
+        """[{'_id': marque, 'count': n}] du plus fourni au moins fourni."""
+        return [
+            {'_id': brand, 'count': count}
+            for brand, count in sorted(self.brand_counts.items(), key=lambda item: -item[1])
+        ]
+
+
+def init_catalog(app):
+    """Crée le catalogue de l'application (chargé à la première utilisation)."""
+    app.extensions['catalog'] = Catalog()
+
+
+def get_catalog():
+    """Retourne le catalogue de l'application, mis à jour si les données ont changé."""
+    catalog = current_app.extensions['catalog']
+    collection = get_db()[current_app.config['COLLECTION_DATA']]
+
+    def find(query):
+        cursor = collection.find(query, Catalog.PROJECTION)
+        # Chargement complet : parcours couvert de l'index brand/name/_id
+        return cursor if query else cursor.hint(BRAND_NAME_INDEX)
+
+    if catalog.refresh(get_data_version(), find):
+        current_app.logger.info(
+            f"📇 Catalog refreshed: {len(catalog)} perfumes, {len(catalog.brand_counts)} brands"
+        )
+    return catalog
@@ -0,0 +1,108 @@
+"""
+Cache des comptages de résultats (pagination).
+
+Afficher « page X sur Y » demande le nombre total de documents du filtre :
+un count_documents exact coûte souvent plus cher que la page elle-même
+(parcours de tout l'index, voire de la collection pour une regex). Les
+comptages sont donc mis en cache par filtre normalisé, pour la version
+courante des données (utils/data_version.py) : le cache est vidé dès que
+le scraper a ajouté ou supprimé des documents.
+
+Un comptage est qualifié par sa relation au nombre réel :
+- EXACT ('eq') : count_documents complet
+- ESTIMATED ('approx') : sans filtre, métadonnées de la collection
+  (estimated_document_count, juste hors arrêt brutal du serveur)
+- CAPPED ('gte') : filtre regex, comptage arrêté à COUNT_CAP ; le total
+  vaut COUNT_CAP et s'affiche « 1000+ »
+"""
+import threading
+from collections import OrderedDict
+
+from bson import json_util
+from flask import current_app
+
+EXACT = 'eq'
+ESTIMATED = 'approx'
+CAPPED = 'gte'
+
+
+def query_key(query):
+    """Clé de cache d'un filtre : JSON étendu à clés triées (ordre des champs indifférent)."""
+    return json_util.dumps(query, sort_keys=True)
+
+
+def is_expensive(query):
+    """Indique si le filtre contient une regex (non couverte par un préfixe d'index)."""
+    if isinstance(query, dict):
+        return '$regex' in query or any(is_expensive(value) for value in query.values())
+    if isinstance(query, (list, tuple)):
+        return any(is_expensive(value) for value in query)
+    return False
+
+
+class CountCache:
+    """Comptages par filtre pour une version des données (LRU borné)."""
+
+    def __init__(self, cap=1000, max_entries=1024):
+        self.cap = cap
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()  # {clé: (total, relation)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, version, query):
+        """(total, relation) en cache pour ce filtre, ou None."""
+        with self._lock:
+            if version != self.version:
+                return None
+            key = query_key(query)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def limit_for(self, query):
+        """Limite à passer à count_documents (None : comptage complet)."""
+        if self.cap and is_expensive(query):
+            return self.cap + 1
+        return None
+
+    def store(self, version, query, count, relation=EXACT):
+        """
+        Enregistre un comptage et le retourne qualifié.
+
+        Un comptage limité par limit_for() qui dépasse le plafond devient
+        (cap, CAPPED).
+
+        Returns:
+            tuple: (total, relation)
+        """
+        if relation == EXACT and self.cap and count > self.cap and is_expensive(query):
+            entry = (self.cap, CAPPED)
+        else:
+            entry = (count, relation)
+
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            self._entries[query_key(query)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def init_counts(app):
+    """Crée le cache des comptages de l'application."""
+    app.extensions['count_cache'] = CountCache(
+        cap=app.config.get('COUNT_CAP', 1000),
+        max_entries=app.config.get('COUNT_CACHE_SIZE', 1024)
+    )
+
+
+def get_count_cache():
+    """Retourne le cache des comptages de l'application courante."""
+    return current_app.extensions['count_cache']
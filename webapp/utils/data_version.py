@@ -0,0 +1,102 @@
+"""
+Version des données : signature bon marché des collections MongoDB.
+
+Les structures gardées en mémoire par la webapp (réservoir d'IDs pour le
+tirage aléatoire, données de la page d'accueil...) ne doivent être
+reconstruites que lorsque le scraper a ajouté, supprimé ou réécrit des
+documents. La version combine le nombre estimé de documents des deux
+collections (métadonnées, sans parcours), le dernier _id inséré (index _id)
+et le plus grand updated_at (index updated_at/_id) : une mise à jour en
+place (upsert d'un re-crawl, canonical.fix) change aussi la version. Elle
+est revérifiée au plus toutes les DATA_VERSION_TTL secondes.
+
+Pendant un crawl, updated_at bouge à chaque lot écrit : les caches qui ne
+dépendent que de l'ensemble des documents (réservoir d'IDs, comptages) sont
+indexés sur membership(version), sans updated_at.
+"""
+import time
+
+from flask import current_app
+
+from webapp.utils.db import get_db
+from webapp.utils.indexes import CHANGES_INDEX
+
+
+class DataVersion:
+    """Signature des collections, mise en cache pendant `ttl` secondes."""
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self.value = None
+        self.checked_at = 0.0
+
+    def is_stale(self):
+        return self.value is None or time.monotonic() - self.checked_at >= self.ttl
+
+    def update(self, data_count, urls_count, last_doc, last_updated_doc=None):
+        """
+        Enregistre une nouvelle signature et la retourne.
+
+        Returns:
+            tuple: (documents, URLs, dernier _id, plus grand updated_at)
+        """
+        last_id = str(last_doc['_id']) if last_doc else None
+        last_updated = (last_updated_doc or {}).get('updated_at')
+        self.value = (data_count, urls_count, last_id, last_updated)
+        self.checked_at = time.monotonic()
+        return self.value
+
+    @staticmethod
+    def _last_doc_args():
+        return {'filter': {}, 'projection': {'_id': 1}, 'sort': [('_id', -1)]}
+
+    @staticmethod
+    def _last_updated_args():
+        # Dernière entrée de l'index updated_at/_id (parcours inverse)
+        return {
+            'filter': {},
+            'projection': {'_id': 0, 'updated_at': 1},
+            'sort': [(field, -1) for field, _ in CHANGES_INDEX]
+        }
+
+    def current(self, db, config):
+        """Version courante (client PyMongo synchrone)."""
+        if self.is_stale():
+            data = db[config['COLLECTION_DATA']]
+            self.update(
+                data.estimated_document_count(),
+                db[config['COLLECTION_URLS']].estimated_document_count(),
+                data.find_one(**self._last_doc_args()),
+                data.find_one(**self._last_updated_args())
+            )
+        return self.value
+
+    async def current_async(self, db, config):
+        """Version courante (AsyncMongoClient, mode ASGI)."""
+        if self.is_stale():
+            data = db[config['COLLECTION_DATA']]
+            self.update(
+                await data.estimated_document_count(),
+                await db[config['COLLECTION_URLS']].estimated_document_count(),
+                await data.find_one(**self._last_doc_args()),
+                await data.find_one(**self._last_updated_args())
+            )
+        return self.value
+
+
+def membership(version):
+    """
+    Partie de la version qui ne change qu'à l'ajout ou à la suppression de
+    documents : (documents, URLs, dernier _id).
+    """
+    return version[:3] if version is not None else None
+
+
+def init_data_version(app):
+    """Crée le suivi de version des données de l'application."""
+    app.extensions['data_version'] = DataVersion(ttl=app.config.get('DATA_VERSION_TTL', 5))
+
+
+def get_data_version():
+    """Retourne la version courante des données de l'application."""
+    return current_app.extensions['data_version'].current(get_db(), current_app.config)
@@ -0,0 +1,95 @@
+"""
+Exécution concurrente des requêtes indépendantes d'une page.
+
+Une page qui enchaîne plusieurs appels de service indépendants (parfums
+aléatoires, derniers ajouts, statistiques...) coûte la somme de leurs
+latences. QueryExecutor les lance en parallèle dans un pool de threads
+partagé par l'application : la page coûte alors à peu près la requête la
+plus lente, bornée par un délai (QUERY_DEADLINE_MS). Un appel en échec ou
+hors délai est remplacé par sa valeur par défaut (résultat partiel).
+
+Un thread en cours ne peut pas être annulé : les commandes MongoDB d'un
+appel sont donc bornées par le même délai (pymongo.timeout, transmis au
+serveur en maxTimeMS). Une requête hors délai est interrompue par le
+serveur et libère son thread au lieu d'épuiser le pool.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pymongo
+from flask import current_app
+
+
+class QueryExecutor:
+    """Pool de threads pour les appels de service concurrents."""
+
+    def __init__(self, app, max_workers=8, deadline_ms=2000):
+        self.app = app
+        self.deadline = deadline_ms / 1000
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
+
+    def run(self, calls, defaults=None, deadline=None):
+        """
+        Lance les appels en parallèle et attend au plus `deadline` secondes.
+
+        Args:
+            calls (dict): {nom: callable sans argument}
+            defaults (dict): {nom: valeur si l'appel échoue ou dépasse le délai}
+            deadline (float): Délai en secondes (défaut: QUERY_DEADLINE_MS)
+
+        Returns:
+            tuple: ({nom: résultat}, [noms des appels remplacés par leur défaut])
+        """
+        defaults = defaults or {}
+        deadline = self.deadline if deadline is None else deadline
+        expires_at = time.monotonic() + deadline
+
+        # Une copie du contexte par appel : l'instrumentation de la requête
+        # (utils/monitoring.py) voit aussi les commandes MongoDB des threads
+        futures = {
+            name: self._pool.submit(contextvars.copy_context().run, self._call, func, expires_at)
+            for name, func in calls.items()
+        }
+        wait(futures.values(), timeout=deadline)
+
+        results = {}
+        missing = []
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                self.app.logger.warning(f"⏱️  Query '{name}' exceeded {deadline * 1000:.0f} ms deadline")
+            elif future.exception() is not None:
+                self.app.logger.error(f"✗ Query '{name}' failed: {future.exception()}")
+            else:
+                results[name] = future.result()
+                continue
+            results[name] = defaults.get(name)
+            missing.append(name)
+
+        return results, missing
+
+    def _call(self, func, expires_at):
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            # Démarré après le délai : le résultat serait ignoré
+            raise TimeoutError('query deadline exceeded before start')
+        with self.app.app_context(), pymongo.timeout(remaining):
+            return func()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def init_executor(app):
+    """Crée le pool de requêtes de l'application."""
+    app.extensions['query_executor'] = QueryExecutor(
+        app,
+        max_workers=app.config.get('QUERY_WORKERS', 8),
+        deadline_ms=app.config.get('QUERY_DEADLINE_MS', 2000)
+    )
+
+
+def get_executor():
+    """Retourne le pool de requêtes de l'application courante."""
+    return current_app.extensions['query_executor']
@@ -0,0 +1,82 @@
+"""
+Index MongoDB requis par les requêtes de la webapp.
+
+Chaque index est déclaré à côté de la requête de service qu'il sert et
+appliqué au démarrage (create_index est idempotent : un index existant avec
+la même clé et les mêmes options n'est pas reconstruit). Les noms par
+défaut sont conservés pour rester compatibles avec les index créés par le
+scraper (pipelines.py).
+
+tests/test_query_plans.py vérifie avec explain() qu'aucune requête des
+services ne fait de COLLSCAN.
+"""
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Tri des listes paginées : stable d'une page à l'autre grâce à _id
+NAME_INDEX = [('name', ASCENDING), ('_id', ASCENDING)]
+# Liste d'une marque triée par nom ; couvre aussi le chargement du catalogue
+BRAND_NAME_INDEX = [('brand', ASCENDING), ('name', ASCENDING), ('_id', ASCENDING)]
+# Parcours des modifications (/api/changes) : position (updated_at, _id)
+CHANGES_INDEX = [('updated_at', ASCENDING), ('_id', ASCENDING)]
+
+INDEXES = {
+    'COLLECTION_DATA': [
+        # PerfumeService.get_by_url, upsert du pipeline
+        IndexModel([('url', ASCENDING)], unique=True),
+        # get_all (sans marque), recherche par nom, branche `name` de search
+        IndexModel(NAME_INDEX),
+        # get_all / get_by_brand, branche `brand` de search, catalogue
+        IndexModel(BRAND_NAME_INDEX),
+        # get_by_accord : clés dynamiques accords.<nom> ($exists)
+        IndexModel([('accords.$**', ASCENDING)]),
+        # ChangesService.get_changes, créé aussi par le pipeline
+        IndexModel(CHANGES_INDEX),
+        # get_many (perfume_ids) ; unique et sparse comme dans le scraper
+        # (fragrantica_scraper/canonical.py)
+        IndexModel([('fragrantica_id', ASCENDING)], unique=True, sparse=True),
+    ],
+    'COLLECTION_URLS': [
+        # Dédoublonnage des URLs par le pipeline
+        IndexModel([('perfume_url', ASCENDING)], unique=True),
+    ],
+}
+
+
+def ensure_indexes(db, config, logger=None):
+    """
+    Crée les index déclarés qui manquent.
+
+    Un index en échec (ex: doublons empêchant un index unique) est signalé
+    sans bloquer les autres.
+
+    Args:
+        db: Base MongoDB (pymongo)
+        config (dict): Configuration (noms des collections)
+        logger: Logger pour les index en échec (optionnel)
+
+    Returns:
+        list: Noms des index présents après l'opération
+    """
+    names = []
+    for collection_key, models in INDEXES.items():
+        collection = db[config[collection_key]]
+        for model in models:
+            try:
+                names.extend(collection.create_indexes([model]))
+            except OperationFailure as e:
+                if logger:
+                    logger.warning(
+                        f"⚠️  Index {model.document['key']} on {collection.name} not created: {e}"
+                    )
+    return names
+
+
+def init_indexes(app):
+    """Applique les index au démarrage si MONGO_ENSURE_INDEXES (défaut)."""
+    if not app.config.get('MONGO_ENSURE_INDEXES', True):
+        return
+
+    db = app.extensions['mongo_client'][app.config['MONGO_DATABASE']]
+    names = ensure_indexes(db, app.config, logger=app.logger)
+    app.logger.info(f"✓ Indexes ensured: {', '.join(names)}")
@@ -0,0 +1,165 @@
+"""
+Instrumentation des requêtes Flask et des commandes MongoDB.
+
+Pour chaque requête :
+- latence par route (histogramme), nombre et durée des commandes MongoDB
+  exécutées pendant la requête (command monitoring pymongo) ;
+- en-tête Server-Timing (app / db), lisible dans les devtools du navigateur ;
+- log WARNING des requêtes plus lentes que SLOW_REQUEST_MS, avec la liste
+  de leurs commandes MongoDB (rend visibles les requêtes en N+1).
+
+Les histogrammes sont exposés au format Prometheus sur /metrics si le paquet
+`prometheus_client` est installé et METRICS_ENDPOINT_ENABLED vrai (un registre
+par processus : avec plusieurs workers gunicorn, chaque worker expose ses
+propres valeurs). La route n'est pas authentifiée : désactivée par défaut, à
+n'activer que si le proxy en restreint l'accès au réseau de supervision.
+"""
+import time
+from contextvars import ContextVar
+
+from flask import Response, g, request
+from pymongo import monitoring
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+    )
+except ImportError:  # dépendance optionnelle
+    CollectorRegistry = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+# Commandes MongoDB de la requête en cours : [(commande, collection, durée s)]
+_request_queries = ContextVar('request_queries', default=None)
+
+_metrics = None
+_listener = None
+
+
+def get_metrics():
+    """Crée (une fois par processus) le registre et les histogrammes."""
+    global _metrics
+    if _metrics is None and CollectorRegistry is not None:
+        registry = CollectorRegistry()
+        _metrics = {
+            'registry': registry,
+            'request': Histogram(
+                'webapp_request_seconds', 'Latence des requêtes HTTP',
+                ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS, registry=registry),
+            'request_mongo': Histogram(
+                'webapp_request_mongo_seconds', 'Temps MongoDB cumulé par requête',
+                ['endpoint'], buckets=LATENCY_BUCKETS, registry=registry),
+            'request_queries': Histogram(
+                'webapp_request_mongo_commands', 'Commandes MongoDB par requête',
+                ['endpoint'], buckets=COUNT_BUCKETS, registry=registry),
+            'mongo_command': Histogram(
+                'webapp_mongo_command_seconds', 'Latence des commandes MongoDB',
+                ['command', 'collection'], buckets=LATENCY_BUCKETS, registry=registry),
+        }
+    return _metrics
+
+
+def current_queries():
+    """Commandes MongoDB enregistrées pour la requête en cours (ou None)."""
+    return _request_queries.get()
+
+
+class RequestQueryListener(monitoring.CommandListener):
+    """Listener pymongo : rattache chaque commande à la requête Flask en cours."""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ''
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    def _record(self, event):
+        collection = self._collections.pop(event.request_id, '')
+        duration = event.duration_micros / 1e6
+
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.append((event.command_name, collection, duration))
+
+        metrics = get_metrics()
+        if metrics:
+            metrics['mongo_command'].labels(event.command_name, collection).observe(duration)
+
+
+def init_monitoring(app):
+    """
+    Branche l'instrumentation sur l'application.
+
+    À appeler avant init_db : le listener pymongo est enregistré globalement
+    et ne s'applique qu'aux clients créés ensuite.
+    """
+    global _listener
+    if not app.config.get('MONITORING_ENABLED', True):
+        return
+
+    if _listener is None:
+        _listener = RequestQueryListener()
+        monitoring.register(_listener)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.request_queries_token = _request_queries.set([])
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        queries = _request_queries.get() or []
+        db_time = sum(duration for _, _, duration in queries)
+        endpoint = request.endpoint or 'unknown'
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, db;dur={db_time * 1000:.1f};desc="{len(queries)} queries"'
+        )
+
+        metrics = get_metrics()
+        if metrics:
+            metrics['request'].labels(endpoint, request.method, str(response.status_code)).observe(elapsed)
+            metrics['request_mongo'].labels(endpoint).observe(db_time)
+            metrics['request_queries'].labels(endpoint).observe(len(queries))
+
+        if elapsed * 1000 >= app.config.get('SLOW_REQUEST_MS', 500):
+            details = '\n'.join(
+                f'    {command} {collection} {duration * 1000:.1f} ms'
+                for command, collection, duration in queries
+            )
+            app.logger.warning(
+                f"🐢 Slow request {request.method} {request.full_path.rstrip('?')} "
+                f"{elapsed * 1000:.0f} ms ({len(queries)} queries, {db_time * 1000:.0f} ms in MongoDB)"
+                + (f"\n{details}" if details else '')
+            )
+        return response
+
+    @app.teardown_request
+    def reset_request_queries(error=None):
+        token = g.pop('request_queries_token', None)
+        if token is not None:
+            _request_queries.reset(token)
+
+    if not app.config.get('METRICS_ENDPOINT_ENABLED', False):
+        return
+    if get_metrics() is None:
+        app.logger.info("prometheus_client not installed: /metrics disabled")
+        return
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Métriques au format Prometheus."""
+        return Response(generate_latest(get_metrics()['registry']), mimetype=CONTENT_TYPE_LATEST)
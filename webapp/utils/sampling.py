@@ -0,0 +1,68 @@
+"""
+Tirage aléatoire de parfums sans $sample.
+
+`$sample` n'est rapide que tant que MongoDB peut utiliser son curseur
+aléatoire ; au-delà (taille de collection, moteur de stockage), il trie
+toute la collection à chaque appel de / et /api/random. IdReservoir garde
+en mémoire la liste des _id, rechargée seulement quand des documents ont
+été ajoutés ou supprimés (membership de utils/data_version.py) : le tirage de k IDs est local et
+en O(k), puis les documents sont lus en une requête `$in` sur l'index _id.
+"""
+import random
+import threading
+
+from flask import current_app
+
+
+class IdReservoir:
+    """Liste des _id de la collection, pour un tirage local."""
+
+    def __init__(self):
+        self.ids = []
+        self.version = None
+        self._lock = threading.Lock()
+
+    def refresh(self, version, load_ids):
+        """
+        Recharge les IDs si la version des données a changé.
+
+        Args:
+            version: Version courante des données
+            load_ids (callable): Retourne la liste des _id de la collection
+
+        Returns:
+            bool: True si la liste a été rechargée
+        """
+        if version == self.version:
+            return False
+        with self._lock:
+            if version == self.version:
+                return False
+            self.replace(load_ids(), version)
+            return True
+
+    def replace(self, ids, version):
+        """Remplace la liste d'un bloc (les lecteurs gardent l'ancienne liste)."""
+        self.ids = list(ids)
+        self.version = version
+
+    def sample(self, k):
+        """Tire k IDs distincts (moins si la collection est plus petite)."""
+        ids = self.ids
+        return random.sample(ids, min(k, len(ids)))
+
+
+def ordered(docs, ids):
+    """Remet les documents d'une requête `$in` dans l'ordre du tirage."""
+    by_id = {doc['_id']: doc for doc in docs}
+    return [by_id[_id] for _id in ids if _id in by_id]
+
+
+def init_sampling(app):
+    """Crée le réservoir d'IDs de l'application."""
+    app.extensions['id_reservoir'] = IdReservoir()
+
+
+def get_reservoir():
+    """Retourne le réservoir d'IDs de l'application courante."""
+    return current_app.extensions['id_reservoir']
@@ -0,0 +1,110 @@
+"""
+Sérialisation rapide des réponses API.
+
+- JSON via orjson (repli sur le module json de la stdlib s'il est absent) ;
+- MessagePack (paquet `msgpack`) quand le client le préfère dans son en-tête
+  Accept : `Accept: application/msgpack`.
+
+Côté Flask, ORJSONProvider remplace le provider JSON de l'application :
+toutes les réponses `jsonify` des routes API en profitent sans changement.
+Côté ASGI (webapp/asgi.py), `serialize` fait la même négociation.
+"""
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def _default(obj):
+    """Types MongoDB / Python non sérialisables nativement."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dumps_json(obj, indent=False):
+    """Sérialise en JSON (bytes UTF-8)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False,
+        indent=2 if indent else None, separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+def dumps_msgpack(obj):
+    """Sérialise en MessagePack (bytes)."""
+    return msgpack.packb(obj, default=_default, datetime=False)
+
+
+def negotiate(accept_header):
+    """
+    Choisit le format de réponse d'après l'en-tête Accept.
+
+    Returns:
+        str: Mimetype retenu (JSON par défaut, MessagePack si préféré et disponible)
+    """
+    if msgpack is None or not accept_header:
+        return JSON_MIMETYPE
+
+    accept = parse_accept_header(accept_header, MIMEAccept)
+    return accept.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+
+
+def serialize(obj, accept_header=None, indent=False):
+    """
+    Sérialise selon l'en-tête Accept.
+
+    Returns:
+        tuple: (corps en bytes, mimetype)
+    """
+    mimetype = negotiate(accept_header)
+    if mimetype in MSGPACK_MIMETYPES:
+        return dumps_msgpack(obj), mimetype
+    return dumps_json(obj, indent=indent), JSON_MIMETYPE
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Provider JSON Flask basé sur orjson, avec négociation MessagePack."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_json(obj, indent='indent' in kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if orjson is not None else json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        accept = request.headers.get('Accept') if has_request_context() else None
+
+        body, mimetype = serialize(obj, accept, indent=indent)
+        response = self._app.response_class(body, mimetype=mimetype)
+        response.vary.add('Accept')
+        return response
+
+
+def init_serializers(app):
+    """Installe ORJSONProvider si FAST_JSON_ENABLED (défaut)."""
+    if app.config.get('FAST_JSON_ENABLED', True):
+        app.json = ORJSONProvider(app)